@@ -0,0 +1,67 @@
+import asyncio
+from Direction import Direction
+from Request import Request
+
+
+class AsyncElevator:
+    """
+    Elevator as an asyncio task: requests arrive on an asyncio.Queue and each
+    leg of travel is one awaited clock.sleep, so hundreds of cars share one
+    thread and a simulated clock can fast-forward them.
+    """
+
+    def __init__(self, id, capacity, clock, floor_time=1.0, door_time=3.0, verbose=False):
+        self.id = id
+        self.capacity = capacity  # maximum no of queued requests
+        self.clock = clock
+        self.floor_time = floor_time
+        self.door_time = door_time
+        self.verbose = verbose
+        self.current_floor = 1
+        self.current_direction = Direction.UP
+        self.requests = asyncio.Queue(maxsize=capacity)
+        self.served = 0
+        self.floors_travelled = 0
+        self.total_trip_time = 0.0
+
+    def add_request(self, request: Request) -> bool:
+        try:
+            self.requests.put_nowait((self.clock.now(), request))
+        except asyncio.QueueFull:
+            print(f"Capacity reached of Elevator {self.id}")
+            return False
+        if self.verbose:
+            print(f"Elevator {self.id} added request from source : {request.source_floor} "
+                  f"to : {request.destination_floor}")
+        return True
+
+    def pending(self):
+        return self.requests.qsize()
+
+    async def move_to(self, floor):
+        if floor == self.current_floor:
+            return
+        self.current_direction = Direction.UP if floor > self.current_floor else Direction.DOWN
+        distance = abs(floor - self.current_floor)
+        await self.clock.sleep(distance * self.floor_time)
+        self.current_floor = floor
+        self.floors_travelled += distance
+        if self.verbose:
+            print(f"Elevator {self.id} reached floor {self.current_floor}")
+
+    async def process_request(self, request: Request):
+        # Pick the passenger up, then take them to their floor
+        await self.move_to(request.source_floor)
+        await self.clock.sleep(self.door_time)
+        await self.move_to(request.destination_floor)
+        await self.clock.sleep(self.door_time)
+
+    async def run(self):
+        while True:
+            requested_at, request = await self.requests.get()
+            try:
+                await self.process_request(request)
+                self.served += 1
+                self.total_trip_time += self.clock.now() - requested_at
+            finally:
+                self.requests.task_done()
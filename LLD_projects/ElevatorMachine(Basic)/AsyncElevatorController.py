@@ -0,0 +1,52 @@
+import asyncio
+from AsyncElevator import AsyncElevator
+from Request import Request
+from SimClock import RealClock
+
+
+class AsyncElevatorController:
+    def __init__(self, num_elevators, capacity, clock=None, **elevator_options):
+        self.clock = clock or RealClock()
+        self.elevators = [AsyncElevator(i + 1, capacity, self.clock, **elevator_options)
+                          for i in range(num_elevators)]
+        self.tasks = []
+
+    def start(self):
+        """Must be called from inside a running event loop."""
+        if not self.tasks:
+            self.tasks = [asyncio.create_task(elevator.run(), name=f"elevator-{elevator.id}")
+                          for elevator in self.elevators]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def request_elevator(self, source_floor, destination_floor):
+        optimal_elevator = self.find_optimal_elevator(source_floor, destination_floor)
+        if optimal_elevator is None:
+            print("All elevators are at capacity")
+            return False
+        return optimal_elevator.add_request(Request(source_floor, destination_floor))
+
+    def find_optimal_elevator(self, source_floor, destination_floor):
+        optimal_elevator = None
+        min_cost = None
+
+        for elevator in self.elevators:
+            if elevator.requests.full():
+                continue
+            # Nearest car first, shorter queue on ties
+            cost = (abs(elevator.current_floor - source_floor), elevator.pending())
+            if min_cost is None or cost < min_cost:
+                optimal_elevator = elevator
+                min_cost = cost
+        return optimal_elevator
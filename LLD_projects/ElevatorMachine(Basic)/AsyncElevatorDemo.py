@@ -0,0 +1,54 @@
+import asyncio
+import random
+import time
+from AsyncElevatorController import AsyncElevatorController
+from SimClock import SimulatedClock
+
+
+async def generate_traffic(controller, clock, floors, requests_per_hour, until, rng):
+    while True:
+        await clock.sleep(rng.expovariate(requests_per_hour / 3600))
+        if clock.now() >= until:
+            return
+        source = rng.randint(1, floors)
+        destination = rng.randint(1, floors - 1)
+        if destination >= source:
+            destination += 1
+        controller.request_elevator(source, destination)
+
+
+async def simulate(buildings=50, cars_per_building=10, floors=40, hours=1.0,
+                   requests_per_hour=600, seed=1):
+    clock = SimulatedClock()
+    rng = random.Random(seed)
+    horizon = hours * 3600
+    controllers = [AsyncElevatorController(cars_per_building, capacity=20, clock=clock)
+                   for _ in range(buildings)]
+    for controller in controllers:
+        controller.start()
+    traffic = [asyncio.create_task(generate_traffic(c, clock, floors, requests_per_hour, horizon, rng))
+               for c in controllers]
+
+    start = time.perf_counter()
+    await clock.run(until=horizon)
+    elapsed = time.perf_counter() - start
+
+    for controller in controllers:
+        await controller.stop()
+    for task in traffic:
+        task.cancel()
+    await asyncio.gather(*traffic, return_exceptions=True)
+
+    elevators = [e for c in controllers for e in c.elevators]
+    served = sum(e.served for e in elevators)
+    trip_time = sum(e.total_trip_time for e in elevators) / max(1, served)
+    print(f"{len(elevators)} cars in {buildings} buildings, {hours:.0f}h simulated "
+          f"in {elapsed:.2f}s wall time")
+    print(f"Served {served} requests, average request-to-arrival {trip_time:.0f}s, "
+          f"{sum(e.floors_travelled for e in elevators)} floors travelled")
+    print(f"Still queued at the end: {sum(e.pending() for e in elevators)}, "
+          f"tasks left running: {len([t for t in asyncio.all_tasks() if t is not asyncio.current_task()])}")
+
+
+if __name__ == "__main__":
+    asyncio.run(simulate())
@@ -1,8 +1,12 @@
 
+import threading
 from abc import ABC, abstractmethod
 from .direction import Direction
+from .elevator_control_strategy import floor_bit
+from .elevator_system import ElevatorSystem
 from .external_dispatcher import ExternalDispatcher
 from .internal_dispatcher import InternalDispatcher
+from .telemetry import CAR_CALL, HALL_CALL, Telemetry
 
 class Button(ABC):
     @abstractmethod
@@ -17,16 +21,48 @@ class ExternalButton(Button):
 
     def press_button(self, floor, direction, elevator_id=None):
         self.direction = direction
-        print(f"Pressed {direction.name} from floor {floor}")
-        self.edispatcher.submit_request(floor, direction)
+        if not ElevatorSystem.INSTANCE.hall_calls.press(floor, direction):
+            # Already lit: a car is on its way
+            Telemetry.INSTANCE.log("button.hall_lit", floor=floor, direction=direction.name)
+            return
+        request_id = Telemetry.INSTANCE.open_request(HALL_CALL, floor, direction)
+        Telemetry.INSTANCE.log("button.hall", request=request_id, floor=floor, direction=direction.name)
+        try:
+            self.edispatcher.submit_request(floor, direction, request_id)
+        except Exception:
+            # No car took the call: put the lamp out so the next press tries again
+            ElevatorSystem.INSTANCE.hall_calls.clear(floor, (direction,))
+            raise
 
 class InternalButton(Button):
     def __init__(self):
         # Each elevator’s internal dispatcher can be a simple instance
         self.idispatcher = InternalDispatcher()
-        self.floors = [] # tracking, monitoring, multiple users can press the button at same time
+        # Lit floor buttons as a bitset: several riders pressing the same
+        # floor make one call. Riders press while the car's worker clears
+        # the floors it serves, hence the lock.
+        self.lit = 0
+        self.lock = threading.Lock()
+
+    @property
+    def floors(self):
+        with self.lock:
+            lit = self.lit
+        return [floor for floor in range(lit.bit_length()) if lit >> floor & 1]
+
+    def clear(self, floor):
+        mask = ~floor_bit(floor)
+        with self.lock:
+            self.lit &= mask
 
     def press_button(self, floor, direction, elevator_id):
-        self.floors.append(floor)
-        print(f"Pressed floor {floor} from elevator {elevator_id}")
-        self.idispatcher.submit_request(floor, direction, elevator_id)
+        bit = floor_bit(floor)
+        with self.lock:
+            already_lit = self.lit & bit
+            self.lit |= bit
+        if already_lit:
+            Telemetry.INSTANCE.log("button.car_lit", floor=floor, elevator=elevator_id)
+            return
+        request_id = Telemetry.INSTANCE.open_request(CAR_CALL, floor, direction, elevator_id)
+        Telemetry.INSTANCE.log("button.car", request=request_id, floor=floor, elevator=elevator_id)
+        self.idispatcher.submit_request(floor, direction, elevator_id, request_id)
@@ -0,0 +1,46 @@
+
+import threading
+from .direction import Direction
+from .elevator_control_strategy import floor_bit
+
+class HallCallRegistry:
+    """
+    Lit hall buttons of the whole building, as one bitset of floors per
+    direction. Pressing a lit button is an O(1) no-op, and a car stopping at a
+    floor puts out the buttons of the calls it answered. The car dispatched
+    to each lit button is kept until then, for the floor displays. Presses
+    come from the halls while cars clear from their worker threads, hence
+    the lock.
+    """
+    def __init__(self):
+        self.lit = {direction: 0 for direction in Direction}
+        self.assigned = {}  # (floor, direction) -> id of the elevator answering the call
+        self.lock = threading.Lock()
+
+    def press(self, floor, direction):
+        """Lights the button; returns False if it was already lit."""
+        bit = floor_bit(floor)
+        with self.lock:
+            if self.lit[direction] & bit:
+                return False
+            self.lit[direction] |= bit
+            return True
+
+    def is_lit(self, floor, direction):
+        return bool(self.lit[direction] & floor_bit(floor))
+
+    def assign(self, floor, direction, elevator_id):
+        with self.lock:
+            self.assigned[(floor, direction)] = elevator_id
+
+    def assignments(self):
+        with self.lock:
+            return dict(self.assigned)
+
+    def clear(self, floor, directions):
+        """Puts out the floor's buttons for the calls answered in `directions`."""
+        mask = ~floor_bit(floor)
+        with self.lock:
+            for direction in directions:
+                self.lit[direction] &= mask
+                self.assigned.pop((floor, direction), None)
@@ -0,0 +1,108 @@
+
+import threading
+from .direction import Direction
+from .elevator_selection_strategy import EtaStrategy
+
+class DestinationGroup:
+    """Passengers at one floor, heading to nearby floors, sharing one car."""
+    def __init__(self, floor, direction, sector, elevator_id, opened_at):
+        self.floor = floor
+        self.direction = direction
+        self.sector = sector
+        self.elevator_id = elevator_id
+        self.opened_at = opened_at
+        self.destinations = []
+
+class DestinationDispatcher:
+    """
+    Destination dispatch: passengers enter their target floor at the hall
+    keypad and are told which car to take.
+
+    Destinations are bucketed into sectors of sector_floors floors. Passengers
+    at the same floor going to the same sector within `window` seconds join
+    the same group and share a car, so each trip makes few stops. A new group
+    goes to the car with the lowest ETA to the floor plus a penalty for every
+    group that car is already collecting, which spreads sectors over cars.
+    A group stops taking passengers when its window ends or it reaches
+    max_group, and is done once its car picks it up.
+
+    With a control_strategy the pick-up stop is added to it directly (as the
+    simulation does); without one it goes through the controller's
+    accept_request like any hall call, and the car's controller reports the
+    stop back through ElevatorSystem.car_stopped, which calls pick_up.
+    Keypads and car workers run on different threads, hence the lock.
+    """
+    def __init__(self, elevator_controller_list, control_strategy=None, window=30.0,
+                 sector_floors=6, max_group=12, group_penalty=None):
+        self.controllers_by_id = {c.id: c for c in elevator_controller_list}
+        self.control_strategy = control_strategy
+        self.eta_strategy = EtaStrategy(elevator_controller_list, control_strategy)
+        self.window = window
+        self.sector_floors = sector_floors
+        self.max_group = max_group
+        # Each extra group brings roughly a sector's worth of stops
+        self.group_penalty = group_penalty if group_penalty is not None \
+            else sector_floors * self.eta_strategy.stop_time
+        self.open_groups = {}    # (floor, direction, sector) -> group taking passengers
+        self.groups_by_car = {}  # elevator id -> groups waiting for that car
+        self.lock = threading.Lock()
+
+    def submit_request(self, floor, destination, now):
+        """Returns the id of the car the passenger should take."""
+        direction = Direction.UP if destination > floor else Direction.DOWN
+        key = (floor, direction, destination // self.sector_floors)
+        with self.lock:
+            group = self.open_groups.get(key)
+            if group is not None and (now - group.opened_at > self.window
+                                      or len(group.destinations) >= self.max_group):
+                self._seal(group)
+                group = None
+
+            new_group = group is None
+            if new_group:
+                elevator_id = self._select_elevator(floor, direction)
+                group = DestinationGroup(floor, direction, key[2], elevator_id, now)
+                self.open_groups[key] = group
+                self.groups_by_car.setdefault(elevator_id, []).append(group)
+            group.destinations.append(destination)
+
+        if new_group:
+            # Outside the lock: a car without a worker serves the stop (and
+            # picks the group up) before accept_request returns
+            controller = self.controllers_by_id[group.elevator_id]
+            if self.control_strategy is not None:
+                self.control_strategy.add_request(floor, direction, controller)
+            else:
+                controller.accept_request(floor, direction)
+        return group.elevator_id
+
+    def _select_elevator(self, floor, direction):
+        best_id, best_cost = None, None
+        for elevator_id, controller in self.controllers_by_id.items():
+            cost = self.eta_strategy.estimate(controller, floor, direction) \
+                + self.group_penalty * len(self.groups_by_car.get(elevator_id, ()))
+            if best_cost is None or cost < best_cost:
+                best_id, best_cost = elevator_id, cost
+        return best_id
+
+    def _seal(self, group):
+        key = (group.floor, group.direction, group.sector)
+        if self.open_groups.get(key) is group:
+            del self.open_groups[key]
+
+    def pick_up(self, elevator_id, floor):
+        """
+        The car has opened its doors at `floor`: close the groups it was
+        collecting there and return their destinations, to register as car calls.
+        """
+        destinations = []
+        waiting = []
+        with self.lock:
+            for group in self.groups_by_car.get(elevator_id, ()):
+                if group.floor == floor:
+                    destinations.extend(group.destinations)
+                    self._seal(group)
+                else:
+                    waiting.append(group)
+            self.groups_by_car[elevator_id] = waiting
+        return destinations
@@ -5,9 +5,13 @@ class Display:
     def __init__(self):
         self.floor = 0
         self.direction = Direction.NONE
+        self.eta = None  # seconds until the assigned car arrives, if one is coming
 
     def set_floor(self, floor):
         self.floor = floor
 
     def set_direction(self, direction):
         self.direction = direction
+
+    def set_eta(self, eta):
+        self.eta = eta
@@ -1,7 +1,11 @@
 
+from .telemetry import Telemetry
+
 class Door:
     def open(self, elevator_id):
-        print(f"Door opens for elevator {elevator_id}")
+        Telemetry.INSTANCE.log("door.opened", elevator=elevator_id)
+        Telemetry.INSTANCE.door_opened(elevator_id)
 
     def close(self, elevator_id):
-        print(f"Door closes for elevator {elevator_id}")
+        Telemetry.INSTANCE.log("door.closed", elevator=elevator_id)
+        Telemetry.INSTANCE.door_closed(elevator_id)
@@ -3,26 +3,102 @@ from .door import Door
 from .display import Display
 from .button import InternalButton
 from .direction import Direction
+from .elevator_system import ElevatorSystem
+from .energy import EnergyModel
+from .telemetry import Telemetry
+
+AVERAGE_PASSENGER_KG = 75.0
 
 class ElevatorCar:
-    def __init__(self, id):
+    def __init__(self, id, capacity=13, max_load_kg=1000.0, energy_model=None):
         self.id = id
         self.door = Door()
         self.display = Display()
         self.current_floor = 0
-        self.direction = Direction.NONE
+        self.direction_listeners = []
+        self._direction = Direction.NONE
+        self.capacity = capacity  # passengers
+        self.max_load_kg = max_load_kg
+        self.load = 0  # passengers aboard
+        self.load_kg = 0.0
+        self.energy_model = energy_model or EnergyModel(max_load_kg)
+        self.energy_used_kwh = 0.0
+        self.energy_regenerated_kwh = 0.0
+        self.stops = 0
         self.button = InternalButton()
 
-    def move(self, direction, floor):
-        print(f"Elevator {self.id} moving {direction.name}")
-        print(f"Elevator {self.id} stops at floor {floor}")
+    @property
+    def direction(self):
+        return self._direction
+
+    @direction.setter
+    def direction(self, direction):
+        previous = self._direction
+        self._direction = direction
+        if direction != previous:
+            for listener in self.direction_listeners:
+                listener(previous, direction)
+
+    @property
+    def energy_kwh(self):
+        """Net energy drawn from the supply so far."""
+        return self.energy_used_kwh - self.energy_regenerated_kwh
+
+    def charge(self, kwh):
+        """Books energy drawn (or, if negative, fed back) by the drive."""
+        if kwh >= 0:
+            self.energy_used_kwh += kwh
+        else:
+            self.energy_regenerated_kwh -= kwh
+
+    def add_direction_listener(self, listener):
+        """listener(previous, direction) is called whenever the car changes direction."""
+        self.direction_listeners.append(listener)
+
+    def remove_direction_listener(self, listener):
+        self.direction_listeners.remove(listener)
+
+    def move(self, direction, floor, hall_directions=None):
+        """hall_directions are the hall calls answered at `floor`; by default the one in `direction`."""
+        telemetry = Telemetry.INSTANCE
+        telemetry.log("car.moving", elevator=self.id, direction=direction.name)
+        telemetry.log("car.stopped", elevator=self.id, floor=floor)
+        telemetry.stopped(self.id, floor)
+        floors = abs(floor - self.current_floor)
+        if floors:
+            self.charge(self.energy_model.start_kwh(self.load_kg))
+            self.charge(floors * self.energy_model.floor_kwh(self.load_kg, floor > self.current_floor))
+        # Serving the floor answers every car call there, and the hall calls it stopped for
+        self.button.clear(floor)
+        if hall_directions is None:
+            hall_directions = (direction,)
+        ElevatorSystem.INSTANCE.hall_calls.clear(floor, hall_directions)
         self.door.open(self.id)
         self.door.close(self.id)
 
         self.current_floor = floor
         self.direction = direction
+        self.stops += 1
         self.set_display()
 
+    def can_board(self, weight_kg=AVERAGE_PASSENGER_KG):
+        return self.load < self.capacity and self.load_kg + weight_kg <= self.max_load_kg
+
+    def is_full(self):
+        """Full when another average passenger would not fit."""
+        return not self.can_board()
+
+    def board(self, weight_kg=AVERAGE_PASSENGER_KG):
+        if not self.can_board(weight_kg):
+            return False
+        self.load += 1
+        self.load_kg += weight_kg
+        return True
+
+    def alight(self, weight_kg=AVERAGE_PASSENGER_KG):
+        self.load = max(0, self.load - 1)
+        self.load_kg = max(0.0, self.load_kg - weight_kg)
+
     def press_button(self, floor):
         # Determine direction based on requested floor vs. current floor
         direction = Direction.NONE
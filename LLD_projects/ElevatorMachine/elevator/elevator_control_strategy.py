@@ -7,86 +7,268 @@ class ElevatorControlStrategy(ABC):
         # List of tuples: (floor, direction, elevator_controller)
         self.pending_requests = []
 
+    def add_request(self, floor, direction, elevator_controller, car_call=False):
+        self.pending_requests.append((floor, direction, elevator_controller))
+
+    def has_requests(self, elevator_controller):
+        return any(ctrl is elevator_controller for _, _, ctrl in self.pending_requests)
+
+    def take_requests(self, elevator_controller):
+        """Removes this elevator's requests and returns them as (floor, direction, car_call)."""
+        taken = [(floor, direction, False) for floor, direction, ctrl in self.pending_requests
+                 if ctrl is elevator_controller]
+        self.pending_requests = [r for r in self.pending_requests if r[2] is not elevator_controller]
+        return taken
+
     @abstractmethod
     def move_elevator(self, elevator_controller):
         pass
 
+HALL_CALL = 0
+CAR_CALL = 1
+
+def floor_bit(floor):
+    """Bit of `floor` in a floor bitset. Floors are numbered from 0, basements included."""
+    if floor < 0:
+        raise Exception(f"Floor {floor} is below floor 0; number floors from the lowest basement up")
+    return 1 << floor
+
+class RequestQueue:
+    """
+    Pending stops of one elevator as bitsets of floors, bit f standing for a
+    call at floor f: one bitset per call kind and request direction, plus the
+    union per kind. Pressing a button that is already lit sets a bit that is
+    already set, so duplicate calls cost nothing, and serving a floor clears
+    every call there at once. The next stop is the lowest set bit at or above
+    the car, or the highest one below it, and the route summary reads the
+    extreme bits and bit counts, so none of it grows with repeated presses.
+    A full car only looks at the car call bits, passing hall calls by.
+    """
+    DIRECTIONS = (Direction.UP, Direction.DOWN, Direction.NONE)
+
+    def __init__(self):
+        self.calls = {(kind, direction): 0 for kind in (HALL_CALL, CAR_CALL)
+                      for direction in self.DIRECTIONS}
+        self.stops = [0, 0]  # [HALL_CALL], [CAR_CALL]: floors with any call of that kind
+        self.version = 0     # bumped whenever the set of stops changes
+
+    def __len__(self):
+        return (self.stops[HALL_CALL] | self.stops[CAR_CALL]).bit_count()
+
+    def __bool__(self):
+        return bool(self.stops[HALL_CALL] | self.stops[CAR_CALL])
+
+    def push(self, floor, direction, kind=HALL_CALL):
+        """Returns False if the same call was already pending."""
+        bit = floor_bit(floor)
+        key = (kind, direction)
+        if self.calls[key] & bit:
+            return False
+        self.calls[key] |= bit
+        if not (self.stops[HALL_CALL] | self.stops[CAR_CALL]) & bit:
+            self.version += 1
+        self.stops[kind] |= bit
+        return True
+
+    def _next(self, current_floor, current_direction, skip_hall):
+        """(floor, travel direction) of the next stop, or (None, NONE)."""
+        stops = self.stops[CAR_CALL] if skip_hall else self.stops[HALL_CALL] | self.stops[CAR_CALL]
+        above = stops >> current_floor                 # bit 0 is the current floor
+        below = stops & ((1 << current_floor) - 1)
+        going_down = current_direction == Direction.DOWN
+        # A call at the car's own floor comes first whichever way it is going
+        if above & 1:
+            return current_floor, Direction.DOWN if going_down else Direction.UP
+        # Idle elevators start going UP, as before
+        if going_down and below:
+            return below.bit_length() - 1, Direction.DOWN
+        if above:
+            return current_floor + (above & -above).bit_length() - 1, Direction.UP
+        if below:
+            return below.bit_length() - 1, Direction.DOWN
+        return None, Direction.NONE
+
+    def _direction_at(self, floor, travel):
+        # Report a hall call going our way first, then any other call there
+        bit = floor_bit(floor)
+        for kind in (HALL_CALL, CAR_CALL):
+            for direction in (travel, Direction.DOWN if travel == Direction.UP else Direction.UP,
+                              Direction.NONE):
+                if self.calls[(kind, direction)] & bit:
+                    return direction
+        return Direction.NONE
+
+    def peek(self, current_floor, current_direction, skip_hall=False):
+        floor, travel = self._next(current_floor, current_direction, skip_hall)
+        if floor is None:
+            return None
+        return floor, self._direction_at(floor, travel), travel
+
+    def pop(self, current_floor, current_direction, skip_hall=False):
+        """Like peek, but clears the calls at that floor (hall calls only with room for them)."""
+        stop = self.peek(current_floor, current_direction, skip_hall)
+        if stop is not None:
+            self.clear(stop[0], kinds=(CAR_CALL,) if skip_hall else (HALL_CALL, CAR_CALL))
+        return stop
+
+    def clear(self, floor, kinds=(HALL_CALL, CAR_CALL)):
+        bit = floor_bit(floor)
+        mask = ~bit
+        before = self.stops[HALL_CALL] | self.stops[CAR_CALL]
+        for (kind, direction), calls in self.calls.items():
+            if kind in kinds:
+                self.calls[(kind, direction)] = calls & mask
+        for kind in kinds:
+            self.stops[kind] &= mask
+        if (before ^ (self.stops[HALL_CALL] | self.stops[CAR_CALL])) & bit:
+            self.version += 1
+
+    def remove(self, floor, direction, kind=HALL_CALL):
+        """Withdraws one call, e.g. a hall call handed to another car. False if it was not pending."""
+        bit = floor_bit(floor)
+        key = (kind, direction)
+        if not self.calls[key] & bit:
+            return False
+        before = self.stops[HALL_CALL] | self.stops[CAR_CALL]
+        self.calls[key] &= ~bit
+        if not any(self.calls[(kind, other)] & bit for other in self.DIRECTIONS):
+            self.stops[kind] &= ~bit
+        if (before ^ (self.stops[HALL_CALL] | self.stops[CAR_CALL])) & bit:
+            self.version += 1
+        return True
+
+    def hall_directions(self, floor):
+        """Directions of the hall calls pending at `floor`."""
+        bit = floor_bit(floor)
+        return [direction for direction in self.DIRECTIONS if self.calls[(HALL_CALL, direction)] & bit]
+
+    def route(self, current_floor, current_direction):
+        """Every stop in the order LOOK will serve them: on ahead, then back."""
+        stops = self.stops[HALL_CALL] | self.stops[CAR_CALL]
+        above = [floor for floor in range(current_floor, stops.bit_length()) if stops >> floor & 1]
+        below = [floor for floor in range(current_floor - 1, -1, -1) if stops >> floor & 1]
+        if current_direction == Direction.DOWN:
+            here = above[:1] if above and above[0] == current_floor else []
+            return here + below + above[len(here):]
+        return above + below
+
+    def summary(self, current_floor):
+        """
+        (highest stop above, lowest stop below, stops above, stops below).
+        Read-only, so dispatchers may call it while the car's worker is running.
+        """
+        stops = self.stops[HALL_CALL] | self.stops[CAR_CALL]
+        above = stops >> current_floor << current_floor
+        below = stops & ((1 << current_floor) - 1)
+        return (above.bit_length() - 1 if above else None,
+                (below & -below).bit_length() - 1 if below else None,
+                above.bit_count(), below.bit_count())
+
+    def items(self, kinds=(HALL_CALL, CAR_CALL)):
+        for (kind, direction), calls in self.calls.items():
+            if kind not in kinds:
+                continue
+            while calls:
+                low = calls & -calls
+                yield low.bit_length() - 1, direction
+                calls ^= low
+
 class LookAlgorithm(ElevatorControlStrategy):
     """
     A simplified 'LOOK'-style algorithm:
       - Elevator continues in its current direction, serving requests on that path.
       - If no requests remain in that direction, it reverses direction (if more requests exist).
+    Requests are kept per elevator in a RequestQueue, so picking the next stop
+    does not scan or sort other elevators' requests. A full car only stops
+    for its riders' car calls and leaves hall calls for when it has room.
     """
-    def move_elevator(self, elevator_controller):
-        if not self.pending_requests:
-            # No pending requests at all
-            return
-
-        elevator_car = elevator_controller.elevator_car
-        current_floor = elevator_car.current_floor
-        current_direction = elevator_car.direction
+    def __init__(self):
+        # pending_requests is derived from the queues, so the base list is not used
+        self.request_queues = {}
 
-        # 1) Filter requests for this elevator
-        requests_for_this_elevator = [
+    @property
+    def pending_requests(self):
+        """Read-only snapshot of (floor, direction, elevator_controller) tuples."""
+        return [
             (floor, dir_, ctrl)
-            for (floor, dir_, ctrl) in self.pending_requests
-            if ctrl == elevator_controller
+            for ctrl, queue in self.request_queues.items()
+            for floor, dir_ in queue.items()
         ]
-        if not requests_for_this_elevator:
+
+    def add_request(self, floor, direction, elevator_controller, car_call=False):
+        """Returns False if the elevator already had this call."""
+        queue = self.request_queues.get(elevator_controller)
+        if queue is None:
+            queue = self.request_queues[elevator_controller] = RequestQueue()
+        return queue.push(floor, direction, CAR_CALL if car_call else HALL_CALL)
+
+    def remove_request(self, floor, direction, elevator_controller, car_call=False):
+        """Returns False if the elevator did not have this call."""
+        queue = self.request_queues.get(elevator_controller)
+        if queue is None:
+            return False
+        return queue.remove(floor, direction, CAR_CALL if car_call else HALL_CALL)
+
+    def next_stop(self, elevator_controller):
+        """(floor, request direction, travel direction) of the next stop, or None."""
+        queue = self.request_queues.get(elevator_controller)
+        if not queue:
+            return None
+        elevator_car = elevator_controller.elevator_car
+        return queue.peek(elevator_car.current_floor, elevator_car.direction,
+                          elevator_car.is_full())
+
+    def route_summary(self, elevator_controller):
+        """O(1) RequestQueue.summary of this elevator's committed stops."""
+        queue = self.request_queues.get(elevator_controller)
+        if not queue:
+            return None, None, 0, 0
+        return queue.summary(elevator_controller.elevator_car.current_floor)
+
+    def has_requests(self, elevator_controller):
+        return bool(self.request_queues.get(elevator_controller))
+
+    def take_requests(self, elevator_controller):
+        queue = self.request_queues.pop(elevator_controller, None)
+        if queue is None:
+            return []
+        return [(floor, direction, kind == CAR_CALL)
+                for kind in (HALL_CALL, CAR_CALL) for floor, direction in queue.items((kind,))]
+
+    def plan(self, elevator_controller):
+        """(version, stops in serving order); the version changes whenever the stops do."""
+        queue = self.request_queues.get(elevator_controller)
+        if queue is None:
+            return 0, []
+        elevator_car = elevator_controller.elevator_car
+        return queue.version, queue.route(elevator_car.current_floor, elevator_car.direction)
+
+    def plan_version(self, elevator_controller):
+        queue = self.request_queues.get(elevator_controller)
+        return queue.version if queue is not None else 0
+
+    def pop_next_stop(self, elevator_controller):
+        """Like next_stop, but removes the request from the queue."""
+        queue = self.request_queues.get(elevator_controller)
+        if not queue:
+            return None
+        elevator_car = elevator_controller.elevator_car
+        return queue.pop(elevator_car.current_floor, elevator_car.direction,
+                         elevator_car.is_full())
+
+    def move_elevator(self, elevator_controller):
+        elevator_car = elevator_controller.elevator_car
+        stop = self.next_stop(elevator_controller)
+        if stop is None:
             return  # No requests for this particular elevator
 
-        # 2) If elevator has no current direction (idle), assume UP to start
-        if current_direction == Direction.NONE:
-            current_direction = Direction.UP
-
-        # 3) Filter requests that are in the current direction path
-        if current_direction == Direction.UP:
-            servable_requests = [
-                (floor, dir_, ctrl)
-                for (floor, dir_, ctrl) in requests_for_this_elevator
-                if floor >= current_floor
-            ]
-            servable_requests.sort(key=lambda x: x[0])  # ascending floors
-        else:  # current_direction == Direction.DOWN
-            servable_requests = [
-                (floor, dir_, ctrl)
-                for (floor, dir_, ctrl) in requests_for_this_elevator
-                if floor <= current_floor
-            ]
-            servable_requests.sort(key=lambda x: x[0], reverse=True)
-
-        # 4) If no requests in the current direction, reverse direction
-        if not servable_requests:
-            current_direction = (
-                Direction.DOWN if current_direction == Direction.UP else Direction.UP
-            )
-            if current_direction == Direction.UP:
-                servable_requests = [
-                    (floor, dir_, ctrl)
-                    for (floor, dir_, ctrl) in requests_for_this_elevator
-                    if floor >= current_floor
-                ]
-                servable_requests.sort(key=lambda x: x[0])
-            else:  # DOWN
-                servable_requests = [
-                    (floor, dir_, ctrl)
-                    for (floor, dir_, ctrl) in requests_for_this_elevator
-                    if floor <= current_floor
-                ]
-                servable_requests.sort(key=lambda x: x[0], reverse=True)
-
-            if not servable_requests:
-                # Even after reversing direction, there are no requests
-                return
-
-        # 5) Take the next request in the sorted list
-        next_floor, next_direction, _ = servable_requests[0]
-
-        # Remove it from the global queue
-        self.pending_requests.remove((next_floor, next_direction, elevator_controller))
-
-        # 6) Move the elevator
-        elevator_car.move(next_direction, next_floor)
-
-        # 7) Update direction for the elevator
-        elevator_car.direction = current_direction
+        next_floor, next_direction, current_direction = stop
+        queue = self.request_queues[elevator_controller]
+        # A full car passes the hall calls by, so their buttons stay lit
+        served = [] if elevator_car.is_full() else queue.hall_directions(next_floor)
+        self.pop_next_stop(elevator_controller)
+
+        elevator_car.move(next_direction, next_floor, served)
+
+        # Keep travelling the same way while stops remain, otherwise go idle
+        elevator_car.direction = current_direction if queue else Direction.NONE
@@ -1,24 +1,79 @@
 
+import queue
+import threading
 from .elevator_system import ElevatorSystem
+from .telemetry import Telemetry
 
 class ElevatorController:
-    def __init__(self, id, elevator_car):
+    def __init__(self, id, elevator_car, control_strategy=None):
         self.id = id
         self.elevator_car = elevator_car
-    
-    def accept_request(self, floor, direction):
+        # Own strategy instance per car; None shares the system-wide one
+        self.control_strategy = control_strategy
+        self.requests = queue.Queue()
+        self._stop = threading.Event()
+        self._worker = None
+
+    def get_control_strategy(self):
+        return self.control_strategy or ElevatorSystem.elevator_control_strategy
+
+    def accept_request(self, floor, direction, car_call=False, request_id=None):
         """
-        We add this request to the ElevatorSystem's control strategy queue,
-        associating it with this controller (so we know which elevator).
+        We add this request to the control strategy's queue, associating it
+        with this controller (so we know which elevator). car_call marks a
+        floor pressed inside the car rather than a hall call. While the worker
+        is running the request is only queued and the caller returns immediately.
+        request_id is the telemetry trace the request belongs to, if any.
         """
-        ElevatorSystem.elevator_control_strategy.pending_requests.append(
-            (floor, direction, self)
-        )
+        Telemetry.INSTANCE.queued(request_id, self.id, floor)
+        if self.is_running():
+            self.requests.put((floor, direction, car_call))
+            return
+        self.get_control_strategy().add_request(floor, direction, self, car_call)
         self.control_car()
 
     def control_car(self):
         """
         Instruct the system's control strategy to move this elevator if needed.
         """
-        ElevatorSystem.elevator_control_strategy.move_elevator(self)
-        print("Elevator moving...")
+        stops = self.elevator_car.stops
+        self.get_control_strategy().move_elevator(self)
+        Telemetry.INSTANCE.log("controller.moved", elevator=self.id)
+        if self.elevator_car.stops != stops:
+            ElevatorSystem.INSTANCE.car_stopped(self)
+
+    def is_running(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def start(self):
+        """Serve requests on a worker thread that owns this car's strategy state."""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name=f"elevator-{self.id}", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+        self.requests.put(None)  # wake an idle worker
+        if self._worker:
+            self._worker.join()
+            self._worker = None
+
+    def _run(self):
+        strategy = self.get_control_strategy()
+        while not self._stop.is_set():
+            # Block only when there is nothing left to serve
+            try:
+                request = self.requests.get(block=not strategy.has_requests(self))
+            except queue.Empty:
+                request = None
+            while request is not None:
+                floor, direction, car_call = request
+                strategy.add_request(floor, direction, self, car_call)
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    request = None
+            if strategy.has_requests(self) and not self._stop.is_set():
+                self.control_car()
@@ -1,13 +1,41 @@
 
 from abc import ABC, abstractmethod
+from .direction import Direction
 from .elevator_system import ElevatorSystem
 
 class ElevatorSelectionStrategy(ABC):
-    def __init__(self):
-        self.elevator_controller_list = ElevatorSystem.INSTANCE.get_elevator_controller_list()
+    def __init__(self, elevator_controller_list=None, control_strategy=None):
+        # Defaults to the system's elevators; a simulation can pass its own
+        self.uses_system_registry = elevator_controller_list is None
+        if elevator_controller_list is None:
+            elevator_controller_list = ElevatorSystem.INSTANCE.get_elevator_controller_list()
+        self.elevator_controller_list = elevator_controller_list
+        self.control_strategy = control_strategy
+
+    def get_control_strategy(self, elevator_controller=None):
+        # A car running its own worker keeps its stops in its own strategy
+        if elevator_controller is not None and elevator_controller.control_strategy is not None:
+            return elevator_controller.control_strategy
+        return self.control_strategy or ElevatorSystem.elevator_control_strategy
+
+    def get_candidates(self, floor, exclude=()):
+        """
+        Elevators that can take a call at `floor`, less the ids in exclude.
+        In a zoned building the system's zone index narrows them to the
+        floor's own bank.
+        """
+        zone_map = ElevatorSystem.zone_map
+        if self.uses_system_registry and zone_map is not None:
+            candidates = ElevatorSystem.INSTANCE.get_elevators_in_zone(zone_map.zone_for(floor).name)
+        else:
+            candidates = self.elevator_controller_list
+        if exclude:
+            return [c for c in candidates if c.id not in exclude]
+        return candidates
 
     @abstractmethod
-    def select_elevator(self, floor):
+    def select_elevator(self, floor, direction=None, exclude=()):
+        """exclude lists elevator ids not to pick, e.g. a car that just left the floor full."""
         pass
 
 class OddEvenStrategy(ElevatorSelectionStrategy):
@@ -17,8 +45,129 @@ class OddEvenStrategy(ElevatorSelectionStrategy):
       - If the request floor is even, prefer an elevator with an even ID.
       - If none match, default to elevator 1.
     """
-    def select_elevator(self, floor):
-        for e_controller in self.elevator_controller_list:
+    def select_elevator(self, floor, direction=None, exclude=()):
+        candidates = self.get_candidates(floor, exclude)
+        for e_controller in candidates:
             if floor % 2 == e_controller.id % 2:
                 return e_controller.id
+        if exclude and candidates:
+            return candidates[0].id
         return 1
+
+class EtaStrategy(ElevatorSelectionStrategy):
+    """
+    Picks the elevator with the lowest estimated time of arrival at the call.
+
+    A car's route is taken as LOOK would run it: finish its current direction
+    up to its furthest stop, then sweep back. The estimate is the floors on
+    that path to the call, plus door dwell for the committed stops passed on
+    the way, plus a boarding allowance per passenger aboard. Full cars would
+    pass the call by, so they only win when every car is full. Every input
+    comes from the control strategy's O(1) route summary, so a selection
+    costs O(elevators) however many requests are queued.
+    """
+    FULL_CAR_PENALTY = 1e6
+    def __init__(self, elevator_controller_list=None, control_strategy=None,
+                 floor_time=1.5, stop_time=4.0, boarding_time=1.0):
+        super().__init__(elevator_controller_list, control_strategy)
+        self.floor_time = floor_time
+        self.stop_time = stop_time
+        self.boarding_time = boarding_time
+
+    def select_elevator(self, floor, direction=None, exclude=()):
+        best_id, best_eta = 1, None
+        for e_controller in self.get_candidates(floor, exclude):
+            eta = self.estimate(e_controller, floor, direction)
+            if best_eta is None or eta < best_eta:
+                best_id, best_eta = e_controller.id, eta
+        return best_id
+
+    def estimate(self, elevator_controller, floor, direction=None):
+        return self.estimate_from(self.car_state(elevator_controller), floor, direction)
+
+    def car_state(self, elevator_controller):
+        """What estimate reads from a car, taken once to price it for many calls."""
+        elevator_car = elevator_controller.elevator_car
+        up_far, down_far, up_count, down_count = \
+            self.get_control_strategy(elevator_controller).route_summary(elevator_controller)
+        load_time = elevator_car.load * self.boarding_time
+        if elevator_car.is_full():
+            load_time += self.FULL_CAR_PENALTY
+        return (elevator_car.current_floor, elevator_car.direction,
+                up_far, down_far, up_count, down_count, load_time)
+
+    def estimate_from(self, car_state, floor, direction=None):
+        if direction is None:
+            return min(self.estimate_from(car_state, floor, Direction.UP),
+                       self.estimate_from(car_state, floor, Direction.DOWN))
+
+        current, car_direction, up_far, down_far, up_count, down_count, load_time = car_state
+        if not up_count and not down_count:
+            return abs(floor - current) * self.floor_time + load_time
+
+        # Solve for a car heading up; a car heading down is the mirror image
+        call_up = direction == Direction.UP
+        if car_direction == Direction.DOWN:
+            current, floor, call_up = -current, -floor, not call_up
+            ahead, ahead_count = (-down_far if down_far is not None else None), down_count
+            behind, behind_count = (-up_far if up_far is not None else None), up_count
+        else:
+            ahead, ahead_count = up_far, up_count
+            behind, behind_count = down_far, down_count
+        ahead = current if ahead is None else ahead
+        behind = current if behind is None else behind
+
+        if call_up and floor >= current:
+            # On the way: only the stops below the call are passed
+            distance = floor - current
+            passed = ahead_count if floor >= ahead else \
+                ahead_count * distance / max(1, ahead - current)
+        elif not call_up:
+            turn = max(ahead, floor)
+            distance = (turn - current) + (turn - floor)
+            passed = ahead_count + behind_count * min(1, (turn - floor) / max(1, turn - behind))
+        else:
+            # Behind the car going the same way: a full sweep there and back
+            low = min(behind, floor)
+            distance = (ahead - current) + (ahead - low) + (floor - low)
+            passed = ahead_count + behind_count
+        return distance * self.floor_time + passed * self.stop_time + load_time
+
+class EnergyAwareStrategy(EtaStrategy):
+    """
+    EtaStrategy that also counts the energy a car would spend on the call:
+    each car costs its ETA plus energy_weight seconds per kWh of extra
+    driving. A car whose route already passes the floor only adds a stop.
+    Otherwise it adds the floors beyond its route, priced by its
+    EnergyModel at its current load as a trip out and back, since the car
+    comes back over them with the passenger or to its next call. The
+    potential energy then cancels, and what is left is the drive's losses
+    on it, which are lowest for a car near balance and with a regenerative
+    drive. energy_weight=0 is plain EtaStrategy; a few hundred suits an eco
+    mode off-peak, when waits are short anyway.
+    """
+    def __init__(self, elevator_controller_list=None, control_strategy=None, energy_weight=300.0,
+                 **eta_options):
+        super().__init__(elevator_controller_list, control_strategy, **eta_options)
+        self.energy_weight = energy_weight
+
+    def select_elevator(self, floor, direction=None, exclude=()):
+        best_id, best_cost = 1, None
+        for e_controller in self.get_candidates(floor, exclude):
+            cost = self.estimate(e_controller, floor, direction) + \
+                self.energy_weight * self.extra_energy(e_controller, floor)
+            if best_cost is None or cost < best_cost:
+                best_id, best_cost = e_controller.id, cost
+        return best_id
+
+    def extra_energy(self, elevator_controller, floor):
+        """kWh the car would use on top of its current route to stop at floor."""
+        elevator_car = elevator_controller.elevator_car
+        current = elevator_car.current_floor
+        up_far, down_far, _, _ = \
+            self.get_control_strategy(elevator_controller).route_summary(elevator_controller)
+        high = max(current, up_far if up_far is not None else current)
+        low = min(current, down_far if down_far is not None else current)
+        beyond = max(0, floor - high, low - floor)
+        model = elevator_car.energy_model
+        return model.start_kwh(elevator_car.load_kg) + model.round_trip_kwh(beyond, elevator_car.load_kg)
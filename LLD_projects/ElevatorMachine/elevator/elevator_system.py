@@ -1,8 +1,21 @@
 
+import threading
+from .call_registry import HallCallRegistry
+from .direction import Direction
+from .eta_board import EtaBoard
+from .parking import time_of_day
+from .telemetry import Telemetry
+
+class ElevatorNotFoundException(Exception):
+    pass
+
 class ElevatorSystem:
     INSTANCE = None
     elevator_control_strategy = None
     elevator_selection_strategy = None
+    destination_dispatcher = None  # set to use hall keypads instead of up/down buttons
+    zone_map = None  # set to split the building into banks with their own dispatch
+    idle_parker = None  # set to send cars left without requests to a park floor
 
     def __init__(self):
         if ElevatorSystem.INSTANCE is not None:
@@ -10,13 +23,102 @@ class ElevatorSystem:
         else:
             self.elevator_controller_list = []
             self.floors = []
+            self.hall_calls = HallCallRegistry()
+            self.eta_board = EtaBoard()
+            # Indexes over the registered elevators, each id -> controller:
+            # all of them, by direction of travel (NONE is idle) and by zone.
+            # Cars report direction changes from their worker threads.
+            self.elevator_controllers_by_id = {}
+            self.elevators_by_direction = {direction: {} for direction in Direction}
+            self.elevators_by_zone = {}
+            self.direction_listeners = {}
+            self.index_lock = threading.Lock()
             ElevatorSystem.INSTANCE = self
 
     def add_elevator(self, elevator):
+        if elevator.id in self.elevator_controllers_by_id:
+            raise Exception(f"Elevator {elevator.id} is already registered")
         self.elevator_controller_list.append(elevator)
+        self.elevator_controllers_by_id[elevator.id] = elevator
+
+        def on_direction_change(previous, direction):
+            with self.index_lock:
+                self.elevators_by_direction[previous].pop(elevator.id, None)
+                self.elevators_by_direction[direction][elevator.id] = elevator
+            if direction == Direction.NONE and ElevatorSystem.idle_parker is not None:
+                self._park(elevator)
+        car = elevator.elevator_car
+        with self.index_lock:
+            self.elevators_by_direction[car.direction][elevator.id] = elevator
+        car.add_direction_listener(on_direction_change)
+        self.direction_listeners[elevator.id] = on_direction_change
+        self._index_zone(elevator)
 
     def remove_elevator(self, elevator):
+        if self.elevator_controllers_by_id.get(elevator.id) is not elevator:
+            raise ElevatorNotFoundException(f"Elevator {elevator.id} is not registered")
         self.elevator_controller_list.remove(elevator)
+        del self.elevator_controllers_by_id[elevator.id]
+        elevator.elevator_car.remove_direction_listener(self.direction_listeners.pop(elevator.id))
+        with self.index_lock:
+            for elevators in self.elevators_by_direction.values():
+                elevators.pop(elevator.id, None)
+            for elevators in self.elevators_by_zone.values():
+                elevators.pop(elevator.id, None)
+
+    def _index_zone(self, elevator):
+        zone_map = ElevatorSystem.zone_map
+        zone = zone_map.zones_by_elevator.get(elevator.id) if zone_map is not None else None
+        if zone is not None:
+            with self.index_lock:
+                self.elevators_by_zone.setdefault(zone.name, {})[elevator.id] = elevator
+
+    def _park(self, elevator):
+        # Other idle cars hold their floors; this one takes the nearest free park floor
+        car = elevator.elevator_car
+        taken = [other.elevator_car.current_floor for other in self.get_idle_elevators()
+                 if other is not elevator]
+        floor = ElevatorSystem.idle_parker.choose(car.current_floor, taken, time_of_day())
+        zone_map = ElevatorSystem.zone_map
+        if floor is None or floor == car.current_floor or \
+                (zone_map is not None and not zone_map.zone_of(elevator.id).serves(floor)):
+            return
+        Telemetry.INSTANCE.log("system.parking", elevator=elevator.id, floor=floor)
+        direction = Direction.UP if floor > car.current_floor else Direction.DOWN
+        elevator.accept_request(floor, direction, car_call=True)
+
+    def car_stopped(self, elevator):
+        """
+        A car has served a stop. With destination dispatch, the groups it was
+        sent to collect there board, and the floors they keyed in at the hall
+        become its car calls.
+        """
+        zone_map = ElevatorSystem.zone_map
+        if zone_map is not None:
+            zone = zone_map.zones_by_elevator.get(elevator.id)
+            dispatcher = zone.destination_dispatcher if zone is not None else None
+        else:
+            dispatcher = ElevatorSystem.destination_dispatcher
+        if dispatcher is None:
+            return
+        car = elevator.elevator_car
+        for destination in sorted(set(dispatcher.pick_up(elevator.id, car.current_floor))):
+            car.press_button(destination)
+
+    def get_elevator_controller(self, elevator_id):
+        try:
+            return self.elevator_controllers_by_id[elevator_id]
+        except KeyError:
+            raise ElevatorNotFoundException(f"No elevator with id {elevator_id}") from None
+
+    def get_idle_elevators(self):
+        return list(self.elevators_by_direction[Direction.NONE].values())
+
+    def get_elevators_moving(self, direction):
+        return list(self.elevators_by_direction[direction].values())
+
+    def get_elevators_in_zone(self, zone_name):
+        return list(self.elevators_by_zone.get(zone_name, {}).values())
 
     def set_elevator_control_strategy(self, strategy):
         ElevatorSystem.elevator_control_strategy = strategy
@@ -24,6 +126,37 @@ class ElevatorSystem:
     def set_elevator_selection_strategy(self, strategy):
         ElevatorSystem.elevator_selection_strategy = strategy
 
+    def set_destination_dispatcher(self, dispatcher):
+        ElevatorSystem.destination_dispatcher = dispatcher
+
+    def set_zone_map(self, zone_map):
+        ElevatorSystem.zone_map = zone_map
+        with self.index_lock:
+            self.elevators_by_zone = {}
+        for elevator in self.elevator_controller_list:
+            self._index_zone(elevator)
+
+    def set_idle_parker(self, parker):
+        ElevatorSystem.idle_parker = parker
+
+    def start(self):
+        """
+        Give every elevator its own worker thread and control strategy
+        instance, so hall calls return at once and cars do not share state.
+        """
+        shared = ElevatorSystem.elevator_control_strategy
+        for controller in self.elevator_controller_list:
+            if controller.control_strategy is None:
+                controller.control_strategy = type(shared)()
+                # Move the car's pending stops over, keeping riders' car calls as such
+                for floor, direction, car_call in shared.take_requests(controller):
+                    controller.control_strategy.add_request(floor, direction, controller, car_call)
+            controller.start()
+
+    def stop(self):
+        for controller in self.elevator_controller_list:
+            controller.stop()
+
     def add_floor(self, floor):
         self.floors.append(floor)
 
@@ -33,5 +166,13 @@ class ElevatorSystem:
     def get_floors(self):
         return self.floors
 
+    def refresh_floor_displays(self):
+        """Show every floor where its car is and when it should arrive."""
+        assignments = {}
+        for (floor, _), elevator_id in self.hall_calls.assignments().items():
+            if elevator_id in self.elevator_controllers_by_id:
+                assignments.setdefault(floor, []).append(self.elevator_controllers_by_id[elevator_id])
+        self.eta_board.refresh(self.floors, assignments)
+
 # Create the ElevatorSystem singleton instance at import time
 ElevatorSystem()
@@ -0,0 +1,56 @@
+
+GRAVITY = 9.81
+JOULES_PER_KWH = 3.6e6
+
+class EnergyModel:
+    """
+    Supply energy of one traction elevator. The counterweight balances the
+    car plus `balance` of its rated load, so a car that is nearly half full
+    is in balance. Moving the heavier side up draws power through the drive
+    (motor_efficiency). Letting it come down turns the motor into a
+    generator; a regenerative drive feeds regen_efficiency of that back,
+    and a plain one (regen_efficiency=0) burns it off. So a full car going
+    down or an empty one going up gives energy back. Every run also speeds
+    up the moving masses and brakes them again, and the drive loses
+    running_loss_kw while it moves.
+
+    Values are in kWh; negative means energy returned to the supply.
+    """
+    def __init__(self, rated_load_kg=1000.0, car_mass_kg=1200.0, balance=0.45, floor_height_m=3.5,
+                 speed_m_s=2.5, motor_efficiency=0.8, regen_efficiency=0.6, running_loss_kw=2.0,
+                 rotating_mass_factor=1.2):
+        self.car_mass_kg = car_mass_kg
+        self.counterweight_kg = car_mass_kg + balance * rated_load_kg
+        self.floor_height_m = floor_height_m
+        self.speed_m_s = speed_m_s
+        self.motor_efficiency = motor_efficiency
+        self.regen_efficiency = regen_efficiency
+        self.running_loss_kw = running_loss_kw
+        self.rotating_mass_factor = rotating_mass_factor  # sheave, motor and ropes on top of the masses
+
+    def _supply(self, work_kwh):
+        # Work the motor does on the ropes -> energy drawn from the supply
+        return work_kwh / self.motor_efficiency if work_kwh > 0 else work_kwh * self.regen_efficiency
+
+    def floor_kwh(self, load_kg, going_up):
+        """One floor of travel at rated speed."""
+        imbalance = self.car_mass_kg + load_kg - self.counterweight_kg  # car side heavier if > 0
+        work = imbalance * GRAVITY * self.floor_height_m / JOULES_PER_KWH
+        running = self.running_loss_kw * self.floor_height_m / self.speed_m_s / 3600
+        return self._supply(work if going_up else -work) + running
+
+    def start_kwh(self, load_kg):
+        """Accelerating to rated speed at the start of a run and braking at its end."""
+        moving = (self.car_mass_kg + load_kg + self.counterweight_kg) * self.rotating_mass_factor
+        kinetic = 0.5 * moving * self.speed_m_s ** 2 / JOULES_PER_KWH
+        return self._supply(kinetic) + self._supply(-kinetic)
+
+    def round_trip_kwh(self, floors, load_kg):
+        """Out `floors` floors and back. The potential energy cancels; this is what the drive loses."""
+        return floors * (self.floor_kwh(load_kg, True) + self.floor_kwh(load_kg, False))
+
+    def run_kwh(self, floors, going_up, load_kg):
+        """A run of `floors` floors from standstill to standstill."""
+        if not floors:
+            return 0.0
+        return self.start_kwh(load_kg) + floors * self.floor_kwh(load_kg, going_up)
@@ -0,0 +1,65 @@
+
+class EtaBoard:
+    """
+    Estimated arrival times for the floor displays. A car's estimates are
+    worked out once per plan, by walking its stops in serving order and
+    adding travel and dwell time, and kept until the stops change (the
+    RequestQueue version moves). Between plan changes the car only moves
+    along that route, so an estimate is the cached one less the floors
+    covered since, and refreshing every display each tick is a dict lookup
+    per floor whatever the number of floors.
+    """
+    def __init__(self, control_strategy=None, floor_time=1.5, stop_time=4.0):
+        self.control_strategy = control_strategy
+        self.floor_time = floor_time
+        self.stop_time = stop_time
+        self.plans = {}  # controller -> (plan version, floor when estimated, floor -> seconds)
+        self.recomputed = 0
+
+    def _plan_etas(self, elevator_controller):
+        strategy = self.control_strategy or elevator_controller.get_control_strategy()
+        version = strategy.plan_version(elevator_controller)
+        cached = self.plans.get(elevator_controller)
+        if cached is not None and cached[0] == version:
+            return cached
+        version, stops = strategy.plan(elevator_controller)
+        origin = elevator_controller.elevator_car.current_floor
+        etas = {}
+        position, seconds = origin, 0.0
+        for floor in stops:
+            seconds += abs(floor - position) * self.floor_time
+            etas[floor] = seconds
+            seconds += self.stop_time
+            position = floor
+        cached = self.plans[elevator_controller] = (version, origin, etas)
+        self.recomputed += 1
+        return cached
+
+    def eta(self, elevator_controller, floor):
+        """Seconds until the car reaches `floor`, or None if it is not one of its stops."""
+        _, origin, etas = self._plan_etas(elevator_controller)
+        eta = etas.get(floor)
+        if eta is None:
+            return None
+        travelled = abs(elevator_controller.elevator_car.current_floor - origin)
+        return max(0.0, eta - travelled * self.floor_time)
+
+    def refresh(self, floors, assignments):
+        """
+        Update every floor's display from the cars assigned to its hall
+        calls; assignments maps floor id -> elevator controllers, one per lit
+        direction. The display follows the car that arrives first. Floors
+        without a call show no estimate.
+        """
+        for floor in floors:
+            soonest, soonest_eta = None, None
+            for elevator_controller in assignments.get(floor.id, ()):
+                eta = self.eta(elevator_controller, floor.id)
+                if soonest is None or (eta is not None and (soonest_eta is None or eta < soonest_eta)):
+                    soonest, soonest_eta = elevator_controller, eta
+            if soonest is None:
+                floor.display.set_eta(None)
+                continue
+            elevator_car = soonest.elevator_car
+            floor.set_display(elevator_car.current_floor, elevator_car.direction)
+            floor.display.set_eta(soonest_eta)
@@ -1,5 +1,9 @@
 
+import time
+from .elevator_selection_strategy import EtaStrategy
 from .elevator_system import ElevatorSystem
+from .parking import time_of_day
+from .telemetry import Telemetry
 
 class ExternalDispatcher:
     INSTANCE = None
@@ -8,18 +12,66 @@ class ExternalDispatcher:
         if ExternalDispatcher.INSTANCE is not None:
             raise Exception("ExternalDispatcher is a singleton!")
         ExternalDispatcher.INSTANCE = self
+        # Compares the cars that different banks offer for a call
+        self.eta_strategy = EtaStrategy([])
 
-    def submit_request(self, floor, direction):
+    def submit_request(self, floor, direction, request_id=None, destination=None):
         """
         Use the system's elevator selection strategy to pick an elevator,
-        then pass the request to that elevator's controller.
+        then pass the request to that elevator's controller. In a zoned
+        building the bank covering the trip picks among its cars when the
+        destination is known; otherwise each bank stopping at the floor
+        offers its best car and the one arriving first takes the call.
         """
-        elevator_id = ElevatorSystem.elevator_selection_strategy.select_elevator(floor)
-        print(f"Selected elevator {elevator_id}")
+        if ElevatorSystem.idle_parker is not None:
+            ElevatorSystem.idle_parker.record_call(floor, time_of_day())
+        zone_map = ElevatorSystem.zone_map
+        if zone_map is not None:
+            zone, elevator_id = self._select_in_zones(zone_map, floor, direction, destination)
+            Telemetry.INSTANCE.log("dispatch.selected_in_zone", request=request_id,
+                                   elevator=elevator_id, zone=zone.name)
+        else:
+            elevator_id = ElevatorSystem.elevator_selection_strategy.select_elevator(floor, direction)
+            Telemetry.INSTANCE.log("dispatch.selected", request=request_id, elevator=elevator_id)
+        Telemetry.INSTANCE.dispatched(request_id, elevator_id)
+        ElevatorSystem.INSTANCE.hall_calls.assign(floor, direction, elevator_id)
+        ElevatorSystem.INSTANCE.get_elevator_controller(elevator_id).accept_request(
+            floor, direction, request_id=request_id)
 
-        for e_controller in ElevatorSystem.INSTANCE.get_elevator_controller_list():
-            if e_controller.id == elevator_id:
-                e_controller.accept_request(floor, direction)
+    def _select_in_zones(self, zone_map, floor, direction, destination):
+        if destination is not None:
+            zone, _ = zone_map.route(floor, destination)
+            return zone, zone.select_elevator(floor, direction)
+        best = None
+        for zone in zone_map.zones_for_call(floor, direction):
+            elevator_id = zone.select_elevator(floor, direction)
+            controller = zone.controllers_by_id.get(elevator_id)
+            if controller is None:
+                continue
+            eta = self.eta_strategy.estimate(controller, floor, direction)
+            if best is None or eta < best[0]:
+                best = (eta, zone, elevator_id)
+        if best is None:
+            zone = zone_map.zone_for(floor)
+            return zone, zone.select_elevator(floor, direction)
+        return best[1], best[2]
+
+    def submit_destination_request(self, floor, destination):
+        """
+        Destination dispatch: the hall keypad sends the target floor too, and
+        the passenger is told which elevator to take. In a zoned building that
+        is a car of the bank covering the first leg, up to the transfer floor
+        if the trip needs a change.
+        """
+        zone_map = ElevatorSystem.zone_map
+        if zone_map is None:
+            dispatcher = ElevatorSystem.destination_dispatcher
+        else:
+            zone, destination = zone_map.route(floor, destination)
+            dispatcher = zone.destination_dispatcher
+        elevator_id = dispatcher.submit_request(floor, destination, time.monotonic())
+        Telemetry.INSTANCE.log("dispatch.destination", elevator=elevator_id, floor=destination)
+        return elevator_id
 
 # Create the ExternalDispatcher singleton instance
 ExternalDispatcher()
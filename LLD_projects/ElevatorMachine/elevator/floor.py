@@ -15,6 +15,12 @@ class Floor:
         """
         self.button.press_button(self.id, direction)
 
+    def press_destination(self, destination):
+        """
+        Destination-dispatch keypad: enter the target floor, get an elevator.
+        """
+        return self.button.edispatcher.submit_destination_request(self.id, destination)
+
     def set_display(self, floor, direction):
         self.display.set_floor(floor)
         self.display.set_direction(direction)
@@ -0,0 +1,106 @@
+
+import math
+import time
+from .elevator_selection_strategy import EtaStrategy
+
+class AuctionAssigner:
+    """
+    Assigns a batch of open hall calls to cars at once, instead of one at a
+    time as they come in. Each car offers a few slots, the j-th costing j
+    extra stops on top of its ETA to the call, so piling calls onto one car
+    costs more than spreading them. The calls bid for slots in an auction
+    (Bertsekas): a call takes the slot that is cheapest for it at current
+    prices and raises that slot's price by its margin over the runner-up
+    plus epsilon, and whoever held it bids again. The result is within
+    epsilon per call of the cheapest assignment.
+
+    Moving a call away from the car that already has it costs
+    switch_penalty, so calls only move for a clear gain, and calls already
+    close to their best car keep it without bidding. The pass is bounded by
+    time_budget seconds: calls still bidding then stay with their car.
+    """
+    def __init__(self, elevator_controller_list, control_strategy=None, eta_strategy=None,
+                 switch_penalty=30.0, epsilon=2.0, time_budget=0.05):
+        self.elevator_controller_list = elevator_controller_list
+        self.eta_strategy = eta_strategy or EtaStrategy(elevator_controller_list, control_strategy)
+        self.slot_cost = self.eta_strategy.stop_time
+        self.switch_penalty = switch_penalty
+        self.epsilon = epsilon
+        self.time_budget = time_budget
+        self.timed_out = 0
+
+    def assign(self, calls, current):
+        """
+        calls is a list of (floor, direction) and current the id of the car
+        each one is assigned to now (or None). Returns the car id for each.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        controllers = self.elevator_controller_list
+        if not calls or not controllers:
+            return list(current)
+        estimate = self.eta_strategy.estimate_from
+        states = [self.eta_strategy.car_state(controller) for controller in controllers]
+        ids = [controller.id for controller in controllers]
+        # The car holding a call already counts a stop for it in its route
+        kept = -self.slot_cost
+        costs = [[estimate(state, floor, direction) + (kept if car_id == held_by else self.switch_penalty)
+                  for state, car_id in zip(states, ids)]
+                 for (floor, direction), held_by in zip(calls, current)]
+        slots = min(len(calls), math.ceil(len(calls) / len(controllers)) + 1)
+        held = self._auction(costs, [ids.index(car_id) if car_id in ids else None for car_id in current],
+                             slots, deadline)
+        return [ids[car] if car is not None else car_id for car, car_id in zip(held, current)]
+
+    def _auction(self, costs, current, slots, deadline):
+        """Car index for every call; None for those still bidding at the deadline."""
+        cars = range(len(costs[0]))
+        # Slot j of a car starts at the price of j extra stops
+        prices = [[j * self.slot_cost for j in range(slots)] for _ in cars]
+        owners = [[None] * slots for _ in cars]
+        held = [None] * len(costs)
+        unplaced = []
+        # Calls already within epsilon of their best car keep it to begin
+        # with; only the others bid, which in steady running is a handful
+        for call in range(len(costs) - 1, -1, -1):
+            car = current[call]
+            if car is not None and None in owners[car]:
+                slot = owners[car].index(None)
+                if costs[call][car] + prices[car][slot] <= min(costs[call]) + self.epsilon:
+                    owners[car][slot] = call
+                    held[call] = car
+                    continue
+            unplaced.append(call)
+        cheapest = [min(car_prices) for car_prices in prices]
+        bids = 0
+        while unplaced:
+            bids += 1
+            if bids % 64 == 0 and time.perf_counter() > deadline:
+                self.timed_out += 1
+                break
+            call = unplaced.pop()
+            row = costs[call]
+            best = second = math.inf
+            best_car = None
+            for car in cars:
+                total = row[car] + cheapest[car]
+                if total < best:
+                    best, second, best_car = total, best, car
+                elif total < second:
+                    second = total
+            car_prices = prices[best_car]
+            slot = car_prices.index(cheapest[best_car])
+            if slots > 1:
+                # The same car's next cheapest slot is a runner-up too
+                runner_up = min(price for j, price in enumerate(car_prices) if j != slot)
+                second = min(second, row[best_car] + runner_up)
+            if second == math.inf:
+                second = best
+            car_prices[slot] += second - best + self.epsilon
+            cheapest[best_car] = min(car_prices)
+            outbid = owners[best_car][slot]
+            owners[best_car][slot] = call
+            held[call] = best_car
+            if outbid is not None:
+                held[outbid] = None
+                unplaced.append(outbid)
+        return held
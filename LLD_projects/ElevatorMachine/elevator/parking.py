@@ -0,0 +1,111 @@
+
+import time
+
+SECONDS_PER_SLOT = 3600  # demand is kept per hour of the day
+
+def time_of_day():
+    """Seconds since local midnight, the clock the demand model buckets calls by."""
+    now = time.localtime()
+    return now.tm_hour * 3600 + now.tm_min * 60 + now.tm_sec
+
+class CallRingBuffer:
+    """
+    The last `capacity` hall calls, with per-floor counts kept in step: a new
+    call overwrites the oldest and moves one count, so recording is O(1).
+    """
+    def __init__(self, floors, capacity):
+        self.calls = [None] * capacity
+        self.next = 0
+        self.size = 0
+        self.counts = [0] * floors
+
+    def record(self, floor):
+        if not 0 <= floor < len(self.counts):
+            raise Exception(f"Floor {floor} is outside the {len(self.counts)} floors this buffer counts")
+        oldest = self.calls[self.next]
+        if oldest is None:
+            self.size += 1
+        else:
+            self.counts[oldest] -= 1
+        self.calls[self.next] = floor
+        self.counts[floor] += 1
+        self.next = (self.next + 1) % len(self.calls)
+
+class DemandModel:
+    """
+    Expected share of hall calls per floor at a time of day. Every hour of
+    the day has a ring buffer of the calls last seen in that hour, which
+    carries over from one day to the next; a short buffer of the latest calls
+    follows the current pattern, and stands in while an hour has no history.
+    """
+    def __init__(self, floors, calls_per_slot=2000, recent_calls=200, recent_weight=0.5):
+        self.floors = floors
+        self.slots = [CallRingBuffer(floors, calls_per_slot) for _ in range(86400 // SECONDS_PER_SLOT)]
+        self.recent = CallRingBuffer(floors, recent_calls)
+        self.recent_weight = recent_weight
+
+    def slot(self, now):
+        return int(now // SECONDS_PER_SLOT) % len(self.slots)
+
+    def record_call(self, floor, now):
+        self.slots[self.slot(now)].record(floor)
+        self.recent.record(floor)
+
+    def demand(self, now):
+        """Share of calls expected at each floor; all zeros with no history."""
+        parts = [(buffer, weight) for buffer, weight in
+                 ((self.slots[self.slot(now)], 1 - self.recent_weight), (self.recent, self.recent_weight))
+                 if buffer.size]
+        total_weight = sum(weight for _, weight in parts)
+        demand = [0.0] * self.floors
+        for buffer, weight in parts:
+            scale = weight / total_weight / buffer.size
+            for floor, count in enumerate(buffer.counts):
+                if count:
+                    demand[floor] += count * scale
+        return demand
+
+class IdleCarParker:
+    """
+    Decides where idle cars wait. With k cars idle their park floors are the
+    k quantiles of the expected demand (the middle of k equal shares), which
+    for calls along a shaft keeps the distance from a call to the nearest
+    idle car short: the lobby at the morning peak, the upper floors at the
+    evening one. A car that goes idle takes the park floor nearest to it
+    that no other idle car holds.
+    """
+    def __init__(self, floors, demand_model=None):
+        self.demand_model = demand_model or DemandModel(floors)
+
+    def record_call(self, floor, now):
+        self.demand_model.record_call(floor, now)
+
+    def park_floors(self, count, now):
+        demand = self.demand_model.demand(now)
+        floors = []
+        cumulative = 0.0
+        last = None
+        for floor, share in enumerate(demand):
+            if not share:
+                continue
+            cumulative += share
+            last = floor
+            while len(floors) < count and cumulative >= (len(floors) + 0.5) / count:
+                floors.append(floor)
+        # Rounding can leave the top quantile short of the last floor
+        if last is not None:
+            floors.extend([last] * (count - len(floors)))
+        return floors
+
+    def choose(self, current_floor, taken, now):
+        """
+        Park floor for a car that just went idle at current_floor, given the
+        floors other idle cars hold. None means wait where it is.
+        """
+        candidates = self.park_floors(len(taken) + 1, now)
+        for floor in taken:
+            if floor in candidates:
+                candidates.remove(floor)
+        if not candidates:
+            return None
+        return min(candidates, key=lambda floor: abs(floor - current_floor))
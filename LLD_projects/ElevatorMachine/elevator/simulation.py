@@ -0,0 +1,567 @@
+
+import heapq
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .direction import Direction
+from .elevator_car import AVERAGE_PASSENGER_KG, ElevatorCar
+from .elevator_controller import ElevatorController
+from .elevator_control_strategy import LookAlgorithm
+from .elevator_selection_strategy import OddEvenStrategy
+from .group_control import AuctionAssigner
+from .zoning import Bank, ZoneMap
+from .parking import IdleCarParker
+
+UP_PEAK = "up_peak"
+DOWN_PEAK = "down_peak"
+INTER_FLOOR = "inter_floor"
+
+LOBBY = 0
+
+
+@dataclass
+class BuildingConfig:
+    floors: int = 50
+    cars: int = 16
+    floor_travel_time: float = 1.5  # seconds per floor at rated speed
+    door_time: float = 4.0          # open + close
+    boarding_time: float = 1.0      # per passenger getting on or off
+    car_capacity: int = 13          # passengers
+    car_max_load_kg: float = 1000.0
+    reassign_interval: float = 2.0  # seconds between batch reassignments, when enabled
+
+
+@dataclass
+class TrafficPhase:
+    start_hour: float
+    end_hour: float
+    passengers_per_hour: float
+    pattern: str
+
+
+# A typical office day: morning up-peak, lunch, evening down-peak
+OFFICE_DAY = [
+    TrafficPhase(0, 7, 20, INTER_FLOOR),
+    TrafficPhase(7, 8, 900, UP_PEAK),
+    TrafficPhase(8, 9, 2000, UP_PEAK),
+    TrafficPhase(9, 10, 700, UP_PEAK),
+    TrafficPhase(10, 12, 400, INTER_FLOOR),
+    TrafficPhase(12, 14, 900, INTER_FLOOR),
+    TrafficPhase(14, 17, 400, INTER_FLOOR),
+    TrafficPhase(17, 19, 1800, DOWN_PEAK),
+    TrafficPhase(19, 24, 60, INTER_FLOOR),
+]
+
+
+@dataclass
+class Passenger:
+    id: int
+    origin: int
+    destination: int
+    arrival_time: float
+    board_time: Optional[float] = None
+    alight_time: Optional[float] = None
+    assigned_car: Optional[int] = None
+    stops_ridden: int = 0  # intermediate stops while aboard
+    weight_kg: float = AVERAGE_PASSENGER_KG
+    # In a zoned building origin/destination are the leg being ridden, and the
+    # trip's real destination waits here until the last change of banks
+    final_destination: Optional[int] = None
+    transfers: int = 0
+    riding: bool = False
+
+    @property
+    def direction(self):
+        return Direction.UP if self.destination > self.origin else Direction.DOWN
+
+
+def _trip(pattern, floors, rng):
+    # Peaks are mostly to/from the lobby; the rest is random floor pairs
+    if pattern == UP_PEAK and rng.random() < 0.85:
+        return LOBBY, rng.randrange(1, floors)
+    if pattern == DOWN_PEAK and rng.random() < 0.85:
+        return rng.randrange(1, floors), LOBBY
+    origin = rng.randrange(floors)
+    destination = rng.randrange(floors - 1)
+    if destination >= origin:
+        destination += 1
+    return origin, destination
+
+
+def generate_passengers(phases, floors, seed=0):
+    """Poisson arrivals per phase, sorted by arrival time."""
+    rng = random.Random(seed)
+    passengers = []
+    for phase in phases:
+        if phase.passengers_per_hour <= 0:
+            continue
+        now = phase.start_hour * 3600
+        end = phase.end_hour * 3600
+        rate = phase.passengers_per_hour / 3600
+        while True:
+            now += rng.expovariate(rate)
+            if now >= end:
+                break
+            origin, destination = _trip(phase.pattern, floors, rng)
+            weight = min(150.0, max(40.0, rng.gauss(AVERAGE_PASSENGER_KG, 12)))
+            passengers.append(Passenger(len(passengers), origin, destination, now, weight_kg=weight))
+    return passengers
+
+
+@dataclass
+class SimulationReport:
+    passengers: int
+    delivered: int
+    average_wait: float
+    p95_wait: float
+    max_wait: float
+    average_journey: float
+    average_ride_stops: float
+    energy_kwh: float           # net of what the drives fed back
+    regenerated_kwh: float
+    stops: int
+    floors_travelled: int
+    throughput_per_hour: float  # delivered over the span from first arrival to last drop-off
+    rejected_boardings: int     # times a passenger was left behind by a full car
+    car_utilization: Dict[int, float]  # time-averaged load / capacity per car
+    events: int
+    wall_seconds: float
+    reassigned_calls: int = 0   # hall calls moved to another car by batch assignment
+
+    def summary(self):
+        return (f"{self.delivered}/{self.passengers} passengers, "
+                f"wait avg {self.average_wait:.1f}s p95 {self.p95_wait:.1f}s max {self.max_wait:.0f}s, "
+                f"journey avg {self.average_journey:.1f}s ({self.average_ride_stops:.1f} stops on board), "
+                f"{self.throughput_per_hour:.0f}/h, {self.energy_kwh:.1f} kWh "
+                f"({self.regenerated_kwh:.1f} regenerated), "
+                f"{self.rejected_boardings} left behind, load avg "
+                f"{sum(self.car_utilization.values()) / max(1, len(self.car_utilization)):.0%} "
+                f"max {max(self.car_utilization.values(), default=0):.0%}, "
+                f"{self.stops} stops, {self.events} events in {self.wall_seconds:.2f}s")
+
+
+class _CarState:
+    __slots__ = ("controller", "riders", "moving_to", "moving", "scheduled",
+                 "stops", "floors_travelled", "load_seconds", "load_since")
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.riders = []
+        self.moving_to = None
+        self.moving = False
+        self.scheduled = False
+        self.stops = 0
+        self.floors_travelled = 0
+        self.load_seconds = 0.0  # integral of riders over time
+        self.load_since = None
+
+
+_ARRIVAL = 0
+_STEP = 1
+_PRESS_AGAIN = 2
+_REASSIGN = 3
+
+
+class ElevatorSimulation:
+    """
+    Discrete-event simulation of a building: a heap of timed events drives
+    ElevatorCar state directly (no prints, no sleeping) with a simulated clock.
+
+    Hall calls go through the selection strategy like ExternalDispatcher does;
+    the control strategy (a LookAlgorithm) owns each car's stop queue. Cars
+    advance one floor per step, so a call on the way is picked up before the
+    car passes the floor. Passengers waiting at a floor board any car that
+    stops there going their way (or idle) whose bank serves their destination,
+    not only the car their hall call was assigned to, and then press their
+    destination. A hall call
+    brings one more car for every full load of people waiting behind it, and
+    whoever does not fit (capacity or weight) is handed to another car as the
+    full one leaves.
+
+    With destination_dispatch=True, passengers enter their destination at the
+    hall instead and a DestinationDispatcher assigns their car; they board
+    that car only.
+
+    `banks` splits the cars into zones (see zoning.Bank), each with its own
+    selection strategy or destination dispatcher. Trips that no bank covers
+    change cars at a transfer floor. By default one bank serves every floor.
+
+    With parking=True, a car left without stops drives to a park floor picked
+    by its bank's IdleCarParker from the calls seen so far, instead of waiting
+    where it stopped.
+
+    With batch_assignment=True, every reassign_interval an AuctionAssigner
+    per bank reassigns all unanswered hall calls across the bank's cars;
+    a call moves to another car when that saves time overall.
+    """
+
+    def __init__(self, config=None, selection_strategy_class=OddEvenStrategy,
+                 control_strategy=None, destination_dispatch=False, banks=None, parking=False,
+                 batch_assignment=False):
+        self.config = config or BuildingConfig()
+        self.controllers = [
+            ElevatorController(i, ElevatorCar(i, self.config.car_capacity, self.config.car_max_load_kg))
+            for i in range(1, self.config.cars + 1)
+        ]
+        self.cars = {c.id: _CarState(c) for c in self.controllers}
+        self.control_strategy = control_strategy or LookAlgorithm()
+        if banks is None:
+            banks = [Bank("all", range(self.config.floors), self.config.cars)]
+        self.zone_map = ZoneMap.from_banks(self.controllers, banks, selection_strategy_class,
+                                           self.control_strategy, destination_dispatch)
+        self.destination_dispatch = destination_dispatch
+        self.parkers = {zone.name: IdleCarParker(self.config.floors)
+                        for zone in self.zone_map.zones} if parking else {}
+        self.idle: Dict[int, int] = {}  # idle car id -> floor it waits at or is parking on
+        self.assigners = {zone.name: AuctionAssigner(zone.elevator_controller_list, self.control_strategy)
+                          for zone in self.zone_map.zones} \
+            if batch_assignment and not destination_dispatch else {}
+        self.reassigned = 0
+        self.now = 0.0
+        self.events = []
+        self.seq = 0
+        self.processed = 0
+        self.rejected_boardings = 0
+        # (floor, direction, zone) -> assigned car id; (floor, direction) -> passengers waiting
+        self.hall_calls: Dict[Tuple[int, Direction, str], int] = {}
+        self.waiting: Dict[Tuple[int, Direction], List[Passenger]] = {}
+
+    def _schedule(self, when, kind, payload):
+        self.seq += 1
+        heapq.heappush(self.events, (when, self.seq, kind, payload))
+
+    def _wake(self, state):
+        if not state.scheduled:
+            state.scheduled = True
+            self._schedule(self.now, _STEP, state)
+
+    def run(self, passengers: List[Passenger]) -> SimulationReport:
+        start = time.perf_counter()
+        for passenger in passengers:
+            self._schedule(passenger.arrival_time, _ARRIVAL, passenger)
+        if self.assigners and passengers:
+            self._schedule(passengers[0].arrival_time, _REASSIGN, None)
+        while self.events:
+            self.now, _, kind, payload = heapq.heappop(self.events)
+            self.processed += 1
+            if kind == _ARRIVAL:
+                self._on_arrival(payload)
+            elif kind == _PRESS_AGAIN:
+                self._press_again(payload)
+            elif kind == _REASSIGN:
+                self._reassign()
+            else:
+                self._on_step(payload)
+        return self._report(passengers, time.perf_counter() - start)
+
+    def _on_arrival(self, passenger):
+        zone, leg = self.zone_map.route(passenger.origin, passenger.destination)
+        if self.parkers:
+            self.parkers[zone.name].record_call(passenger.origin, self.now)
+        if leg != passenger.destination:
+            passenger.final_destination = passenger.destination
+            passenger.destination = leg
+        self.waiting.setdefault((passenger.origin, passenger.direction), []).append(passenger)
+        self._call_car(passenger)
+
+    def _call_car(self, passenger):
+        """The passenger presses the hall button, or keys in a destination."""
+        zone, _ = self.zone_map.route(passenger.origin, passenger.destination)
+        key = (passenger.origin, passenger.direction, zone.name)
+        if self.destination_dispatch:
+            car_id = zone.destination_dispatcher.submit_request(
+                passenger.origin, passenger.destination, self.now)
+            self._wake(self.cars[car_id])
+            passenger.assigned_car = car_id
+            return
+        car_id = self.hall_calls.get(key)
+        if car_id is None:
+            # Button not lit yet: dispatch a car for it
+            car_id = self._dispatch(zone, key)
+        else:
+            # The call carries how many are waiting: once the car answering it
+            # has a full load here, the next person brings another car
+            called = [p.assigned_car for p in self.waiting.get(key[:2], ()) if p is not passenger]
+            if called.count(car_id) >= self.config.car_capacity:
+                car_id = self._dispatch(zone, key, exclude=set(called)) or car_id
+        passenger.assigned_car = car_id
+
+    def _dispatch(self, zone, key, exclude=()):
+        """Select a car for the hall call `key`; None if every car is excluded."""
+        floor, direction, _ = key
+        car_id = zone.select_elevator(floor, direction, exclude=exclude)
+        if car_id in exclude or car_id not in zone.controllers_by_id:
+            return None
+        self.hall_calls[key] = car_id
+        self.control_strategy.add_request(floor, direction, zone.get_controller(car_id))
+        self._wake(self.cars[car_id])
+        return car_id
+
+    def _press_again(self, passengers):
+        """Passengers a car had no room for call again."""
+        blocked = []
+        for passenger in passengers:
+            if passenger.riding:
+                continue
+            state = self.cars[passenger.assigned_car]
+            car = state.controller.elevator_car
+            if state.moving_to is None and car.current_floor == passenger.origin \
+                    and not car.can_board(passenger.weight_kg):
+                # Still standing here with no room: wait for it to leave
+                blocked.append(passenger)
+            else:
+                self._call_car(passenger)
+        if blocked:
+            self._schedule(self.now + self.config.floor_travel_time, _PRESS_AGAIN, blocked)
+
+    def _reassign(self):
+        """Batch pass over the open hall calls of every bank."""
+        calls = {}
+        for key, car_id in self.hall_calls.items():
+            state = self.cars[car_id]
+            floor = key[0]
+            # A car already stopping there, or one floor away, keeps the call
+            if state.moving_to == floor or (state.moving_to is None and
+                                            state.controller.elevator_car.current_floor == floor):
+                continue
+            # A call big enough to have brought several cars stays as it is
+            zone_cars = self.zone_map.zone_of(car_id).controllers_by_id
+            if any(p.assigned_car != car_id and p.assigned_car in zone_cars
+                   for p in self.waiting.get(key[:2], ())):
+                continue
+            calls.setdefault(key[2], []).append(key)
+        for zone_name, keys in calls.items():
+            zone = self.zone_map.zone_of(self.hall_calls[keys[0]])
+            current = [self.hall_calls[key] for key in keys]
+            assigned = self.assigners[zone_name].assign([key[:2] for key in keys], current)
+            for key, old_id, new_id in zip(keys, current, assigned):
+                if new_id != old_id:
+                    self._move_call(zone, key, old_id, new_id)
+        # Keep ticking while anything else is still to happen
+        if self.events:
+            self._schedule(self.now + self.config.reassign_interval, _REASSIGN, None)
+
+    def _move_call(self, zone, key, old_id, new_id):
+        floor, direction, _ = key
+        if not self.control_strategy.remove_request(floor, direction, zone.get_controller(old_id)):
+            return
+        self.control_strategy.add_request(floor, direction, zone.get_controller(new_id))
+        self.hall_calls[key] = new_id
+        for passenger in self.waiting.get((floor, direction), ()):
+            if passenger.assigned_car == old_id:
+                passenger.assigned_car = new_id
+        self.reassigned += 1
+        self._wake(self.cars[new_id])
+
+    def _on_step(self, state):
+        state.scheduled = False
+        controller = state.controller
+        car = controller.elevator_car
+        if state.moving_to is not None:
+            car.current_floor = state.moving_to
+            state.moving_to = None
+            car.set_display()
+
+        stop = self.control_strategy.next_stop(controller)
+        if stop is None:
+            target = self._park(state)
+            if target is None:
+                state.moving = False
+                car.direction = Direction.NONE
+                car.set_display()
+                return
+        else:
+            self.idle.pop(controller.id, None)
+            target = stop[0]
+
+        if target == car.current_floor:
+            state.moving = False
+            dwell = self._serve_stop(state)
+        else:
+            if not state.moving:
+                state.moving = True
+                car.charge(car.energy_model.start_kwh(car.load_kg))
+            car.direction = Direction.UP if target > car.current_floor else Direction.DOWN
+            car.charge(car.energy_model.floor_kwh(car.load_kg, car.direction == Direction.UP))
+            state.moving_to = car.current_floor + (1 if car.direction == Direction.UP else -1)
+            state.floors_travelled += 1
+            dwell = self.config.floor_travel_time
+        state.scheduled = True
+        self._schedule(self.now + dwell, _STEP, state)
+
+    def _park(self, state):
+        """Floor an idle car should head for, or None to wait where it is."""
+        if not self.parkers:
+            return None
+        car_id = state.controller.id
+        current = state.controller.elevator_car.current_floor
+        target = self.idle.get(car_id)
+        if target is None:
+            zone = self.zone_map.zone_of(car_id)
+            taken = [floor for other, floor in self.idle.items() if self.zone_map.zone_of(other) is zone]
+            target = self.parkers[zone.name].choose(current, taken, self.now)
+            if target is None:
+                target = current
+            self.idle[car_id] = target
+        return None if target == current else target
+
+    def _serve_stop(self, state):
+        """Open the doors: unload, clear the requests for this floor, then load."""
+        controller = state.controller
+        car = controller.elevator_car
+        floor = car.current_floor
+        self._track_load(state)
+
+        zone = self.zone_map.zone_of(controller.id)
+        staying = []
+        changing = []
+        alighted = 0
+        for rider in state.riders:
+            if rider.destination == floor:
+                rider.riding = False
+                if rider.final_destination is None:
+                    rider.alight_time = self.now
+                else:
+                    # Off at the sky lobby, over to the next bank
+                    rider.origin, rider.destination = floor, rider.final_destination
+                    rider.final_destination = None
+                    rider.transfers += 1
+                    changing.append(rider)
+                car.alight(rider.weight_kg)
+                alighted += 1
+            else:
+                rider.stops_ridden += 1
+                staying.append(rider)
+        state.riders = staying
+
+        # After unloading, so a car that was full can take this floor's hall calls
+        while True:
+            stop = self.control_strategy.next_stop(controller)
+            if stop is None or stop[0] != floor:
+                break
+            _, _, travel = self.control_strategy.pop_next_stop(controller)
+            car.direction = travel
+
+        boarded = 0
+        left_behind = []
+        for direction in (Direction.UP, Direction.DOWN):
+            call = (floor, direction, zone.name)
+            if self.hall_calls.get(call) == controller.id:
+                del self.hall_calls[call]
+            key = (floor, direction)
+            waiting = self.waiting.get(key)
+            if not waiting:
+                continue
+            # With hall buttons anyone going this car's way gets on, if the
+            # car's bank stops at their floor; with destination dispatch only
+            # the passengers assigned to it. Either way, only as long as they fit.
+            takes_any = not self.destination_dispatch and car.direction in (direction, Direction.NONE)
+            remaining = []
+            for passenger in waiting:
+                if passenger.assigned_car != controller.id and \
+                        not (takes_any and zone.serves(passenger.destination)):
+                    remaining.append(passenger)
+                elif car.board(passenger.weight_kg):
+                    passenger.riding = True
+                    if passenger.board_time is None:
+                        passenger.board_time = self.now
+                    state.riders.append(passenger)
+                    self.control_strategy.add_request(passenger.destination, direction,
+                                                      controller, car_call=True)
+                    boarded += 1
+                elif passenger.assigned_car == controller.id:
+                    remaining.append(passenger)
+                    left_behind.append(passenger)
+                else:
+                    remaining.append(passenger)
+            self.waiting[key] = remaining
+        if self.destination_dispatch:
+            zone.destination_dispatcher.pick_up(controller.id, floor)
+        for rider in changing:
+            self._schedule(self.now, _ARRIVAL, rider)
+
+        state.stops += 1
+        dwell = self.config.door_time + self.config.boarding_time * (alighted + boarded)
+        if left_behind:
+            self.rejected_boardings += len(left_behind)
+            left_behind = self._send_another_car(zone, controller.id, left_behind)
+        if left_behind:
+            # Pressing again once the car has pulled away, so it does not
+            # reopen straight away for someone it cannot take
+            self._schedule(self.now + dwell + self.config.floor_travel_time, _PRESS_AGAIN, left_behind)
+        return dwell
+
+    def _send_another_car(self, zone, full_car_id, left_behind):
+        """
+        With hall buttons, a car leaving people behind hands their call to
+        another car of the bank straight away, so a busy floor gets as many
+        cars as it needs rather than one at a time. Returns whoever still has
+        to press again: everyone with destination dispatch, or when the
+        bank has no other car.
+        """
+        if self.destination_dispatch:
+            return left_behind
+        still_waiting = []
+        sent = {}
+        for passenger in left_behind:
+            key = (passenger.origin, passenger.direction, zone.name)
+            car_id = sent.get(key) or self.hall_calls.get(key)
+            if car_id is None or car_id == full_car_id:
+                car_id = self._dispatch(zone, key, exclude={full_car_id})
+                if car_id is None:
+                    still_waiting.append(passenger)
+                    continue
+            sent[key] = car_id
+            passenger.assigned_car = car_id
+        return still_waiting
+
+    def _track_load(self, state):
+        if state.load_since is not None:
+            state.load_seconds += state.controller.elevator_car.load * (self.now - state.load_since)
+        state.load_since = self.now
+
+    def _report(self, passengers, wall_seconds):
+        delivered = [p for p in passengers if p.alight_time is not None]
+        waits = sorted(p.board_time - p.arrival_time for p in delivered)
+        journeys = [p.alight_time - p.arrival_time for p in delivered]
+        span = max(p.alight_time for p in delivered) - passengers[0].arrival_time if delivered else 0.0
+        states = self.cars.values()
+        for state in states:
+            self._track_load(state)
+        floors = sum(s.floors_travelled for s in states)
+        cars = [state.controller.elevator_car for state in states]
+        return SimulationReport(
+            passengers=len(passengers),
+            delivered=len(delivered),
+            average_wait=sum(waits) / len(waits) if waits else 0.0,
+            p95_wait=waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            max_wait=waits[-1] if waits else 0.0,
+            average_journey=sum(journeys) / len(journeys) if journeys else 0.0,
+            average_ride_stops=sum(p.stops_ridden for p in delivered) / len(delivered) if delivered else 0.0,
+            energy_kwh=sum(car.energy_kwh for car in cars),
+            regenerated_kwh=sum(car.energy_regenerated_kwh for car in cars),
+            stops=sum(s.stops for s in states),
+            floors_travelled=floors,
+            throughput_per_hour=len(delivered) * 3600 / span if span else 0.0,
+            rejected_boardings=self.rejected_boardings,
+            car_utilization={
+                car_id: state.load_seconds / (self.config.car_capacity * span) if span else 0.0
+                for car_id, state in self.cars.items()
+            },
+            events=self.processed,
+            wall_seconds=wall_seconds,
+            reassigned_calls=self.reassigned,
+        )
+
+
+def simulate_day(config=None, phases=OFFICE_DAY, selection_strategy_class=OddEvenStrategy, seed=0,
+                 destination_dispatch=False, banks=None, parking=False, batch_assignment=False,
+                 control_strategy_class=LookAlgorithm):
+    config = config or BuildingConfig()
+    passengers = generate_passengers(phases, config.floors, seed)
+    simulation = ElevatorSimulation(config, selection_strategy_class, control_strategy_class(),
+                                    destination_dispatch=destination_dispatch, banks=banks,
+                                    parking=parking, batch_assignment=batch_assignment)
+    return simulation.run(passengers)
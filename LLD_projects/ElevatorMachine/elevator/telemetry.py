@@ -0,0 +1,207 @@
+
+import bisect
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+# Console text for each event, as the components used to print it. Only
+# PrintSink formats these; other sinks keep the raw fields.
+MESSAGES = {
+    "button.hall": "Pressed {direction} from floor {floor}",
+    "button.car": "Pressed floor {floor} from elevator {elevator}",
+    "button.hall_lit": "Floor {floor} {direction} already called",
+    "button.car_lit": "Floor {floor} already selected in elevator {elevator}",
+    "dispatch.selected": "Selected elevator {elevator}",
+    "dispatch.selected_in_zone": "Selected elevator {elevator} ({zone})",
+    "dispatch.destination": "Take elevator {elevator} to floor {floor}",
+    "controller.moved": "Elevator moving...",
+    "car.moving": "Elevator {elevator} moving {direction}",
+    "car.stopped": "Elevator {elevator} stops at floor {floor}",
+    "door.opened": "Door opens for elevator {elevator}",
+    "door.closed": "Door closes for elevator {elevator}",
+    "system.parking": "Parking elevator {elevator} at floor {floor}",
+}
+
+HALL_CALL = "hall"
+CAR_CALL = "car"
+
+class LogSink(ABC):
+    @abstractmethod
+    def emit(self, timestamp, event, fields):
+        pass
+
+class PrintSink(LogSink):
+    """Prints events the way the components always have."""
+    def emit(self, timestamp, event, fields):
+        print(MESSAGES[event].format(**fields))
+
+class MemorySink(LogSink):
+    """Keeps the last `capacity` events as (timestamp, event, fields), no I/O."""
+    def __init__(self, capacity=10000):
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, timestamp, event, fields):
+        self.records.append((timestamp, event, fields))
+
+class JsonLinesSink(LogSink):
+    """One JSON object per event, for shipping to a log pipeline."""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def emit(self, timestamp, event, fields):
+        self.stream.write(json.dumps({"ts": timestamp, "event": event, **fields}) + "\n")
+
+class Histogram:
+    """
+    Fixed log-spaced buckets (25% apart) from 10 us to about 20 minutes, so
+    recording is a bisect and an increment, and percentiles are read off the
+    bucket counts.
+    """
+    BOUNDS = [0.00001 * 1.25 ** i for i in range(84)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+class RequestTrace:
+    """One hall or car call and the times it reached each stage."""
+    __slots__ = ("id", "kind", "floor", "direction", "elevator_id",
+                 "pressed", "dispatched", "queued", "served")
+
+    def __init__(self, id, kind, floor, direction, elevator_id, pressed):
+        self.id = id
+        self.kind = kind
+        self.floor = floor
+        self.direction = direction
+        self.elevator_id = elevator_id
+        self.pressed = pressed
+        self.dispatched = None  # elevator chosen
+        self.queued = None      # accepted by the elevator's controller
+        self.served = None      # car stopped at the floor
+
+class Telemetry:
+    """
+    Request tracing and event logging for the elevator components.
+
+    Every button press opens a RequestTrace with its own id. The dispatcher
+    and controller stamp it as it moves along, and it is closed when its car
+    stops at its floor; open requests are indexed by (elevator, floor) so a
+    stop closes all of its requests at once. Stage times feed the histograms:
+    dispatch (press to queued), wait (hall call to pick-up), ride (car call to
+    arrival) and door dwell (open to close). snapshot() copies the
+    aggregates only, so it is cheap to poll.
+
+    Events go to a LogSink. PrintSink keeps the console output; MemorySink or
+    JsonLinesSink take the console off the hot path.
+    """
+    INSTANCE = None
+
+    def __init__(self, sink=None, clock=time.monotonic, keep_traces=1000):
+        if Telemetry.INSTANCE is not None:
+            raise Exception("Telemetry is a singleton!")
+        Telemetry.INSTANCE = self
+        self.sink = sink or PrintSink()
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.open_requests = {}  # request id -> trace
+        self.open_by_stop = {}   # (elevator id, floor) -> request ids
+        self.recent_traces = deque(maxlen=keep_traces)
+        self.doors_opened = {}   # elevator id -> time the door opened
+        self.histograms = {name: Histogram() for name in ("dispatch", "wait", "ride", "door_dwell")}
+
+    def set_sink(self, sink):
+        self.sink = sink
+
+    def log(self, event, **fields):
+        self.sink.emit(self.clock(), event, fields)
+
+    def open_request(self, kind, floor, direction, elevator_id=None):
+        """Returns the new request's id."""
+        with self.lock:
+            request_id = self.next_id
+            self.next_id += 1
+            self.open_requests[request_id] = RequestTrace(
+                request_id, kind, floor, direction, elevator_id, self.clock())
+        return request_id
+
+    def dispatched(self, request_id, elevator_id):
+        with self.lock:
+            trace = self.open_requests.get(request_id)
+            if trace is not None:
+                trace.elevator_id = elevator_id
+                trace.dispatched = self.clock()
+
+    def queued(self, request_id, elevator_id, floor):
+        with self.lock:
+            trace = self.open_requests.get(request_id)
+            if trace is None:
+                return
+            trace.elevator_id = elevator_id
+            trace.queued = self.clock()
+            self.histograms["dispatch"].record(trace.queued - trace.pressed)
+            self.open_by_stop.setdefault((elevator_id, floor), []).append(request_id)
+
+    def stopped(self, elevator_id, floor):
+        """The car has stopped at `floor`: every request waiting for that closes."""
+        with self.lock:
+            request_ids = self.open_by_stop.pop((elevator_id, floor), None)
+            if not request_ids:
+                return
+            now = self.clock()
+            for request_id in request_ids:
+                trace = self.open_requests.pop(request_id)
+                trace.served = now
+                name = "wait" if trace.kind == HALL_CALL else "ride"
+                self.histograms[name].record(now - trace.pressed)
+                self.recent_traces.append(trace)
+
+    def door_opened(self, elevator_id):
+        self.doors_opened[elevator_id] = self.clock()
+
+    def door_closed(self, elevator_id):
+        opened = self.doors_opened.pop(elevator_id, None)
+        if opened is not None:
+            with self.lock:
+                self.histograms["door_dwell"].record(self.clock() - opened)
+
+    def snapshot(self):
+        with self.lock:
+            snapshot = {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+            snapshot["open_requests"] = len(self.open_requests)
+        return snapshot
+
+# Create the Telemetry singleton instance at import time
+Telemetry()
@@ -0,0 +1,150 @@
+
+from collections import deque, namedtuple
+from .direction import Direction
+from .elevator_selection_strategy import EtaStrategy
+from .destination_dispatch import DestinationDispatcher
+
+# One bank of a zoned building: the floors its cars stop at and how many cars
+# it has. An express bank runs non-stop between its lobbies.
+Bank = namedtuple("Bank", "name floors cars express", defaults=(False,))
+
+# 100 floors, 40 cars: two local banks from the main lobby, an express shuttle
+# to the sky lobby on 50, and two local banks from there
+TALL_BUILDING_BANKS = [
+    Bank("low-rise", range(0, 26), 10),
+    Bank("mid-rise", [0] + list(range(26, 50)), 10),
+    Bank("express", [0, 50], 6, express=True),
+    Bank("high-rise", range(50, 76), 7),
+    Bank("top", [50] + list(range(76, 100)), 7),
+]
+
+class Zone:
+    """
+    A bank of cars serving a fixed set of floors. Each zone has its own
+    selection strategy over its own cars (and a destination dispatcher if its
+    halls have keypads), so dispatching a call only looks at the bank's cars.
+    """
+    def __init__(self, name, floors, elevator_controller_list, selection_strategy=None,
+                 control_strategy=None, express=False, destination_dispatcher=None):
+        self.name = name
+        self.floors = frozenset(floors)
+        self.lowest, self.highest = min(self.floors), max(self.floors)
+        self.express = express
+        self.elevator_controller_list = elevator_controller_list
+        self.controllers_by_id = {c.id: c for c in elevator_controller_list}
+        self.selection_strategy = selection_strategy or \
+            EtaStrategy(elevator_controller_list, control_strategy)
+        self.destination_dispatcher = destination_dispatcher
+
+    def serves(self, floor):
+        return floor in self.floors
+
+    def select_elevator(self, floor, direction=None, exclude=()):
+        return self.selection_strategy.select_elevator(floor, direction, exclude)
+
+    def get_controller(self, elevator_id):
+        return self.controllers_by_id[elevator_id]
+
+class ZoneMap:
+    """
+    Routes calls in a zoned building. Every floor has a local zone, the bank
+    whose hall buttons are on that floor; the lobby and sky lobbies are also
+    served by the express banks. A trip that no single bank covers is split
+    at transfer floors, worked out once for every pair of zones, so routing
+    a call is a few list and dict lookups however many floors and cars the
+    building has.
+    """
+    def __init__(self, zones):
+        self.zones = zones
+        floor_count = max(max(zone.floors) for zone in zones) + 1
+        self.local_zones = [None] * floor_count
+        self.zones_at = [[] for _ in range(floor_count)]  # every zone stopping at a floor
+        self.zones_by_elevator = {}
+        for zone in zones:
+            for floor in zone.floors:
+                self.zones_at[floor].append(zone)
+                local = self.local_zones[floor]
+                if local is None or (local.express and not zone.express):
+                    self.local_zones[floor] = zone
+            for controller in zone.elevator_controller_list:
+                self.zones_by_elevator[controller.id] = zone
+        self.transfers = self._plan_transfers()
+
+    @classmethod
+    def from_banks(cls, elevator_controller_list, banks, selection_strategy_class=EtaStrategy,
+                   control_strategy=None, destination_dispatch=False):
+        """Split the cars over the banks in order; each bank takes the next `cars` of them."""
+        zones = []
+        start = 0
+        for bank in banks:
+            controllers = elevator_controller_list[start:start + bank.cars]
+            start += bank.cars
+            dispatcher = DestinationDispatcher(controllers, control_strategy) \
+                if destination_dispatch else None
+            zones.append(Zone(bank.name, bank.floors, controllers,
+                              selection_strategy_class(controllers, control_strategy),
+                              express=bank.express, destination_dispatcher=dispatcher))
+        if start != len(elevator_controller_list):
+            raise Exception(f"Banks use {start} cars but {len(elevator_controller_list)} were given")
+        return cls(zones)
+
+    def _plan_transfers(self):
+        # Breadth-first from every zone over "shares a floor with"; keep the
+        # floor where the first change happens on the shortest chain
+        transfers = {}
+        for source in self.zones:
+            seen = {source.name}
+            queue = deque()
+            for zone in self.zones:
+                shared = source.floors & zone.floors
+                if zone.name not in seen and shared:
+                    seen.add(zone.name)
+                    transfers[(source.name, zone.name)] = (1, min(shared))
+                    queue.append((zone, min(shared), 1))
+            while queue:
+                zone, first_floor, hops = queue.popleft()
+                for following in self.zones:
+                    if following.name not in seen and zone.floors & following.floors:
+                        seen.add(following.name)
+                        transfers[(source.name, following.name)] = (hops + 1, first_floor)
+                        queue.append((following, first_floor, hops + 1))
+        return transfers
+
+    def zone_for(self, floor):
+        """The bank whose hall buttons are on this floor."""
+        return self.local_zones[floor]
+
+    def zones_for_call(self, floor, direction):
+        """
+        Every bank that can answer a hall call at `floor` going `direction`:
+        at a lobby or sky lobby that is the local and the express banks alike.
+        """
+        zones = [zone for zone in self.zones_at[floor]
+                 if not (direction == Direction.UP and zone.highest <= floor)
+                 and not (direction == Direction.DOWN and zone.lowest >= floor)]
+        return zones or [self.local_zones[floor]]
+
+    def zone_of(self, elevator_id):
+        return self.zones_by_elevator[elevator_id]
+
+    def get_controller(self, elevator_id):
+        return self.zones_by_elevator[elevator_id].get_controller(elevator_id)
+
+    def route(self, origin, destination):
+        """
+        First leg of a trip: the zone to board at `origin` and the floor to
+        ride it to, which is the destination or the next transfer floor.
+        """
+        target = self.local_zones[destination]
+        best = None
+        for zone in self.zones_at[origin]:
+            if zone.serves(destination):
+                return zone, destination
+            if target is None:
+                continue
+            hops, floor = self.transfers.get((zone.name, target.name), (None, None))
+            if hops is not None and (best is None or hops < best[0]):
+                best = (hops, zone, floor)
+        if best is None:
+            raise Exception(f"No elevator bank goes from floor {origin} to floor {destination}")
+        return best[1], best[2]
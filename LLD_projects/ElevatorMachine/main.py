@@ -1,4 +1,6 @@
 
+import time
+
 from elevator.elevator_system import ElevatorSystem
 from elevator.elevator_controller import ElevatorController
 from elevator.floor import Floor
@@ -6,6 +8,7 @@ from elevator.direction import Direction
 from elevator.elevator_selection_strategy import OddEvenStrategy
 from elevator.elevator_control_strategy import LookAlgorithm
 from elevator.elevator_car import ElevatorCar
+from elevator.telemetry import MemorySink, PrintSink, Telemetry
 
 def main():
     # 1) Get the singleton ElevatorSystem instance
@@ -54,5 +57,30 @@ def main():
     elevator_system.get_floors()[1].press_button(Direction.UP)  # Floor 2
     elevator1_car.press_button(6)
 
+    # Scenario 5: Each elevator served by its own worker thread
+    print("\nScenario 5: Concurrent runtime (one worker per elevator)")
+    elevator_system.start()
+    elevator_system.get_floors()[6].press_button(Direction.DOWN)  # Floor 7, returns immediately
+    elevator_system.get_floors()[9].press_button(Direction.DOWN)  # Floor 10
+    elevator2_car.press_button(1)
+    time.sleep(0.2)  # let the workers serve the calls
+    elevator_system.stop()
+
+    # Scenario 6: Same calls logged to memory instead of the console
+    print("\nScenario 6: Request telemetry")
+    telemetry = Telemetry.INSTANCE
+    sink = MemorySink()
+    telemetry.set_sink(sink)
+    elevator_system.get_floors()[3].press_button(Direction.UP)    # Floor 4
+    elevator_system.get_floors()[7].press_button(Direction.DOWN)  # Floor 8
+    elevator1_car.press_button(2)
+    telemetry.set_sink(PrintSink())
+    print(f"{len(sink.records)} events logged, last: {sink.records[-1][1]} {sink.records[-1][2]}")
+    for name, stats in telemetry.snapshot().items():
+        if name != "open_requests":
+            print(f"  {name:>10}: {stats['count']} samples, p50 {stats['p50'] * 1000:.3f} ms, "
+                  f"max {stats['max'] * 1000:.3f} ms")
+    print(f"  open requests: {telemetry.snapshot()['open_requests']}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,176 @@
+
+import time
+from functools import partial
+
+from elevator.direction import Direction
+from elevator.elevator_control_strategy import LookAlgorithm
+from elevator.elevator_selection_strategy import EnergyAwareStrategy, EtaStrategy, OddEvenStrategy
+from elevator.eta_board import EtaBoard
+from elevator.floor import Floor
+from elevator.group_control import AuctionAssigner
+from elevator.zoning import TALL_BUILDING_BANKS
+from elevator.simulation import (
+    BuildingConfig, DOWN_PEAK, INTER_FLOOR, OFFICE_DAY, UP_PEAK, TrafficPhase, ElevatorSimulation,
+    generate_passengers, simulate_day
+)
+
+STRATEGIES = [OddEvenStrategy, EtaStrategy, EnergyAwareStrategy]
+CONTROL_STRATEGIES = [LookAlgorithm]
+
+def compare(config, phases, title):
+    print(f"\n===== {title} =====")
+    for strategy in STRATEGIES:
+        report = simulate_day(config, phases, strategy)
+        print(f"{strategy.__name__:>16}: {report.summary()}")
+
+def compare_destination_dispatch(config, rates=(2000, 3000, 4000)):
+    print("\n===== Up-peak: classic hall calls vs destination dispatch =====")
+    for rate in rates:
+        phases = [TrafficPhase(8, 9, rate, UP_PEAK)]
+        for destination_dispatch in (False, True):
+            report = simulate_day(config, phases, EtaStrategy,
+                                  destination_dispatch=destination_dispatch)
+            mode = "destination" if destination_dispatch else "classic"
+            print(f"{rate:5d}/h {mode:>11}: {report.summary()}")
+
+def compare_zoning(config, phases, title):
+    print(f"\n===== {title} =====")
+    for name, banks in (("one bank", None), ("zoned", TALL_BUILDING_BANKS)):
+        for destination_dispatch in (False, True):
+            report = simulate_day(config, phases, EtaStrategy,
+                                  destination_dispatch=destination_dispatch, banks=banks)
+            mode = "destination" if destination_dispatch else "classic"
+            print(f"{name:>8} {mode:>11}: {report.summary()}")
+
+def compare_parking(config):
+    print("\n===== Idle cars: wait where they stop vs park by demand =====")
+    for title, phases in (("full day", OFFICE_DAY),
+                          ("up-peak", [TrafficPhase(8, 9, 2000, UP_PEAK)]),
+                          ("down-peak", [TrafficPhase(17, 18, 1800, DOWN_PEAK)]),
+                          ("lunch", [TrafficPhase(12, 14, 900, INTER_FLOOR)])):
+        for destination_dispatch in (False, True):
+            mode = "destination" if destination_dispatch else "classic"
+            reports = [simulate_day(config, phases, EtaStrategy, destination_dispatch=destination_dispatch,
+                                    parking=parking) for parking in (False, True)]
+            still, parked = reports
+            print(f"{title:>9} {mode:>11}: wait avg {still.average_wait:.1f}s -> {parked.average_wait:.1f}s "
+                  f"({parked.average_wait / still.average_wait - 1:+.0%}), "
+                  f"p95 {still.p95_wait:.1f}s -> {parked.p95_wait:.1f}s, "
+                  f"energy {still.energy_kwh:.1f} -> {parked.energy_kwh:.1f} kWh")
+
+def compare_batch_assignment(config):
+    print("\n===== Hall calls: assigned on arrival vs batch reassignment =====")
+    for title, phases, parking in (("down-peak", [TrafficPhase(17, 18, 1800, DOWN_PEAK)], False),
+                                   ("lunch", [TrafficPhase(12, 14, 900, INTER_FLOOR)], False),
+                                   ("full day", OFFICE_DAY, False),
+                                   ("parked", OFFICE_DAY, True)):
+        greedy, batch = [simulate_day(config, phases, EtaStrategy, parking=parking,
+                                      batch_assignment=batch_assignment)
+                         for batch_assignment in (False, True)]
+        print(f"{title:>9}: wait avg {greedy.average_wait:.1f}s -> {batch.average_wait:.1f}s "
+              f"({batch.average_wait / greedy.average_wait - 1:+.0%}), "
+              f"p95 {greedy.p95_wait:.1f}s -> {batch.p95_wait:.1f}s, "
+              f"energy {greedy.energy_kwh:.1f} -> {batch.energy_kwh:.1f} kWh, "
+              f"{batch.reassigned_calls} calls moved")
+
+def compare_energy(config):
+    print("\n===== Energy per simulated office day =====")
+    for control_strategy in CONTROL_STRATEGIES:
+        for strategy in STRATEGIES:
+            report = simulate_day(config, OFFICE_DAY, strategy, control_strategy_class=control_strategy)
+            print(f"{control_strategy.__name__} + {strategy.__name__:>19}: {report.energy_kwh:6.1f} kWh "
+                  f"({report.regenerated_kwh:.1f} regenerated), wait avg {report.average_wait:.1f}s")
+    print("\n===== Eco mode off-peak: energy weight (s/kWh) =====")
+    for title, phases in (("lunch", [TrafficPhase(12, 14, 900, INTER_FLOOR)]),
+                          ("evening", [TrafficPhase(19, 23, 200, INTER_FLOOR)]),
+                          ("down-peak", [TrafficPhase(17, 18, 1800, DOWN_PEAK)])):
+        reports = [(weight, simulate_day(config, phases, partial(EnergyAwareStrategy, energy_weight=weight)))
+                   for weight in (0, 300, 1000)]
+        print(f"{title:>9}: " + ", ".join(
+            f"{weight:4d}: {report.energy_kwh:.1f} kWh, wait {report.average_wait:.1f}s"
+            for weight, report in reports))
+
+def time_batch_assignment(cars=64, floors=101, requests=5000):
+    # Every hall button lit (200 calls), held by random cars that all carry a queue
+    config = BuildingConfig(floors=floors, cars=cars)
+    simulation = ElevatorSimulation(config, EtaStrategy)
+    for passenger in generate_passengers(OFFICE_DAY, floors)[:requests]:
+        controller = simulation.controllers[passenger.id % cars]
+        simulation.control_strategy.add_request(passenger.destination, passenger.direction, controller)
+        controller.elevator_car.current_floor = passenger.origin
+    calls = [(floor, Direction.UP) for floor in range(floors - 1)] + \
+            [(floor, Direction.DOWN) for floor in range(1, floors)]
+    current = [calls.index(call) % cars + 1 for call in calls]
+    assigner = AuctionAssigner(simulation.controllers, simulation.control_strategy)
+    start = time.perf_counter()
+    assigned = assigner.assign(calls, current)
+    elapsed = (time.perf_counter() - start) * 1e3
+    moved = sum(new != old for new, old in zip(assigned, current))
+    print(f"Batch assignment of {len(calls)} calls over {cars} cars: {elapsed:.0f} ms "
+          f"(budget {assigner.time_budget * 1e3:.0f} ms), {moved} calls moved, "
+          f"{'timed out' if assigner.timed_out else 'converged'}")
+
+def time_selection(config, requests=20000, banks=None):
+    # Cost of one selection with every car carrying a long queue
+    simulation = ElevatorSimulation(config, EtaStrategy, banks=banks)
+    for passenger in generate_passengers(OFFICE_DAY, config.floors)[:requests]:
+        controller = simulation.controllers[passenger.id % config.cars]
+        simulation.control_strategy.add_request(passenger.destination, passenger.direction, controller)
+    start = time.perf_counter()
+    for floor in range(config.floors):
+        simulation.zone_map.zone_for(floor).select_elevator(floor)
+    per_call = (time.perf_counter() - start) / config.floors * 1e6
+    layout = f"{len(simulation.zone_map.zones)} banks" if banks else "one bank"
+    print(f"EtaStrategy dispatch, {config.floors} floors, {config.cars} cars in {layout}, "
+          f"{requests} queued stops: {per_call:.0f} us per call")
+
+def time_floor_displays(config, requests=20000, ticks=200):
+    # Every floor shows its car's arrival estimate, refreshed every tick while
+    # one car moves a floor; one car in ten also serves a stop (a plan change)
+    simulation = ElevatorSimulation(config, EtaStrategy)
+    strategy = simulation.control_strategy
+    for passenger in generate_passengers(OFFICE_DAY, config.floors)[:requests]:
+        controller = simulation.controllers[passenger.id % config.cars]
+        strategy.add_request(passenger.destination, passenger.direction, controller)
+    floors = [Floor(i) for i in range(config.floors)]
+    assignments = {floor.id: [simulation.controllers[floor.id % config.cars]] for floor in floors}
+    for cached in (False, True):
+        board = EtaBoard(strategy)
+        start = time.perf_counter()
+        for tick in range(ticks):
+            controller = simulation.controllers[tick % config.cars]
+            car = controller.elevator_car
+            car.current_floor = (car.current_floor + 1) % config.floors
+            if tick % 10 == 0:
+                strategy.request_queues[controller].clear(car.current_floor)
+            if not cached:
+                board.plans.clear()
+            board.refresh(floors, assignments)
+        per_tick = (time.perf_counter() - start) / ticks * 1e3
+        mode = "cached per plan" if cached else "recomputed"
+        print(f"Arrival estimates on {config.floors} floor displays, {config.cars} cars, "
+              f"{mode:>15}: {per_tick:.2f} ms per refresh, {board.recomputed} plan walks")
+
+def main():
+    config = BuildingConfig(floors=50, cars=16)
+    compare(config, OFFICE_DAY, "Full office day, 50 floors, 16 cars")
+    compare(config, [TrafficPhase(8, 9, 2000, UP_PEAK)], "Morning up-peak hour")
+    compare(config, [TrafficPhase(17, 18, 1800, DOWN_PEAK)], "Evening down-peak hour")
+    compare_destination_dispatch(config)
+    compare_parking(config)
+    compare_batch_assignment(config)
+    compare_energy(config)
+    print()
+    time_selection(config)
+
+    tower = BuildingConfig(floors=100, cars=40)
+    compare_zoning(tower, [TrafficPhase(8, 9, 3000, UP_PEAK)], "100 floors, 40 cars: up-peak hour")
+    compare_zoning(tower, [TrafficPhase(12, 13, 1500, INTER_FLOOR)], "100 floors, 40 cars: lunch hour")
+    print()
+    time_selection(tower)
+    time_selection(tower, banks=TALL_BUILDING_BANKS)
+    time_floor_displays(BuildingConfig(floors=300, cars=40))
+    time_batch_assignment()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+
+import time
+import unittest
+
+from elevator.destination_dispatch import DestinationDispatcher
+from elevator.elevator_car import ElevatorCar
+from elevator.elevator_control_strategy import LookAlgorithm
+from elevator.elevator_controller import ElevatorController
+from elevator.elevator_selection_strategy import EtaStrategy
+from elevator.elevator_system import ElevatorSystem
+from elevator.floor import Floor
+from elevator.telemetry import MemorySink, PrintSink, Telemetry
+
+class DestinationDispatchTest(unittest.TestCase):
+    """Keypad calls through the live ElevatorSystem, not the simulator."""
+
+    def setUp(self):
+        # A fresh system for each test; the import-time one is put back after
+        self.previous = ElevatorSystem.INSTANCE
+        ElevatorSystem.INSTANCE = None
+        self.system = ElevatorSystem()
+        self.system.set_elevator_control_strategy(LookAlgorithm())
+        self.car = ElevatorCar(1)
+        self.controller = ElevatorController(1, self.car)
+        self.system.add_elevator(self.controller)
+        self.system.set_elevator_selection_strategy(EtaStrategy([self.controller]))
+        self.dispatcher = DestinationDispatcher([self.controller])
+        self.system.set_destination_dispatcher(self.dispatcher)
+        self.floors = [Floor(i) for i in range(12)]
+        for floor in self.floors:
+            self.system.add_floor(floor)
+        Telemetry.INSTANCE.set_sink(MemorySink())
+
+    def tearDown(self):
+        self.system.stop()
+        self.system.set_destination_dispatcher(None)
+        Telemetry.INSTANCE.set_sink(PrintSink())
+        ElevatorSystem.INSTANCE = self.previous
+
+    def test_entered_destination_becomes_car_call(self):
+        elevator_id = self.floors[3].press_destination(9)
+
+        self.assertEqual(elevator_id, 1)
+        self.assertEqual(self.car.current_floor, 9)
+        self.assertEqual(self.dispatcher.groups_by_car[1], [])
+        self.assertEqual(self.dispatcher.open_groups, {})
+
+    def test_group_rides_to_every_destination_with_workers(self):
+        self.system.start()
+        self.floors[3].press_destination(9)
+        self.floors[3].press_destination(10)
+        deadline = time.monotonic() + 2.0
+        while self.car.current_floor != 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.car.current_floor, 10)
+        self.assertEqual(self.dispatcher.groups_by_car[1], [])
+        self.assertEqual(self.car.button.floors, [])
+
+if __name__ == "__main__":
+    unittest.main()
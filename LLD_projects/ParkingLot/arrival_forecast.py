@@ -0,0 +1,251 @@
+import math
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from hats_off import (
+    Bike, Car, EntranceGate, NoSpotAvailableException, ParkingLot,
+    ParkingObserver, ParkingSpot, Truck, Vehicle, VehicleType,
+)
+
+
+# Arrival Forecasting - seasonal (weekday, hour) profile + exponential smoothing
+class ArrivalForecaster:
+    """
+    Predicts arrivals per vehicle type for the next interval.
+
+    Each closed interval updates a seasonal average for its (weekday, hour)
+    slot and an exponentially smoothed level, the ratio of actual arrivals to
+    what the seasonal profile expected. A forecast is profile * level.
+    """
+
+    def __init__(self, interval_minutes: int = 15, alpha: float = 0.3):
+        if interval_minutes <= 0 or 60 % interval_minutes != 0:
+            raise ValueError("interval_minutes must divide an hour")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.interval = timedelta(minutes=interval_minutes)
+        self.alpha = alpha
+        # (weekday, hour, vehicle_type) -> [sum of arrivals, intervals seen]
+        self.profile: Dict[Tuple[int, int, VehicleType], List[float]] = {}
+        self.level: Dict[VehicleType, float] = {vt: 1.0 for vt in VehicleType}
+        self.totals: Dict[VehicleType, List[float]] = {vt: [0.0, 0] for vt in VehicleType}
+        self._bucket_start: Optional[datetime] = None
+        self._bucket_counts: Dict[VehicleType, int] = {vt: 0 for vt in VehicleType}
+        self.lock = threading.Lock()
+
+    def interval_start(self, at: datetime) -> datetime:
+        minutes = self.interval.seconds // 60
+        return at.replace(minute=at.minute - at.minute % minutes, second=0, microsecond=0)
+
+    def fit(self, history: Iterable[Tuple[datetime, VehicleType]]) -> None:
+        for timestamp, vehicle_type in sorted(history, key=lambda event: event[0]):
+            self.observe(timestamp, vehicle_type)
+
+    def observe(self, timestamp: datetime, vehicle_type: VehicleType) -> None:
+        with self.lock:
+            self._advance(timestamp)
+            self._bucket_counts[vehicle_type] += 1
+
+    def _advance(self, timestamp: datetime) -> None:
+        start = self.interval_start(timestamp)
+        if self._bucket_start is None:
+            self._bucket_start = start
+            return
+        # Close every interval up to the one containing timestamp, empty ones included
+        while self._bucket_start < start:
+            self._close_bucket()
+            self._bucket_start += self.interval
+
+    def _close_bucket(self) -> None:
+        weekday, hour = self._bucket_start.weekday(), self._bucket_start.hour
+        for vehicle_type, count in self._bucket_counts.items():
+            expected = self._seasonal(weekday, hour, vehicle_type)
+            if expected > 0:
+                ratio = count / expected
+                self.level[vehicle_type] += self.alpha * (ratio - self.level[vehicle_type])
+
+            slot = self.profile.setdefault((weekday, hour, vehicle_type), [0.0, 0])
+            slot[0] += count
+            slot[1] += 1
+            self.totals[vehicle_type][0] += count
+            self.totals[vehicle_type][1] += 1
+            self._bucket_counts[vehicle_type] = 0
+
+    def _seasonal(self, weekday: int, hour: int, vehicle_type: VehicleType) -> float:
+        slot = self.profile.get((weekday, hour, vehicle_type))
+        if slot:
+            return slot[0] / slot[1]
+        arrivals, intervals = self.totals[vehicle_type]
+        return arrivals / intervals if intervals else 0.0
+
+    def predict(self, at: datetime, vehicle_type: VehicleType) -> float:
+        with self.lock:
+            seasonal = self._seasonal(at.weekday(), at.hour, vehicle_type)
+            return max(0.0, seasonal * self.level[vehicle_type])
+
+    def predict_next(self, now: datetime) -> Dict[VehicleType, float]:
+        next_interval = self.interval_start(now) + self.interval
+        return {vt: self.predict(next_interval, vt) for vt in VehicleType}
+
+
+class ArrivalHistoryObserver(ParkingObserver):
+    """Feeds ENTRY events into the forecaster as they happen."""
+
+    def __init__(self, forecaster: ArrivalForecaster):
+        self.forecaster = forecaster
+
+    def update(self, event_type: str, vehicle: Vehicle, spot: ParkingSpot):
+        if event_type == "ENTRY":
+            self.forecaster.observe(datetime.now(), vehicle.vehicle_type)
+
+
+# Pre-warming - per gate ready queues of candidate spots
+class SpotPrewarmer:
+    """
+    Stages "next candidate" spots per gate and vehicle type, sized from the
+    forecast, so that a gate pops a spot instead of searching the lot.
+
+    A staged spot belongs to exactly one gate queue. Spots are re-checked on
+    pop because they can still be taken through ParkingLot.find_spot.
+    """
+
+    # Same search order as ParkingLot.find_spot
+    SEARCH_ORDER = {
+        VehicleType.BIKE: (VehicleType.BIKE, VehicleType.TRUCK),
+        VehicleType.CAR: (VehicleType.CAR, VehicleType.TRUCK),
+        VehicleType.TRUCK: (VehicleType.TRUCK,),
+    }
+
+    def __init__(self, parking_lot: ParkingLot, forecaster: ArrivalForecaster,
+                 headroom: float = 1.25, min_staged: int = 1):
+        self.parking_lot = parking_lot
+        self.forecaster = forecaster
+        self.headroom = headroom
+        self.min_staged = min_staged
+        self.queues: Dict[int, Dict[VehicleType, Deque[ParkingSpot]]] = {}
+        self.staged: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def add_gate(self) -> 'PrewarmedEntranceGate':
+        gate = PrewarmedEntranceGate(len(self.parking_lot.entrance_gates) + 1,
+                                     self.parking_lot, self)
+        self.parking_lot.entrance_gates.append(gate)
+        with self.lock:
+            self.queues[gate.gate_id] = {vt: deque() for vt in VehicleType}
+        return gate
+
+    def prewarm(self, now: Optional[datetime] = None) -> Dict[VehicleType, int]:
+        """Top up every gate queue to its share of the next interval's forecast."""
+        forecast = self.forecaster.predict_next(now or datetime.now())
+        with self.lock:
+            if not self.queues:
+                return {}
+            staged_now = {}
+            for vehicle_type, expected in forecast.items():
+                per_gate = max(self.min_staged,
+                               math.ceil(expected * self.headroom / len(self.queues)))
+                candidates = self._free_spots(vehicle_type)
+                added = 0
+                for queues in self.queues.values():
+                    queue = queues[vehicle_type]
+                    while len(queue) < per_gate:
+                        spot = next(candidates, None)
+                        if spot is None:
+                            break
+                        queue.append(spot)
+                        self.staged.add(spot.spot_id)
+                        added += 1
+                staged_now[vehicle_type] = added
+            return staged_now
+
+    def _free_spots(self, vehicle_type: VehicleType):
+        for spot_type in self.SEARCH_ORDER[vehicle_type]:
+            for spot in self.parking_lot.spots[spot_type]:
+                if not spot.is_occupied and spot.spot_id not in self.staged:
+                    yield spot
+
+    def take(self, gate_id: int, vehicle: Vehicle) -> Optional[ParkingSpot]:
+        with self.lock:
+            queue = self.queues.get(gate_id, {}).get(vehicle.vehicle_type)
+            while queue:
+                spot = queue.popleft()
+                self.staged.discard(spot.spot_id)
+                if not spot.is_occupied and spot.can_accommodate(vehicle):
+                    self.hits += 1
+                    return spot
+            self.misses += 1
+            return None
+
+    def start(self, period_seconds: float = 60.0) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, args=(period_seconds,), daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._worker:
+            self._worker.join()
+            self._worker = None
+
+    def _run(self, period_seconds: float) -> None:
+        while not self._stop.is_set():
+            self.prewarm()
+            self._stop.wait(period_seconds)
+
+
+class PrewarmedEntranceGate(EntranceGate):
+    def __init__(self, gate_id: int, parking_lot: ParkingLot, prewarmer: SpotPrewarmer):
+        super().__init__(gate_id, parking_lot)
+        self.prewarmer = prewarmer
+
+    def select_spot(self, vehicle: Vehicle) -> Optional[ParkingSpot]:
+        return self.prewarmer.take(self.gate_id, vehicle) or self.parking_lot.find_spot(vehicle)
+
+
+def demo_forecasting():
+    parking_lot = ParkingLot("Forecast Demo Lot", motorcycle_spots=20,
+                             car_spots=60, large_spots=10)
+    forecaster = ArrivalForecaster(interval_minutes=15)
+
+    # Four weeks of synthetic history: a morning rush on weekdays
+    history = []
+    start = datetime(2024, 1, 1)
+    for day in range(28):
+        date = start + timedelta(days=day)
+        weekday = date.weekday() < 5
+        for hour in range(6, 22):
+            cars = 12 if weekday and 8 <= hour < 10 else 3
+            for i in range(cars):
+                history.append((date.replace(hour=hour, minute=(i * 5) % 60), VehicleType.CAR))
+            history.append((date.replace(hour=hour, minute=30), VehicleType.BIKE))
+    forecaster.fit(history)
+
+    monday_rush = datetime(2024, 1, 29, 8, 40)
+    print("Forecast for next interval:",
+          {vt.name: round(n, 2) for vt, n in forecaster.predict_next(monday_rush).items()})
+
+    prewarmer = SpotPrewarmer(parking_lot, forecaster)
+    gates = [prewarmer.add_gate() for _ in range(2)]
+    parking_lot.register_observer(ArrivalHistoryObserver(forecaster))
+    print("Staged spots:", {vt.name: n for vt, n in prewarmer.prewarm(monday_rush).items()})
+
+    vehicles = [Car(f"C-{i}") for i in range(8)] + [Bike("B-1"), Truck("T-1")]
+    for i, vehicle in enumerate(vehicles):
+        try:
+            ticket = gates[i % 2].issue_ticket(vehicle)
+            print(f"{vehicle.license_plate} -> {ticket.spot.spot_id}")
+        except NoSpotAvailableException as e:
+            print(f"{vehicle.license_plate}: {e}")
+    print(f"Ready-queue hits: {prewarmer.hits}, fallbacks to search: {prewarmer.misses}")
+
+
+if __name__ == "__main__":
+    demo_forecasting()
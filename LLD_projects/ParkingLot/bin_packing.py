@@ -0,0 +1,251 @@
+import heapq
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from hats_off import (
+    Bike, Car, CompactSpot, CreditCardProcessor, FirstAvailableStrategy, LargeSpot,
+    MotorcycleSpot, ParkingLot, ParkingSpot, SpotAllocator, Truck, Vehicle, VehicleType,
+)
+
+# A bay's capacity and a vehicle's footprint in the same units: a large bay
+# fits one truck, two cars or four bikes; a compact bay one car or two bikes.
+BAY_UNITS = {MotorcycleSpot: 1, CompactSpot: 2, LargeSpot: 4}
+VEHICLE_UNITS = {VehicleType.BIKE: 1, VehicleType.CAR: 2, VehicleType.TRUCK: 4}
+MAX_UNITS = max(BAY_UNITS.values())
+
+
+class Bay:
+    def __init__(self, index: int, spot: ParkingSpot):
+        self.index = index
+        self.spot = spot
+        self.capacity = BAY_UNITS[type(spot)]
+        self.free = self.capacity
+        self.vehicles: Dict[str, Vehicle] = {}  # license_plate -> vehicle
+
+
+class BinPackingAllocator(SpotAllocator):
+    """
+    Best-fit allocation over bays measured in capacity units.
+
+    Bays are bucketed by their free units, so the tightest bay that still fits
+    a vehicle is found by checking at most MAX_UNITS buckets. Fragmentation is
+    tracked as the share of free units left over in partially used bays.
+
+    Set it as a lot's allocator to have the gates park through it. The first
+    vehicle in a bay occupies its spot; others share the bay, and the spot is
+    vacated when the last one leaves.
+    """
+
+    def __init__(self, spots: Iterable[ParkingSpot]):
+        self.bays = [Bay(i, spot) for i, spot in enumerate(spots)]
+        self.bay_of: Dict[str, Bay] = {bay.spot.spot_id: bay for bay in self.bays}
+        # free units -> bay indices (dicts keep insertion order, so picks are stable)
+        self.buckets: List[Dict[int, None]] = [{} for _ in range(MAX_UNITS + 1)]
+        for bay in self.bays:
+            self.buckets[bay.free][bay.index] = None
+        self.parked: Dict[str, Bay] = {}
+        self.total_units = sum(bay.capacity for bay in self.bays)
+        self.used_units = 0
+        self.stranded_units = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_lot(cls, parking_lot: ParkingLot) -> 'BinPackingAllocator':
+        allocator = cls(spot for spots in parking_lot.spots.values() for spot in spots)
+        # Vehicles already parked (e.g. in a lot restored from a snapshot) keep their bays
+        for ticket in parking_lot.tickets.values():
+            allocator.adopt(ticket.vehicle, ticket.spot)
+        return allocator
+
+    def adopt(self, vehicle: Vehicle, spot: ParkingSpot) -> None:
+        """Records a vehicle that is already parked in `spot`."""
+        units = VEHICLE_UNITS[vehicle.vehicle_type]
+        with self.lock:
+            bay = self.bay_of[spot.spot_id]
+            if units > bay.free:
+                raise ValueError(f"{vehicle.license_plate} does not fit in bay {spot.spot_id}")
+            self._move(bay, bay.free - units)
+            bay.vehicles[vehicle.license_plate] = vehicle
+            self.parked[vehicle.license_plate] = bay
+            self.used_units += units
+
+    def _move(self, bay: Bay, new_free: int) -> None:
+        del self.buckets[bay.free][bay.index]
+        if bay.free < bay.capacity:
+            self.stranded_units -= bay.free
+        bay.free = new_free
+        if bay.free < bay.capacity:
+            self.stranded_units += bay.free
+        self.buckets[bay.free][bay.index] = None
+
+    def allocate(self, vehicle: Vehicle) -> Optional[ParkingSpot]:
+        units = VEHICLE_UNITS[vehicle.vehicle_type]
+        with self.lock:
+            for free in range(units, MAX_UNITS + 1):
+                for index in self.buckets[free]:
+                    bay = self.bays[index]
+                    # An empty bay's spot may have been taken outside the allocator
+                    if bay.vehicles or bay.spot.occupy(vehicle):
+                        break
+                else:
+                    continue
+                self._move(bay, free - units)
+                bay.vehicles[vehicle.license_plate] = vehicle
+                self.parked[vehicle.license_plate] = bay
+                self.used_units += units
+                return bay.spot
+        return None
+
+    def release(self, license_plate: str) -> Optional[ParkingSpot]:
+        with self.lock:
+            bay = self.parked.pop(license_plate, None)
+            if bay is None:
+                return None
+            vehicle = bay.vehicles.pop(license_plate)
+            units = VEHICLE_UNITS[vehicle.vehicle_type]
+            self._move(bay, bay.free + units)
+            self.used_units -= units
+            spot = bay.spot
+            if not bay.vehicles:
+                spot.vacate()
+            elif spot.vehicle is vehicle:
+                # The spot shows one of the vehicles still sharing the bay
+                with spot.lock:
+                    spot.vehicle = next(iter(bay.vehicles.values()))
+            return spot
+
+    def utilization(self) -> float:
+        return self.used_units / self.total_units if self.total_units else 0.0
+
+    def fragmentation(self) -> float:
+        free_units = self.total_units - self.used_units
+        return self.stranded_units / free_units if free_units else 0.0
+
+    def get_status(self) -> Dict:
+        return {
+            "utilization": f"{self.utilization():.1%}",
+            "fragmentation": f"{self.fragmentation():.1%}",
+            "bays_by_free_units": {free: len(bucket) for free, bucket in enumerate(self.buckets)},
+            "parked_vehicles": len(self.parked),
+        }
+
+
+# Benchmark - bin packing vs FirstAvailableStrategy on synthetic traces
+def build_spots(motorcycle: int, compact: int, large: int) -> Dict[VehicleType, List[ParkingSpot]]:
+    return {
+        VehicleType.BIKE: [MotorcycleSpot(f"M-{i}") for i in range(motorcycle)],
+        VehicleType.CAR: [CompactSpot(f"C-{i}") for i in range(compact)],
+        VehicleType.TRUCK: [LargeSpot(f"L-{i}") for i in range(large)],
+    }
+
+
+def synthetic_trace(arrivals: int, mix=(0.35, 0.5, 0.15), mean_stay: float = 120.0,
+                    mean_gap: float = 0.12, seed: int = 7):
+    """Yields (time, plate, vehicle or None); None marks the departure of plate."""
+    rng = random.Random(seed)
+    factories = (Bike, Car, Truck)
+    events = []
+    now = 0.0
+    for i in range(arrivals):
+        now += rng.expovariate(1 / mean_gap)
+        vehicle = rng.choices(factories, weights=mix)[0](f"V-{i}")
+        events.append((now, 1, vehicle.license_plate, vehicle))
+        events.append((now + rng.expovariate(1 / mean_stay), 0, vehicle.license_plate, None))
+    heapq.heapify(events)
+    while events:
+        at, _, plate, vehicle = heapq.heappop(events)
+        yield at, plate, vehicle
+
+
+class FirstAvailableAllocator(SpotAllocator):
+    """ParkingLot.find_spot's search order driven by FirstAvailableStrategy."""
+
+    SEARCH_ORDER = {
+        VehicleType.BIKE: (VehicleType.BIKE, VehicleType.TRUCK),
+        VehicleType.CAR: (VehicleType.CAR, VehicleType.TRUCK),
+        VehicleType.TRUCK: (VehicleType.TRUCK,),
+    }
+
+    def __init__(self, spots: Dict[VehicleType, List[ParkingSpot]]):
+        self.spots = spots
+        self.strategy = FirstAvailableStrategy()
+        self.parked: Dict[str, ParkingSpot] = {}
+        self.total_units = sum(BAY_UNITS[type(s)] for group in spots.values() for s in group)
+        self.used_units = 0
+
+    def allocate(self, vehicle: Vehicle) -> Optional[ParkingSpot]:
+        for spot_type in self.SEARCH_ORDER[vehicle.vehicle_type]:
+            spot = self.strategy.select_spot(self.spots[spot_type], vehicle)
+            if spot and spot.occupy(vehicle):
+                self.parked[vehicle.license_plate] = spot
+                # A spot holds one vehicle, so it is fully used whatever parks there
+                self.used_units += BAY_UNITS[type(spot)]
+                return spot
+        return None
+
+    def release(self, license_plate: str) -> Optional[ParkingSpot]:
+        spot = self.parked.pop(license_plate, None)
+        if spot:
+            spot.vacate()
+            self.used_units -= BAY_UNITS[type(spot)]
+        return spot
+
+
+def run_trace(allocator, trace) -> Dict:
+    admitted = {vt: 0 for vt in VehicleType}
+    rejected = {vt: 0 for vt in VehicleType}
+    parked_units = 0
+    allocation_seconds = 0.0
+    samples = 0
+    parked_types: Dict[str, VehicleType] = {}
+    for _, plate, vehicle in trace:
+        if vehicle is None:
+            if plate in parked_types:
+                parked_units -= VEHICLE_UNITS[parked_types.pop(plate)]
+                allocator.release(plate)
+            continue
+        start = time.perf_counter()
+        placed = allocator.allocate(vehicle)
+        allocation_seconds += time.perf_counter() - start
+        if placed:
+            admitted[vehicle.vehicle_type] += 1
+            parked_types[plate] = vehicle.vehicle_type
+            parked_units += VEHICLE_UNITS[vehicle.vehicle_type]
+        else:
+            rejected[vehicle.vehicle_type] += 1
+        samples += parked_units / allocator.total_units
+    arrivals = sum(admitted.values()) + sum(rejected.values())
+    return {
+        "admitted": {vt.name: n for vt, n in admitted.items()},
+        "rejected": {vt.name: n for vt, n in rejected.items()},
+        "mean_utilization": samples / arrivals,
+        "alloc_us": allocation_seconds / arrivals * 1e6,
+    }
+
+
+def benchmark(arrivals: int = 20_000, layout=(200, 600, 200)):
+    print(f"Trace: {arrivals} arrivals, layout motorcycle/compact/large = {layout}")
+    for name, factory in (("first-available", lambda s: FirstAvailableAllocator(s)),
+                          ("bin-packing", lambda s: BinPackingAllocator(
+                              [spot for vt in VehicleType for spot in s[vt]]))):
+        allocator = factory(build_spots(*layout))
+        result = run_trace(allocator, synthetic_trace(arrivals))
+        print(f"{name:>16}: utilization {result['mean_utilization']:.1%}, "
+              f"{result['alloc_us']:.1f} us/allocation, rejected {result['rejected']}")
+
+    # The same allocation behind a lot's gates: two cars share one large bay
+    parking_lot = ParkingLot("Bin Packing Lot", motorcycle_spots=0, car_spots=0, large_spots=1)
+    parking_lot.allocator = BinPackingAllocator.from_lot(parking_lot)
+    gate = parking_lot.add_entrance_gate()
+    exit_gate = parking_lot.add_exit_gate(CreditCardProcessor())
+    tickets = [gate.issue_ticket(Car(f"C-{i}")) for i in range(2)]
+    print(f"Lot: {[t.spot.spot_id for t in tickets]}, {parking_lot.allocator.get_status()}")
+    exit_gate.process_exit(tickets[0].ticket_id)
+    spot = tickets[1].spot
+    print(f"After C-0 left: {spot.spot_id} occupied={spot.is_occupied} by {spot.vehicle.license_plate}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 from datetime import datetime
-import uuid
 from typing import List, Dict
 
+from ticket_ids import SnowflakeTicketIdGenerator
+
 # -------------------- Enums --------------------
 class VehicleType(Enum):
     BIKE = 1
@@ -104,21 +105,24 @@ class ParkingLot:
         return self.four_wheeler_spots
 
 # -------------------- Ticket System --------------------
+# Ticket ids are 64-bit time-ordered Snowflake ids; one generator (gate 0) issues them all
+_ticket_ids = SnowflakeTicketIdGenerator(gate_id=0)
+
 class Ticket:
     def __init__(self, vehicle: Vehicle, spot: ParkingSpot):
-        self.id = uuid.uuid4()
+        self.id = _ticket_ids.next_id()
         self.entry_time = datetime.now()
         self.vehicle = vehicle
         self.spot = spot
 
 class TicketRegistry:
     def __init__(self):
-        self.tickets: Dict[uuid.UUID, Ticket] = {}
+        self.tickets: Dict[str, Ticket] = {}
 
     def add_ticket(self, ticket: Ticket) -> None:
         self.tickets[ticket.id] = ticket
 
-    def get_ticket(self, ticket_id: uuid.UUID) -> Ticket | None:
+    def get_ticket(self, ticket_id: str) -> Ticket | None:
         return self.tickets.get(ticket_id)
 
 # -------------------- Pricing --------------------
@@ -168,7 +172,7 @@ class ExitGate:
         self.processor = payment_processor
         self.parking_lot = parking_lot
 
-    def process_exit(self, ticket_id: uuid.UUID) -> bool:
+    def process_exit(self, ticket_id: str) -> bool:
         ticket = self.registry.get_ticket(ticket_id)
         if not ticket:
             return False
@@ -0,0 +1,232 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from hats_off import (
+    Car, CreditCardProcessor, InvalidTicketException, NoSpotAvailableException, ParkingLot,
+    ParkingObserver, ParkingSpot, Truck, Vehicle, VehicleType,
+)
+
+
+@dataclass(frozen=True)
+class Relocation:
+    license_plate: str
+    from_spot: str
+    to_spot: str
+    dwell_seconds: float
+
+
+class DefragPlanner(ParkingObserver):
+    """
+    Proposes valet moves that free a run of adjacent large spots for trucks.
+
+    Occupancy of large spots and the free small spots are kept up to date from
+    ENTRY/EXIT events, so a plan only slides a window over the large spots
+    instead of scanning the whole lot. Within the cheapest feasible window the
+    cars and bikes parked in large spots are moved to free compact/motorcycle
+    spots; windows whose occupants have stayed longest win ties, since those
+    vehicles would otherwise block the bay the longest.
+    """
+
+    def __init__(self, parking_lot: ParkingLot, run_length: int = 1, clock=datetime.now):
+        self.parking_lot = parking_lot
+        self.run_length = run_length
+        self.clock = clock
+        self.lock = threading.RLock()
+        self.latest_plan: List[Relocation] = []
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Full scan, for attaching to a lot that already has vehicles parked."""
+        with self.lock:
+            self.large_spots = self.parking_lot.spots[VehicleType.TRUCK]
+            self.large_index = {spot.spot_id: i for i, spot in enumerate(self.large_spots)}
+            # large spot index -> (entry time, vehicle type, plate) of a non-truck parked there
+            self.misplaced: Dict[int, Tuple[datetime, VehicleType, str]] = {}
+            self.trucks = set()
+            self.small_bucket: Dict[str, VehicleType] = {}
+            self.free_small: Dict[VehicleType, Dict[str, ParkingSpot]] = {
+                VehicleType.BIKE: {}, VehicleType.CAR: {}}
+            for vt in (VehicleType.BIKE, VehicleType.CAR):
+                for spot in self.parking_lot.spots[vt]:
+                    self.small_bucket[spot.spot_id] = vt
+                    if not spot.is_occupied:
+                        self.free_small[vt][spot.spot_id] = spot
+
+            for i, spot in enumerate(self.large_spots):
+                ticket = self.parking_lot.ticket_at(spot)
+                if ticket:
+                    self._mark_large(i, ticket.entry_time, ticket.vehicle)
+                elif spot.is_occupied:
+                    self.trucks.add(i)  # occupied without a ticket: treat as immovable
+
+    def _mark_large(self, index: int, entry_time: datetime, vehicle: Vehicle) -> None:
+        if vehicle.vehicle_type == VehicleType.TRUCK:
+            self.trucks.add(index)
+        else:
+            self.misplaced[index] = (entry_time, vehicle.vehicle_type, vehicle.license_plate)
+
+    def update(self, event_type: str, vehicle: Vehicle, spot: ParkingSpot):
+        with self.lock:
+            index = self.large_index.get(spot.spot_id)
+            if event_type == "ENTRY":
+                if index is not None:
+                    self._mark_large(index, self.clock(), vehicle)
+                else:
+                    for free in self.free_small.values():
+                        free.pop(spot.spot_id, None)
+            elif event_type == "EXIT":
+                if index is not None:
+                    self.trucks.discard(index)
+                    self.misplaced.pop(index, None)
+                elif spot.spot_id in self.small_bucket:
+                    self.free_small[self.small_bucket[spot.spot_id]][spot.spot_id] = spot
+
+    def plan(self) -> List[Relocation]:
+        with self.lock:
+            now = self.clock()
+            free_bike = len(self.free_small[VehicleType.BIKE])
+            free_compact = len(self.free_small[VehicleType.CAR])
+            best = None  # (moves, -dwell, start)
+
+            # Sliding window counts over the large spots
+            trucks = cars = bikes = 0
+            dwell = 0.0
+            length = self.run_length
+            for end in range(len(self.large_spots)):
+                trucks, cars, bikes, dwell = self._slide(end, +1, trucks, cars, bikes, dwell, now)
+                start = end - length + 1
+                if start < 0:
+                    continue
+                if start > 0:
+                    trucks, cars, bikes, dwell = self._slide(start - 1, -1, trucks, cars, bikes, dwell, now)
+                feasible = (trucks == 0 and cars <= free_compact
+                            and bikes <= free_bike + free_compact - cars)
+                if feasible:
+                    key = (cars + bikes, -dwell, start)
+                    if best is None or key < best:
+                        best = key
+            if best is None:
+                self.latest_plan = []
+                return []
+
+            start = best[2]
+            compact = iter(self.free_small[VehicleType.CAR].values())
+            moto = iter(self.free_small[VehicleType.BIKE].values())
+            plan = []
+            occupants = sorted(
+                (i for i in range(start, start + length) if i in self.misplaced),
+                key=lambda i: self.misplaced[i][1] != VehicleType.CAR)  # cars claim compact first
+            for i in occupants:
+                entry_time, vehicle_type, plate = self.misplaced[i]
+                target = next(compact) if vehicle_type == VehicleType.CAR \
+                    else next(moto, None) or next(compact)
+                plan.append(Relocation(plate, self.large_spots[i].spot_id, target.spot_id,
+                                       (now - entry_time).total_seconds()))
+            self.latest_plan = plan
+            return plan
+
+    def _slide(self, index: int, sign: int, trucks: int, cars: int, bikes: int,
+               dwell: float, now: datetime):
+        if index in self.trucks:
+            trucks += sign
+        elif index in self.misplaced:
+            entry_time, vehicle_type, _ = self.misplaced[index]
+            if vehicle_type == VehicleType.CAR:
+                cars += sign
+            else:
+                bikes += sign
+            dwell += sign * (now - entry_time).total_seconds()
+        return trucks, cars, bikes, dwell
+
+    def apply(self, relocation: Relocation) -> None:
+        """
+        Carry out one valet move and keep the ticket pointing at the new spot;
+        the stay is still priced at the spot the driver parked in.
+        """
+        with self.lock:
+            source = self.large_spots[self.large_index[relocation.from_spot]]
+            bucket = self.small_bucket.get(relocation.to_spot)
+            target = self.free_small[bucket].get(relocation.to_spot) if bucket else None
+            if target is None:
+                raise NoSpotAvailableException(f"Spot {relocation.to_spot} is no longer free")
+            ticket = self.parking_lot.ticket_at(source)
+            if ticket is None:
+                raise InvalidTicketException(f"No active ticket for spot {relocation.from_spot}")
+            if not target.occupy(ticket.vehicle):
+                raise NoSpotAvailableException(f"Failed to occupy spot {relocation.to_spot}")
+
+            source.vacate()
+            self.parking_lot.move_ticket(ticket, target)
+            self.misplaced.pop(self.large_index[relocation.from_spot], None)
+            self.free_small[bucket].pop(target.spot_id)
+
+    def start(self, period_seconds: float = 5.0) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, args=(period_seconds,), daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._worker:
+            self._worker.join()
+            self._worker = None
+
+    def _run(self, period_seconds: float) -> None:
+        while not self._stop.is_set():
+            self.plan()
+            self._stop.wait(period_seconds)
+
+
+def demo_defrag():
+    parking_lot = ParkingLot("Defrag Demo Lot", motorcycle_spots=4, car_spots=6, large_spots=6)
+    gate = parking_lot.add_entrance_gate()
+
+    exit_gate = parking_lot.add_exit_gate(CreditCardProcessor())
+
+    # Fill compact spots, spill cars into the large row until a truck takes its
+    # last spot, then let some of the compact spots' cars leave
+    cars = [gate.issue_ticket(Car(f"C-{i}")) for i in range(11)]
+    gate.issue_ticket(Truck("T-1"))
+    for ticket in cars[:3]:
+        exit_gate.process_exit(ticket.ticket_id)
+
+    # Pretend the spilled cars have been here for a while
+    for i, ticket in enumerate(cars[6:]):
+        ticket.entry_time -= timedelta(hours=i + 1)
+
+    planner = DefragPlanner(parking_lot, run_length=2)
+    parking_lot.register_observer(planner)
+    print("Large row:", [s.vehicle.license_plate if s.is_occupied else "--"
+                         for s in parking_lot.spots[VehicleType.TRUCK]])
+    truck = Truck("T-2")
+    try:
+        gate.issue_ticket(truck)
+    except NoSpotAvailableException as e:
+        print(f"Before: {e}")
+
+    plan = planner.plan()
+    for move in plan:
+        print(f"Move {move.license_plate}: {move.from_spot} -> {move.to_spot} "
+              f"(parked {move.dwell_seconds / 3600:.1f}h)")
+        planner.apply(move)
+    print("Large row:", [s.vehicle.license_plate if s.is_occupied else "--"
+                         for s in parking_lot.spots[VehicleType.TRUCK]])
+    print(f"After: {truck.license_plate} parked at {gate.issue_ticket(truck).spot.spot_id}")
+
+    # Planning cost on a 50k-spot lot with 5k large spots
+    big_lot = ParkingLot("Big Lot", motorcycle_spots=5000, car_spots=40000, large_spots=5000)
+    big_planner = DefragPlanner(big_lot, run_length=4)
+    start = time.perf_counter()
+    big_planner.plan()
+    print(f"Plan over 50k spots: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    demo_defrag()
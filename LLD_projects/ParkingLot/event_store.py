@@ -0,0 +1,300 @@
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from perplexity import Car, ParkingConfig, ParkingEvent, ParkingLot, ParkingObserver
+
+EVENT_CODES = {"ENTER": 1, "EXIT": 2}
+EVENT_NAMES = {code: name for name, code in EVENT_CODES.items()}
+
+# On-disk record: timestamp, event code, fee, then length-prefixed plate and spot id
+LOG_RECORD = struct.Struct("<dBdHH")
+
+
+class EventRecord(NamedTuple):
+    timestamp: datetime
+    event_type: str
+    license_plate: str
+    spot_id: str
+    fee: float
+
+
+class Visit(NamedTuple):
+    license_plate: str
+    spot_id: str
+    entered: datetime
+    exited: Optional[datetime]
+    fee: float
+
+
+class _Index:
+    """Rows of one plate or spot with their timestamps, both in time order."""
+
+    __slots__ = ("rows", "times")
+
+    def __init__(self):
+        self.rows = array("I")
+        self.times = array("d")
+
+    def add(self, row: int, timestamp: float) -> None:
+        self.rows.append(row)
+        self.times.append(timestamp)
+
+    def insert(self, row: int, timestamp: float) -> None:
+        # After every row with the same timestamp; callers have already
+        # renumbered the rows at and after `row`
+        i = bisect_right(self.times, timestamp)
+        self.rows.insert(i, row)
+        self.times.insert(i, timestamp)
+
+    def renumber(self, row: int) -> None:
+        """Shifts `row` to row + 1 when a late event is inserted before it."""
+        self.rows[bisect_left(self.rows, row)] = row + 1
+
+    def between(self, start: float, end: float) -> array:
+        return self.rows[bisect_left(self.times, start):bisect_right(self.times, end)]
+
+
+class ParkingEventStore:
+    """
+    Append-only columnar store of ENTER/EXIT events.
+
+    Each field lives in its own array; plates and spot ids are interned to
+    integer codes. Rows are kept in time order, so the timestamp column and
+    the per-plate / per-spot row lists are sorted and time-bounded queries
+    are two binary searches instead of a scan of the log. Events nearly always
+    arrive in that order; one that comes late (say, from a gate thread that
+    took its timestamp just before another's) is inserted at its place, which
+    only moves the few rows after it. Row numbers are positions in time order,
+    so they change when a late event lands before them. Queries hold the lock
+    too, so they never see the columns half way through such a move.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.timestamps = array("d")
+        self.event_codes = array("B")
+        self.plate_codes = array("I")
+        self.spot_codes = array("I")
+        self.fees = array("d")
+        self.plates: List[str] = []
+        self.spots: List[str] = []
+        self._plate_ids: Dict[str, int] = {}
+        self._spot_ids: Dict[str, int] = {}
+        self.by_plate: Dict[int, _Index] = {}
+        self.by_spot: Dict[int, _Index] = {}
+        self.lock = threading.Lock()
+        self._log = None
+        if path:
+            self._replay_log(path)
+            self._log = open(path, "ab")
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @staticmethod
+    def _intern(value: str, ids: Dict[str, int], values: List[str]) -> int:
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, event_type: str, timestamp: datetime, license_plate: str,
+               spot_id: str, fee: float = 0.0) -> int:
+        with self.lock:
+            row = self._append(EVENT_CODES[event_type], timestamp.timestamp(),
+                               license_plate, spot_id, fee)
+            if self._log:
+                plate, spot = license_plate.encode(), spot_id.encode()
+                self._log.write(LOG_RECORD.pack(timestamp.timestamp(), EVENT_CODES[event_type],
+                                                fee, len(plate), len(spot)) + plate + spot)
+            return row
+
+    def _append(self, code: int, ts: float, license_plate: str, spot_id: str, fee: float) -> int:
+        plate = self._intern(license_plate, self._plate_ids, self.plates)
+        spot = self._intern(spot_id, self._spot_ids, self.spots)
+        if self.timestamps and ts < self.timestamps[-1]:
+            return self._insert_late(code, ts, plate, spot, fee)
+        row = len(self.timestamps)
+        self.timestamps.append(ts)
+        self.event_codes.append(code)
+        self.plate_codes.append(plate)
+        self.spot_codes.append(spot)
+        self.fees.append(fee)
+        self.by_plate.setdefault(plate, _Index()).add(row, ts)
+        self.by_spot.setdefault(spot, _Index()).add(row, ts)
+        return row
+
+    def _insert_late(self, code: int, ts: float, plate: int, spot: int, fee: float) -> int:
+        row = bisect_right(self.timestamps, ts)
+        # Last row first, so each one moves into a number that is already free
+        for later in range(len(self.timestamps) - 1, row - 1, -1):
+            self.by_plate[self.plate_codes[later]].renumber(later)
+            self.by_spot[self.spot_codes[later]].renumber(later)
+        self.timestamps.insert(row, ts)
+        self.event_codes.insert(row, code)
+        self.plate_codes.insert(row, plate)
+        self.spot_codes.insert(row, spot)
+        self.fees.insert(row, fee)
+        self.by_plate.setdefault(plate, _Index()).insert(row, ts)
+        self.by_spot.setdefault(spot, _Index()).insert(row, ts)
+        return row
+
+    def _replay_log(self, path: str) -> None:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        offset = 0
+        while offset + LOG_RECORD.size <= len(data):
+            ts, code, fee, plate_len, spot_len = LOG_RECORD.unpack_from(data, offset)
+            body = offset + LOG_RECORD.size
+            if body + plate_len + spot_len > len(data):
+                break
+            plate = data[body:body + plate_len].decode()
+            spot = data[body + plate_len:body + plate_len + spot_len].decode()
+            self._append(code, ts, plate, spot, fee)
+            offset = body + plate_len + spot_len
+        if offset < len(data):
+            # Torn final record from a crash: drop it so new appends stay readable
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+
+    def flush(self) -> None:
+        if self._log:
+            self._log.flush()
+
+    def close(self) -> None:
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    # Queries
+    def record(self, row: int) -> EventRecord:
+        with self.lock:
+            return self._record(row)
+
+    def _record(self, row: int) -> EventRecord:
+        return EventRecord(datetime.fromtimestamp(self.timestamps[row]),
+                           EVENT_NAMES[self.event_codes[row]],
+                           self.plates[self.plate_codes[row]],
+                           self.spots[self.spot_codes[row]],
+                           self.fees[row])
+
+    @staticmethod
+    def _bounds(start: Optional[datetime], end: Optional[datetime]) -> Tuple[float, float]:
+        return (start.timestamp() if start else float("-inf"),
+                end.timestamp() if end else float("inf"))
+
+    def events_for_plate(self, license_plate: str, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> List[EventRecord]:
+        bounds = self._bounds(start, end)
+        with self.lock:
+            index = self.by_plate.get(self._plate_ids.get(license_plate))
+            if index is None:
+                return []
+            return [self._record(row) for row in index.between(*bounds)]
+
+    def events_at_spot(self, spot_id: str, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None) -> List[EventRecord]:
+        bounds = self._bounds(start, end)
+        with self.lock:
+            index = self.by_spot.get(self._spot_ids.get(spot_id))
+            if index is None:
+                return []
+            return [self._record(row) for row in index.between(*bounds)]
+
+    def visits(self, license_plate: str, start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> List[Visit]:
+        """ENTER events in the range, each paired with the EXIT that followed it."""
+        lo, hi = self._bounds(start, end)
+        with self.lock:
+            return self._visits(license_plate, lo, hi)
+
+    def _visits(self, license_plate: str, lo: float, hi: float) -> List[Visit]:
+        index = self.by_plate.get(self._plate_ids.get(license_plate))
+        if index is None:
+            return []
+        first = bisect_left(index.times, lo)
+        last = bisect_right(index.times, hi)
+        visits = []
+        for i in range(first, last):
+            row = index.rows[i]
+            if self.event_codes[row] != EVENT_CODES["ENTER"]:
+                continue
+            exit_row = index.rows[i + 1] if i + 1 < len(index.rows) else None
+            if exit_row is not None and self.event_codes[exit_row] != EVENT_CODES["EXIT"]:
+                exit_row = None
+            visits.append(Visit(
+                license_plate, self.spots[self.spot_codes[row]],
+                datetime.fromtimestamp(self.timestamps[row]),
+                datetime.fromtimestamp(self.timestamps[exit_row]) if exit_row is not None else None,
+                self.fees[exit_row] if exit_row is not None else 0.0))
+        return visits
+
+    def replay(self, start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> Iterator[EventRecord]:
+        """The events in the range as they were when the replay started."""
+        lo, hi = self._bounds(start, end)
+        with self.lock:
+            records = [self._record(row) for row in
+                       range(bisect_left(self.timestamps, lo), bisect_right(self.timestamps, hi))]
+        yield from records
+
+
+class EventStoreObserver(ParkingObserver):
+    """Records the lot's events. A failed write is counted, never raised into the lot."""
+
+    def __init__(self, store: ParkingEventStore):
+        self.store = store
+        self.failed = 0
+
+    def update(self, event: ParkingEvent):
+        try:
+            self.store.append(event.event_type, event.timestamp, event.vehicle.license_plate,
+                              event.spot.spot_id, event.fee)
+        except Exception as e:
+            self.failed += 1
+            print(f"Event store: could not record {event.event_type} "
+                  f"for {event.vehicle.license_plate}: {e}")
+
+
+def demo_event_store():
+    store = ParkingEventStore()
+    parking_lot = ParkingLot(ParkingConfig(motorcycle_spots=2, car_spots=2, bus_spots=1))
+    parking_lot.register_observer(EventStoreObserver(store))
+
+    # Three months of history, a few thousand plates
+    month_start = datetime(2024, 3, 1)
+    now = month_start - timedelta(days=60)
+    for i in range(200_000):
+        now += timedelta(minutes=1)
+        plate, spot = f"P-{i % 5000}", f"C-{i % 400}"
+        store.append("ENTER", now, plate, spot)
+        store.append("EXIT", now + timedelta(seconds=30), plate, spot, fee=2.5)
+
+    # Live events from the lot land in the same store
+    ticket = parking_lot.park_vehicle(Car("P-42"))
+    parking_lot.exit_vehicle(ticket.ticket_id)
+
+    start = time.perf_counter()
+    visits = store.visits("P-42", month_start, month_start + timedelta(days=31))
+    seek_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(store)} events stored")
+    print(f"P-42 visited {len(visits)} times in March ({seek_ms:.2f} ms), "
+          f"first: {visits[0].entered} at {visits[0].spot_id}, fee ${visits[0].fee:.2f}")
+
+    yesterday = month_start + timedelta(days=9)
+    events = store.events_at_spot("C-7", yesterday, yesterday + timedelta(days=1))
+    print(f"Spot C-7 had {len(events)} events on {yesterday.date()}")
+    print("Latest live events:", [(e.event_type, e.license_plate, e.fee)
+                                  for e in store.events_for_plate("P-42")[-2:]])
+
+
+if __name__ == "__main__":
+    demo_event_store()
@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 from datetime import datetime
-import uuid
 import threading
 import time
 from typing import List, Optional, Dict
 
+from ticket_ids import SnowflakeTicketIdGenerator
+
 # -----------------------------------------------------------------------------
 # EXCEPTIONS
 # -----------------------------------------------------------------------------
@@ -125,10 +126,13 @@ class LargeSpot(ParkingSpot):
         """Checks if the spot can accommodate the given vehicle (always True)."""
         return True
 
+# Ticket ids are 64-bit time-ordered Snowflake ids; one generator (gate 0) issues them all
+_ticket_ids = SnowflakeTicketIdGenerator(gate_id=0)
+
 class Ticket:
     """Represents a parking ticket."""
     def __init__(self, vehicle: Vehicle, spot: ParkingSpot):
-        self.ticket_id = str(uuid.uuid4())
+        self.ticket_id = _ticket_ids.next_id()
         self.vehicle = vehicle
         self.spot = spot
         self.entry_time = datetime.now()
@@ -0,0 +1,228 @@
+import heapq
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from hats_off import CreditCardProcessor, MobileWalletProcessor, ParkingLot, PaymentProcessor
+
+# Mean seconds a vehicle spends at a gate
+ENTRANCE_SERVICE_SECONDS = 6.0
+EXIT_SERVICE_SECONDS = 4.0  # ticket scan and barrier, before payment
+PAYMENT_LATENCY_SECONDS: Dict[Type[PaymentProcessor], float] = {
+    CreditCardProcessor: 9.0,
+    MobileWalletProcessor: 5.0,
+}
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    One gate bank under constant Poisson demand. gate_processors has one entry
+    per gate: None for an entrance gate, or the PaymentProcessor class of an
+    exit gate, whose payment latency is added to every vehicle it serves.
+    """
+    arrivals_per_hour: float
+    gate_processors: Tuple[Optional[Type[PaymentProcessor]], ...]
+    duration_hours: float = 2.0
+    seed: int = 0
+
+    @classmethod
+    def entrance(cls, arrivals_per_hour: float, gates: int, **kwargs) -> 'Scenario':
+        return cls(arrivals_per_hour, (None,) * gates, **kwargs)
+
+    @classmethod
+    def exits(cls, arrivals_per_hour: float, processors: Iterable[Type[PaymentProcessor]],
+              **kwargs) -> 'Scenario':
+        return cls(arrivals_per_hour, tuple(processors), **kwargs)
+
+    @classmethod
+    def from_lot(cls, parking_lot: ParkingLot, arrivals_per_hour: float, **kwargs) -> 'Scenario':
+        """Models the lot's current exit gates."""
+        return cls.exits(arrivals_per_hour,
+                         (type(gate.payment_processor) for gate in parking_lot.exit_gates), **kwargs)
+
+    @property
+    def gates(self) -> int:
+        return len(self.gate_processors)
+
+    def mean_service_seconds(self, gate: int) -> float:
+        processor = self.gate_processors[gate]
+        if processor is None:
+            return ENTRANCE_SERVICE_SECONDS
+        return EXIT_SERVICE_SECONDS + PAYMENT_LATENCY_SECONDS[processor]
+
+    def utilization(self) -> float:
+        capacity = sum(1 / self.mean_service_seconds(g) for g in range(self.gates))
+        return self.arrivals_per_hour / 3600 / capacity if capacity else math.inf
+
+
+@dataclass(frozen=True)
+class GateReport:
+    scenario: Scenario
+    vehicles: int
+    wait_p50: float
+    wait_p95: float
+    wait_p99: float
+    wait_max: float
+    max_queue: int
+    busy_fraction: float
+
+    def percentile(self, p: float) -> float:
+        return {50: self.wait_p50, 95: self.wait_p95, 99: self.wait_p99}[p]
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def simulate(scenario: Scenario) -> GateReport:
+    """
+    First-come first-served queue in front of the gate bank: each arrival goes
+    to the gate that frees up first. Service times are exponential around the
+    gate's mean. Because service starts in arrival order, start times are
+    non-decreasing and the queue at any arrival is just the earlier vehicles
+    whose start lies in the future, kept in a deque.
+    """
+    rng = random.Random(scenario.seed)
+    rate = scenario.arrivals_per_hour / 3600
+    horizon = scenario.duration_hours * 3600
+    means = [scenario.mean_service_seconds(g) for g in range(scenario.gates)]
+    free_at = [(0.0, g) for g in range(scenario.gates)]
+    waiting = deque()
+    waits = []
+    busy = 0.0
+    max_queue = 0
+    now = rng.expovariate(rate) if rate else horizon
+
+    while now < horizon:
+        while waiting and waiting[0] <= now:
+            waiting.popleft()
+        max_queue = max(max_queue, len(waiting))
+
+        free, gate = heapq.heappop(free_at)
+        start = max(now, free)
+        service = rng.expovariate(1 / means[gate])
+        heapq.heappush(free_at, (start + service, gate))
+        waits.append(start - now)
+        busy += service
+        if start > now:
+            waiting.append(start)
+        now += rng.expovariate(rate)
+
+    waits.sort()
+    return GateReport(
+        scenario=scenario,
+        vehicles=len(waits),
+        wait_p50=_percentile(waits, 50),
+        wait_p95=_percentile(waits, 95),
+        wait_p99=_percentile(waits, 99),
+        wait_max=waits[-1] if waits else 0.0,
+        max_queue=max_queue,
+        busy_fraction=busy / (horizon * scenario.gates) if scenario.gates else 0.0,
+    )
+
+
+def gates_needed(scenario: Scenario, slo_seconds: float, percentile: float = 95,
+                 processor: Optional[Type[PaymentProcessor]] = None, max_gates: int = 64) -> int:
+    """
+    Smallest number of gates for which the given wait percentile stays within
+    slo_seconds. Extra gates beyond the scenario's use `processor` (None means
+    entrance gates). Returns -1 if even max_gates is not enough.
+
+    The same seed is used for every gate count. When all gates are alike each
+    vehicle draws the same service time whichever gate it gets, so waits only
+    shrink as gates are added and a binary search applies. With mixed gates
+    an added gate changes which vehicles get the slow ones, so the wait can
+    go up; then every count is tried in turn.
+    """
+    def with_gates(count: int) -> Scenario:
+        processors = scenario.gate_processors[:count]
+        processors += (processor,) * (count - len(processors))
+        return replace(scenario, gate_processors=processors)
+
+    def meets_slo(count: int) -> bool:
+        return simulate(with_gates(count)).percentile(percentile) <= slo_seconds
+
+    # Fewer gates than the offered load can never keep up
+    low = 1
+    while low < max_gates and with_gates(low).utilization() >= 1:
+        low += 1
+    if len(set(with_gates(max_gates).gate_processors)) > 1:
+        for count in range(low, max_gates + 1):
+            if meets_slo(count):
+                return count
+        return -1
+    # Double until the SLO is met, then binary search the last doubling
+    high = low
+    while not meets_slo(high):
+        if high >= max_gates:
+            return -1
+        low, high = high + 1, min(max_gates, high * 2)
+    while low < high:
+        middle = (low + high) // 2
+        if meets_slo(middle):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def _gates_needed_task(args) -> int:
+    scenario, slo_seconds, percentile, processor = args
+    return gates_needed(scenario, slo_seconds, percentile, processor)
+
+
+def sweep(scenarios: List[Scenario], processes: Optional[int] = None) -> List[GateReport]:
+    """Simulates every scenario across a process pool."""
+    with Pool(processes) as pool:
+        return pool.map(simulate, scenarios, chunksize=max(1, len(scenarios) // 64))
+
+
+def sweep_gates_needed(scenarios: List[Scenario], slo_seconds: float, percentile: float = 95,
+                       processor: Optional[Type[PaymentProcessor]] = None,
+                       processes: Optional[int] = None) -> List[int]:
+    tasks = [(scenario, slo_seconds, percentile, processor) for scenario in scenarios]
+    with Pool(processes) as pool:
+        return pool.map(_gates_needed_task, tasks, chunksize=max(1, len(tasks) // 64))
+
+
+def demo_gate_simulation():
+    parking_lot = ParkingLot("Simulation Lot", car_spots=10)
+    parking_lot.add_exit_gate(CreditCardProcessor())
+    parking_lot.add_exit_gate(MobileWalletProcessor())
+
+    scenario = Scenario.from_lot(parking_lot, arrivals_per_hour=500)
+    report = simulate(scenario)
+    print(f"Current exits at 500 veh/h: utilization {scenario.utilization():.0%}, "
+          f"wait p50 {report.wait_p50:.0f}s, p95 {report.wait_p95:.0f}s, "
+          f"max queue {report.max_queue}")
+    print(f"Exit gates for p95 wait <= 30s: "
+          f"{gates_needed(scenario, 30, processor=MobileWalletProcessor)}")
+
+    # Evening peak: how many wallet exit gates per demand level and seed
+    demands = list(range(100, 2100, 100))
+    scenarios = [Scenario.exits(demand, [MobileWalletProcessor], seed=seed)
+                 for demand in demands for seed in range(25)]
+    start = time.perf_counter()
+    needed = sweep_gates_needed(scenarios, slo_seconds=30, processor=MobileWalletProcessor)
+    elapsed = time.perf_counter() - start
+    print(f"Sized {len(scenarios)} scenarios in {elapsed:.1f}s")
+    for i, demand in enumerate(demands[::4]):
+        row = needed[i * 4 * 25:(i * 4 + 1) * 25]
+        print(f"  {demand:5d} veh/h -> {max(row)} gates (worst of {len(row)} seeds)")
+
+    entrance = Scenario.entrance(1500, gates=3)
+    reports = sweep([replace(entrance, seed=seed) for seed in range(1000)])
+    p95 = sorted(r.wait_p95 for r in reports)
+    print(f"3 entrance gates at 1500 veh/h: p95 wait median {p95[500]:.0f}s, "
+          f"worst {p95[-1]:.0f}s over {len(reports)} runs")
+
+
+if __name__ == "__main__":
+    demo_gate_simulation()
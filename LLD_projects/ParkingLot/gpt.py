@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 from datetime import datetime
-import uuid
+
+from ticket_ids import SnowflakeTicketIdGenerator
 
 # Enum for Vehicle Type
 class VehicleType(Enum):
@@ -100,10 +101,13 @@ class Truck(Vehicle):
     def __init__(self, vehicle_no: str):
         super().__init__(vehicle_no, VehicleType.TRUCK)
 
+# Ticket ids are 64-bit time-ordered Snowflake ids; one generator (gate 0) issues them all
+_ticket_ids = SnowflakeTicketIdGenerator(gate_id=0)
+
 # Ticket Class
 class Ticket:
     def __init__(self, vehicle, parking_spot):
-        self.ticket_id = str(uuid.uuid4())
+        self.ticket_id = _ticket_ids.next_id()
         self.vehicle = vehicle
         self.entry_time = datetime.now()
         self.parking_spot = parking_spot
@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 from datetime import datetime
-import uuid
 import threading
 import time
 from typing import Dict, List, Optional, Tuple
 
+from ticket_ids import SnowflakeTicketIdGenerator, TicketIdGenerator, normalize_ticket_id
+
 # Custom Exception Hierarchy
 class ParkingLotException(Exception):
     """Base exception for parking lot system"""
@@ -125,6 +126,17 @@ class NearestEntranceStrategy(ParkingStrategy):
         return next((spot for spot in spots 
                    if not spot.is_occupied and spot.can_accommodate(vehicle)), None)
 
+# Allocator Interface - takes over finding, occupying and vacating spots,
+# for allocation that does not map one vehicle to one spot (shared bays)
+class SpotAllocator(ABC):
+    @abstractmethod
+    def allocate(self, vehicle: Vehicle) -> Optional[ParkingSpot]:
+        pass
+
+    @abstractmethod
+    def release(self, license_plate: str) -> Optional[ParkingSpot]:
+        pass
+
 # Pricing Strategy Interfaces
 class PricingStrategy(ABC):
     @abstractmethod
@@ -186,13 +198,17 @@ class MobileWalletProcessor(PaymentProcessor):
 
 
 # Ticket and Gate Classes
+# Gate 0 is reserved for tickets created outside an entrance gate
+_default_ticket_ids = SnowflakeTicketIdGenerator(gate_id=0)
+
 class Ticket:
-    def __init__(self, vehicle: Vehicle, spot: ParkingSpot):
-        self.ticket_id = str(uuid.uuid4())
+    def __init__(self, vehicle: Vehicle, spot: ParkingSpot, ticket_id: Optional[str] = None):
+        self.ticket_id = ticket_id or _default_ticket_ids.next_id()
         self.entry_time = datetime.now()
         self.exit_time = None
         self.vehicle = vehicle
         self.spot = spot
+        self.billing_spot = spot  # priced at exit; a valet move does not change it
         self.fee_paid = 0.0
         self.payment_status = False
 
@@ -202,19 +218,25 @@ class Ticket:
         self.payment_status = True
 
 class EntranceGate:
-    def __init__(self, gate_id: int, parking_lot: 'ParkingLot'):
+    def __init__(self, gate_id: int, parking_lot: 'ParkingLot',
+                 id_generator: Optional[TicketIdGenerator] = None):
         self.gate_id = gate_id
         self.parking_lot = parking_lot
+        self.id_generator = id_generator or SnowflakeTicketIdGenerator(gate_id)
         
+    def select_spot(self, vehicle: Vehicle) -> Optional[ParkingSpot]:
+        return self.parking_lot.find_spot(vehicle)
+
     def issue_ticket(self, vehicle: Vehicle) -> Ticket:
-        spot = self.parking_lot.find_spot(vehicle)
+        allocator = self.parking_lot.allocator
+        spot = allocator.allocate(vehicle) if allocator else self.select_spot(vehicle)
         if not spot:
             raise NoSpotAvailableException(f"No spot available for {vehicle.vehicle_type.name}")
             
-        if not spot.occupy(vehicle):
+        if not allocator and not spot.occupy(vehicle):
             raise NoSpotAvailableException("Failed to occupy spot")
             
-        ticket = Ticket(vehicle, spot)
+        ticket = Ticket(vehicle, spot, self.id_generator.next_id())
         self.parking_lot.add_ticket(ticket)
         self.parking_lot.notify("ENTRY", vehicle, spot)
         return ticket
@@ -237,8 +259,9 @@ class ExitGate:
             raise PaymentFailedException("Payment processing failed")
             
         ticket.mark_paid(fee)
-        ticket.spot.vacate()
-        self.parking_lot.remove_ticket(ticket_id)
+        self.parking_lot.release_spot(ticket)
+        # The ticket as stored, not the id as typed in at the gate
+        self.parking_lot.remove_ticket(ticket.ticket_id)
         self.parking_lot.notify("EXIT", ticket.vehicle, ticket.spot)
         
         return fee
@@ -271,23 +294,10 @@ class OccupancyMonitor(ParkingObserver):
             self.alert_triggered = False
 
 
-# Main Parking Lot Class - Singleton Pattern
+# Main Parking Lot Class - one instance per lot, see ParkingLotRegistry for hosting many
 class ParkingLot:
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls, *args, **kwargs):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(ParkingLot, cls).__new__(cls)
-                cls._instance._initialized = False
-            return cls._instance
-    
     def __init__(self, name: str, motorcycle_spots: int = 10, 
                 car_spots: int = 20, large_spots: int = 5):
-        if self._initialized:
-            return
-            
         self.name = name
         self.spots = {
             VehicleType.BIKE: [MotorcycleSpot(f"M-{i}") for i in range(motorcycle_spots)],
@@ -297,13 +307,13 @@ class ParkingLot:
         
         self.parking_strategy = FirstAvailableStrategy()
         self.pricing_strategy = DynamicPricing()
+        self.allocator: Optional[SpotAllocator] = None  # replaces parking_strategy when set
         
         self.tickets = {}
+        self._tickets_by_spot: Optional[Dict[str, Ticket]] = {}  # spot id -> ticket; None until built
         self.observers = []
         self.entrance_gates = []
         self.exit_gates = []
-        
-        self._initialized = True
     
     def add_entrance_gate(self) -> EntranceGate:
         gate = EntranceGate(len(self.entrance_gates) + 1, self)
@@ -336,20 +346,52 @@ class ParkingLot:
         # For any vehicle, try large spots as last resort
         return self.parking_strategy.select_spot(self.spots[VehicleType.TRUCK], vehicle)
     
+    def release_spot(self, ticket: Ticket):
+        if self.allocator:
+            self.allocator.release(ticket.vehicle.license_plate)
+        else:
+            ticket.spot.vacate()
+
     def add_ticket(self, ticket: Ticket):
         self.tickets[ticket.ticket_id] = ticket
+        if self._tickets_by_spot is not None:
+            self._tickets_by_spot[ticket.spot.spot_id] = ticket
         
     def get_ticket(self, ticket_id: str) -> Optional[Ticket]:
-        return self.tickets.get(ticket_id)
+        # Fall back to the normalized form for manually typed ids
+        return self.tickets.get(ticket_id) or self.tickets.get(normalize_ticket_id(ticket_id))
         
     def remove_ticket(self, ticket_id: str):
-        if ticket_id in self.tickets:
-            del self.tickets[ticket_id]
+        ticket = self.tickets.pop(ticket_id, None)
+        if ticket and self._tickets_by_spot is not None \
+                and self._tickets_by_spot.get(ticket.spot.spot_id) is ticket:
+            del self._tickets_by_spot[ticket.spot.spot_id]
+
+    def _spot_index(self) -> Dict[str, Ticket]:
+        # Lots restored from a snapshot build it on first use, from their tickets
+        if self._tickets_by_spot is None:
+            self._tickets_by_spot = {t.spot.spot_id: t for t in self.tickets.values()}
+        return self._tickets_by_spot
+
+    def ticket_at(self, spot: ParkingSpot) -> Optional[Ticket]:
+        """Active ticket for the vehicle in `spot` (the latest one, if a bay is shared)."""
+        return self._spot_index().get(spot.spot_id)
+
+    def move_ticket(self, ticket: Ticket, spot: ParkingSpot):
+        """
+        The ticket follows its vehicle to `spot`, e.g. after a valet move. The
+        stay is still priced at the spot the driver parked in.
+        """
+        index = self._spot_index()
+        if index.get(ticket.spot.spot_id) is ticket:
+            del index[ticket.spot.spot_id]
+        ticket.spot = spot
+        index[spot.spot_id] = ticket
     
     def calculate_fee(self, ticket: Ticket) -> float:
         exit_time = datetime.now() if not ticket.exit_time else ticket.exit_time
         return self.pricing_strategy.calculate_fee(
-            ticket.entry_time, exit_time, ticket.spot, ticket.vehicle)
+            ticket.entry_time, exit_time, ticket.billing_spot, ticket.vehicle)
     
     def get_occupancy_rate(self) -> float:
         total_spots = sum(len(spots) for spots in self.spots.values())
@@ -404,23 +446,35 @@ class LoyaltyProgram:
 
 # Real-time Notification System - Surprise Feature 2
 class NotificationSystem(ParkingObserver):
-    def __init__(self):
-        self.subscribers = {}  # license_plate -> notification_callback
-        
+    """
+    Tells subscribed drivers when their vehicle enters or leaves. update()
+    runs on the gate's thread, so it only hands the event to a
+    NotificationDispatcher; the dispatcher's workers call the subscribers.
+    """
+    def __init__(self, dispatcher=None):
+        if dispatcher is None:
+            # notification_dispatcher imports this module, so it is imported late
+            from notification_dispatcher import NotificationDispatcher
+            dispatcher = NotificationDispatcher()
+        self.dispatcher = dispatcher
+
     def subscribe(self, license_plate: str, callback):
-        self.subscribers[license_plate] = callback
-        
+        self.dispatcher.subscribe(license_plate, callback)
+
+    def close(self):
+        """Deliver what is still queued."""
+        self.dispatcher.close()
+
+    @staticmethod
+    def format_message(event_type: str, spot_id: str) -> str:
+        if event_type == "ENTRY":
+            return f"Your vehicle has been parked at spot {spot_id}"
+        elif event_type == "EXIT":
+            return f"Your vehicle has exited from spot {spot_id}"
+        return f"Event {event_type} for your vehicle at spot {spot_id}"
+
     def update(self, event_type: str, vehicle: Vehicle, spot: ParkingSpot):
-        if vehicle.license_plate in self.subscribers:
-            if event_type == "ENTRY":
-                message = f"Your vehicle has been parked at spot {spot.spot_id}"
-            elif event_type == "EXIT":
-                message = f"Your vehicle has exited from spot {spot.spot_id}"
-            else:
-                message = f"Event {event_type} for your vehicle at spot {spot.spot_id}"
-                
-            # In real app, this would send an SMS, push notification, etc.
-            print(f"📱 NOTIFICATION TO {vehicle.license_plate}: {message}")
+        self.dispatcher.update(event_type, vehicle, spot)
 
 
 def test_parking_system():
@@ -457,7 +511,8 @@ def test_parking_system():
         truck = Truck("T-1234")
         
         # Subscribe car1 owner to notifications
-        notification_system.subscribe(car1.license_plate, lambda msg: None)
+        notification_system.subscribe(
+            car1.license_plate, lambda msg: print(f"📱 NOTIFICATION TO {car1.license_plate}: {msg}"))
         
         # Park vehicles
         print("\n----- Parking Vehicles -----")
@@ -553,6 +608,8 @@ def test_parking_system():
         
     except Exception as e:
         print(f"ERROR: {e}")
+    finally:
+        notification_system.close()
 
 if __name__ == "__main__":
     test_parking_system()
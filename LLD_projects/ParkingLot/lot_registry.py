@@ -0,0 +1,235 @@
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from hats_off import Car, ParkingLot, ParkingLotException, VehicleType
+from snapshot import (
+    LazySpotList, LazyTicketMap, SnapshotFormatException, SpotTable, load_snapshot,
+    unsaved_state, write_snapshot,
+)
+
+LOT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class UnknownLotException(ParkingLotException):
+    """Raised when a lot id has neither a resident lot, a snapshot nor a config"""
+    pass
+
+
+class ParkingLotRegistry:
+    """
+    Hosts many independent ParkingLot instances keyed by lot id.
+
+    Lots are created or restored from their snapshot on first access and kept
+    in LRU order; when more than max_resident lots are in memory, the least
+    recently used unpinned lot is written back to its snapshot and dropped.
+    Use lease() to hold a lot across several calls so it cannot be evicted
+    while in use.
+
+    A lot is only dropped once its snapshot is on disk. Lots with state the
+    snapshot format cannot carry (custom observers, pricing, payment
+    processors, id generators or spot types; see snapshot.unsaved_state)
+    are never evicted and stay resident, even over max_resident.
+    """
+
+    def __init__(self, snapshot_dir: str, max_resident: int = 256,
+                 lot_factory: Optional[Callable[[str, Dict], ParkingLot]] = None):
+        self.snapshot_dir = snapshot_dir
+        self.max_resident = max_resident
+        self.lot_factory = lot_factory or (lambda lot_id, config: ParkingLot(lot_id, **config))
+        self.configs: Dict[str, Dict] = {}
+        self._lots: "OrderedDict[str, ParkingLot]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self.lock = threading.RLock()
+        self.loads = 0
+        self.evictions = 0
+        self.failed_evictions = 0
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    def _path(self, lot_id: str) -> str:
+        if not LOT_ID_PATTERN.match(lot_id):
+            raise ValueError(f"Invalid lot id {lot_id!r}")
+        return os.path.join(self.snapshot_dir, f"{lot_id}.snap")
+
+    def register(self, lot_id: str, **config) -> None:
+        """Record how to build a lot; nothing is allocated until first access."""
+        self._path(lot_id)
+        with self.lock:
+            self.configs[lot_id] = config
+
+    def get(self, lot_id: str) -> ParkingLot:
+        with self.lock:
+            lot = self._load(lot_id)
+            # Never the lot being handed out, even if every other one is pinned
+            self._evict_over_limit(keep=lot_id)
+            return lot
+
+    def _load(self, lot_id: str) -> ParkingLot:
+        # Callers hold the lock
+        lot = self._lots.get(lot_id)
+        if lot is not None:
+            self._lots.move_to_end(lot_id)
+            return lot
+
+        path = self._path(lot_id)
+        if os.path.exists(path):
+            lot = load_snapshot(path)
+            self.loads += 1
+        elif lot_id in self.configs:
+            lot = self.lot_factory(lot_id, self.configs[lot_id])
+        else:
+            raise UnknownLotException(f"Unknown parking lot {lot_id}")
+        self._lots[lot_id] = lot
+        return lot
+
+    @contextmanager
+    def lease(self, lot_id: str) -> Iterator[ParkingLot]:
+        with self.lock:
+            # Pinned before anything is evicted to make room for it
+            lot = self._load(lot_id)
+            self._pins[lot_id] = self._pins.get(lot_id, 0) + 1
+            self._evict_over_limit()
+        try:
+            yield lot
+        finally:
+            with self.lock:
+                self._pins[lot_id] -= 1
+                if not self._pins[lot_id]:
+                    del self._pins[lot_id]
+                self._evict_over_limit()
+
+    def _evict_over_limit(self, keep: Optional[str] = None) -> None:
+        for lot_id in list(self._lots):
+            if len(self._lots) <= self.max_resident:
+                break
+            if lot_id in self._pins or lot_id == keep or unsaved_state(self._lots[lot_id]):
+                continue
+            try:
+                self.evict(lot_id)
+            except Exception as e:
+                # Keep the lot resident rather than fail the caller, who asked for another lot
+                self.failed_evictions += 1
+                print(f"Keeping {lot_id} in memory: {e}")
+
+    def evict(self, lot_id: str) -> None:
+        with self.lock:
+            lot = self._lots.get(lot_id)
+            if lot is None:
+                return
+            lost = unsaved_state(lot)
+            if lost:
+                raise SnapshotFormatException(f"Evicting {lot_id} would lose {', '.join(lost)}")
+            # Dropped only once it is safely on disk
+            self._persist(lot_id, lot)
+            del self._lots[lot_id]
+            self.evictions += 1
+
+    def _persist(self, lot_id: str, lot: ParkingLot) -> None:
+        # Write then rename: a lot restored earlier may still have the old file mapped
+        path = self._path(lot_id)
+        fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            write_snapshot(lot, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def flush(self) -> None:
+        with self.lock:
+            for lot_id, lot in self._lots.items():
+                self._persist(lot_id, lot)
+
+    def resident_lots(self):
+        with self.lock:
+            return list(self._lots)
+
+    def memory_report(self) -> Dict[str, int]:
+        """Approximate bytes held in memory by each resident lot."""
+        with self.lock:
+            return {lot_id: estimate_lot_memory(lot) for lot_id, lot in self._lots.items()}
+
+
+def _object_bytes(obj) -> int:
+    size = sys.getsizeof(obj)
+    attributes = getattr(obj, "__dict__", None)
+    if attributes is not None:
+        size += sys.getsizeof(attributes)
+        size += sum(sys.getsizeof(value) for value in attributes.values()
+                    if isinstance(value, (str, float, int)))
+    return size
+
+
+def estimate_lot_memory(lot: ParkingLot) -> int:
+    """
+    Cheap estimate: one sampled spot and ticket times the number of them that
+    are materialized. Lazily restored spots and tickets still in the mmap are
+    not counted, since the page cache holds them.
+    """
+    total = _object_bytes(lot)
+    spot_count = 0
+    sample_spot = None
+    for spots in lot.spots.values():
+        if isinstance(spots, LazySpotList):
+            table: SpotTable = spots.table
+            spot_count += sum(len(chunk) for chunk in table._chunks.values()) * len(spots) \
+                // max(1, len(table))
+            chunk = next(iter(table._chunks.values()), None)
+            sample_spot = sample_spot or (chunk[0] if chunk else None)
+        else:
+            total += sys.getsizeof(spots)
+            spot_count += len(spots)
+            sample_spot = sample_spot or (spots[0] if spots else None)
+    if sample_spot is not None:
+        total += spot_count * (_object_bytes(sample_spot) + sys.getsizeof(sample_spot.lock))
+
+    tickets = lot.tickets
+    loaded = tickets._loaded if isinstance(tickets, LazyTicketMap) else tickets
+    total += sys.getsizeof(loaded)
+    sample_ticket = next(iter(loaded.values()), None)
+    if sample_ticket is not None:
+        total += len(loaded) * (_object_bytes(sample_ticket) + _object_bytes(sample_ticket.vehicle))
+    return total
+
+
+def demo_registry(tenants: int = 3000, requests: int = 20_000):
+    snapshot_dir = tempfile.mkdtemp(prefix="parking-lots-")
+    registry = ParkingLotRegistry(snapshot_dir, max_resident=200)
+    for i in range(tenants):
+        registry.register(f"lot-{i}", motorcycle_spots=5, car_spots=20, large_spots=3)
+
+    rng = random.Random(1)
+    hot_lots = [f"lot-{i}" for i in range(50)]
+    start = time.perf_counter()
+    for i in range(requests):
+        # Most traffic hits a few busy lots, the rest is spread over the long tail
+        lot_id = rng.choice(hot_lots) if rng.random() < 0.8 else f"lot-{rng.randrange(tenants)}"
+        with registry.lease(lot_id) as lot:
+            gate = lot.entrance_gates[0] if lot.entrance_gates else lot.add_entrance_gate()
+            if lot.get_status()["available_car_spots"]:
+                gate.issue_ticket(Car(f"{lot_id}-C{i}"))
+    elapsed = time.perf_counter() - start
+
+    report = registry.memory_report()
+    print(f"{requests} requests over {tenants} lots in {elapsed:.2f}s")
+    print(f"Resident: {len(registry.resident_lots())}, snapshot loads: {registry.loads}, "
+          f"evictions: {registry.evictions}")
+    print(f"Resident memory ~{sum(report.values()) / 1e6:.1f} MB, "
+          f"largest tenant ~{max(report.values()) / 1e3:.0f} KB")
+    busiest = registry.get("lot-0")
+    print(f"lot-0 active tickets: {len(busiest.tickets)}, "
+          f"free car spots: {sum(not s.is_occupied for s in busiest.spots[VehicleType.CAR])}")
+    shutil.rmtree(snapshot_dir)
+
+
+if __name__ == "__main__":
+    demo_registry()
@@ -0,0 +1,234 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from hats_off import Car, NotificationSystem, ParkingLot, ParkingObserver, ParkingSpot, Vehicle
+
+
+class Notification(NamedTuple):
+    license_plate: str
+    event_type: str
+    spot_id: str
+    created: float
+
+    @property
+    def message(self) -> str:
+        return NotificationSystem.format_message(self.event_type, self.spot_id)
+
+
+class Subscription:
+    def __init__(self, callback: Callable[[str], None], channel: str,
+                 rate: float, burst: int, now: float):
+        self.callback = callback
+        self.channel = channel
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled = now
+
+    def allow(self, now: float) -> bool:
+        # Token bucket: `burst` notifications at once, refilled at `rate` per second
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class NotificationDispatcher(ParkingObserver):
+    """
+    Asynchronous replacement for NotificationSystem.
+
+    update() runs on the gate's thread and only does dictionary lookups and a
+    non-blocking enqueue: repeated (plate, event, spot) notifications within
+    dedup_window are dropped, each subscriber is rate limited by a token
+    bucket, and a full channel queue drops the notification rather than wait.
+    One flusher thread per channel groups queued notifications into batches
+    and hands them to a worker pool, where the channel sender runs; at most
+    max_pending_batches wait for or run in the pool, and a batch beyond that
+    is dropped. The default sender invokes each subscriber's callback with
+    the message.
+    """
+
+    def __init__(self, workers: int = 4, batch_size: int = 50, flush_interval: float = 0.05,
+                 dedup_window: float = 30.0, rate_per_second: float = 0.2, burst: int = 3,
+                 queue_size: int = 10_000, max_pending_batches: Optional[int] = None,
+                 clock=time.monotonic):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedup_window = dedup_window
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.queue_size = queue_size
+        self.clock = clock
+        self.subscribers: Dict[str, Subscription] = {}
+        self.senders: Dict[str, Optional[Callable[[List[Notification]], None]]] = {}
+        self.queues: Dict[str, queue.Queue] = {}
+        self.flushers: List[threading.Thread] = []
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="notify")
+        self.pending_batches = threading.BoundedSemaphore(max_pending_batches or 4 * workers)
+        self._recent: Dict[Tuple[str, str, str], float] = {}
+        self._stop = threading.Event()
+        self.lock = threading.Lock()
+        self.counters = {"queued": 0, "sent": 0, "deduplicated": 0,
+                         "rate_limited": 0, "dropped": 0, "failed": 0}
+
+    def register_channel(self, channel: str,
+                         sender: Optional[Callable[[List[Notification]], None]] = None) -> None:
+        with self.lock:
+            if channel in self.queues:
+                return
+            self.senders[channel] = sender  # None: call the subscribers back
+            self.queues[channel] = queue.Queue(maxsize=self.queue_size)
+            flusher = threading.Thread(target=self._flush_loop, args=(channel,),
+                                       name=f"notify-{channel}", daemon=True)
+            self.flushers.append(flusher)
+            flusher.start()
+
+    def subscribe(self, license_plate: str, callback: Callable[[str], None],
+                  channel: str = "push") -> None:
+        self.register_channel(channel)
+        with self.lock:
+            self.subscribers[license_plate] = Subscription(
+                callback, channel, self.rate_per_second, self.burst, self.clock())
+
+    def unsubscribe(self, license_plate: str) -> None:
+        with self.lock:
+            self.subscribers.pop(license_plate, None)
+
+    def update(self, event_type: str, vehicle: Vehicle, spot: ParkingSpot):
+        subscription = self.subscribers.get(vehicle.license_plate)
+        if subscription is None:
+            return
+        now = self.clock()
+        key = (vehicle.license_plate, event_type, spot.spot_id)
+        with self.lock:
+            last = self._recent.get(key)
+            if last is not None and now - last < self.dedup_window:
+                self.counters["deduplicated"] += 1
+                return
+            self._recent[key] = now
+            if len(self._recent) > 4 * self.queue_size:
+                self._prune(now)
+            if not subscription.allow(now):
+                self.counters["rate_limited"] += 1
+                return
+        try:
+            self.queues[subscription.channel].put_nowait(
+                Notification(vehicle.license_plate, event_type, spot.spot_id, now))
+            self._count("queued")
+        except queue.Full:
+            self._count("dropped")
+
+    def _prune(self, now: float) -> None:
+        self._recent = {key: seen for key, seen in self._recent.items()
+                        if now - seen < self.dedup_window}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] += amount
+
+    def _flush_loop(self, channel: str) -> None:
+        pending = self.queues[channel]
+        while not (self._stop.is_set() and pending.empty()):
+            try:
+                batch = [pending.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if not self.pending_batches.acquire(blocking=False):
+                self._count("dropped", len(batch))  # the senders are that far behind
+                continue
+            self.pool.submit(self._send, channel, batch)
+
+    def _send(self, channel: str, batch: List[Notification]) -> None:
+        try:
+            sender = self.senders[channel]
+            if sender is None:
+                self._invoke_callbacks(batch)
+                return
+            try:
+                sender(batch)
+                self._count("sent", len(batch))
+            except Exception:
+                self._count("failed", len(batch))
+        finally:
+            self.pending_batches.release()
+
+    def _invoke_callbacks(self, batch: List[Notification]) -> None:
+        # Counted one by one: a failing callback does not make the rest "failed" too
+        sent = failed = dropped = 0
+        for notification in batch:
+            subscription = self.subscribers.get(notification.license_plate)
+            if subscription is None:
+                dropped += 1  # unsubscribed since it was queued
+                continue
+            try:
+                subscription.callback(notification.message)
+                sent += 1
+            except Exception:
+                failed += 1
+        with self.lock:
+            self.counters["sent"] += sent
+            self.counters["failed"] += failed
+            self.counters["dropped"] += dropped
+
+    def close(self) -> None:
+        """Stop accepting batches, deliver what is queued and wait for the pool."""
+        self._stop.set()
+        for flusher in self.flushers:
+            flusher.join()
+        self.pool.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters)
+
+
+def demo_notifications():
+    parking_lot = ParkingLot("Notification Demo Lot", car_spots=500)
+    dispatcher = NotificationDispatcher(rate_per_second=1.0, burst=2)
+    parking_lot.register_observer(dispatcher)
+    gate = parking_lot.add_entrance_gate()
+
+    delivered = []
+
+    def slow_sms_gateway(batch: List[Notification]):
+        time.sleep(0.2)  # one round trip per batch
+        delivered.extend(batch)
+
+    dispatcher.register_channel("sms", slow_sms_gateway)
+    cars = [Car(f"C-{i}") for i in range(300)]
+    for car in cars:
+        dispatcher.subscribe(car.license_plate, lambda message: None, channel="sms")
+
+    start = time.perf_counter()
+    tickets = [gate.issue_ticket(car) for car in cars]
+    for ticket in tickets[:10]:
+        # A noisy sensor repeating the same event is deduplicated
+        for _ in range(5):
+            parking_lot.notify("ENTRY", ticket.vehicle, ticket.spot)
+    for ticket in tickets[10:20]:
+        # A car shuffled between spots only gets its burst, then is rate limited
+        for other in tickets[20:25]:
+            parking_lot.notify("ENTRY", ticket.vehicle, other.spot)
+    gate_ms = (time.perf_counter() - start) * 1000
+    print(f"Gate issued {len(tickets)} tickets in {gate_ms:.1f} ms with a 200 ms SMS sink")
+
+    dispatcher.close()
+    print(f"Delivered {len(delivered)} SMS, stats: {dispatcher.get_stats()}")
+
+
+if __name__ == "__main__":
+    demo_notifications()
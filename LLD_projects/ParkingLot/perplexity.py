@@ -2,11 +2,12 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import Enum
 import threading
-import uuid
 import time
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
+from ticket_ids import SnowflakeTicketIdGenerator
+
 # ======================
 # ENUMS AND DATA CLASSES
 # ======================
@@ -153,11 +154,12 @@ class MobileWalletProcessor(PaymentProcessor):
 # OBSERVER PATTERN
 # ===================
 class ParkingEvent:
-    def __init__(self, event_type: str, vehicle: Vehicle, spot: ParkingSpot):
+    def __init__(self, event_type: str, vehicle: Vehicle, spot: ParkingSpot, fee: float = 0.0):
         self.timestamp = datetime.now()
         self.event_type = event_type
         self.vehicle = vehicle
         self.spot = spot
+        self.fee = fee
 
 class ParkingObserver(ABC):
     @abstractmethod
@@ -182,15 +184,8 @@ class CapacityObserver(ParkingObserver):
 # CORE SYSTEM
 # ==============
 class ParkingLot:
-    _instance = None
-    _lock = threading.Lock()
-
-    def __new__(cls, config: ParkingConfig = ParkingConfig()):
-        with cls._lock:
-            if not cls._instance:
-                cls._instance = super().__new__(cls)
-                cls._instance._initialize(config)
-            return cls._instance
+    def __init__(self, config: ParkingConfig = ParkingConfig()):
+        self._initialize(config)
 
     def _initialize(self, config: ParkingConfig):
         self.config = config
@@ -204,6 +199,7 @@ class ParkingLot:
         self.parking_strategy: ParkingStrategy = EnergyEfficientStrategy()
         self.pricing_strategy: PricingStrategy = SurgePricing()
         self.payment_processor: PaymentProcessor = CreditCardProcessor()
+        self.ticket_ids = SnowflakeTicketIdGenerator(gate_id=0)
 
     def register_observer(self, observer: ParkingObserver):
         self.observers.append(observer)
@@ -222,7 +218,7 @@ class ParkingLot:
         for spot in self._find_appropriate_spots(vehicle.vehicle_type):
             selected_spot = self.parking_strategy.select_spot(spot, vehicle)
             if selected_spot and selected_spot.occupy(vehicle):
-                ticket = Ticket(vehicle, selected_spot)
+                ticket = Ticket(vehicle, selected_spot, self.ticket_ids.next_id())
                 self.tickets[ticket.ticket_id] = ticket
                 self._notify_observers(ParkingEvent("ENTER", vehicle, selected_spot))
                 return ticket
@@ -246,13 +242,13 @@ class ParkingLot:
         if self.payment_processor.process_payment(fee):
             ticket.spot.vacate()
             del self.tickets[ticket_id]
-            self._notify_observers(ParkingEvent("EXIT", ticket.vehicle, ticket.spot))
+            self._notify_observers(ParkingEvent("EXIT", ticket.vehicle, ticket.spot, fee))
             return fee
         raise PaymentFailedException("Payment processing failed")
 
 class Ticket:
-    def __init__(self, vehicle: Vehicle, spot: ParkingSpot):
-        self.ticket_id = str(uuid.uuid4())
+    def __init__(self, vehicle: Vehicle, spot: ParkingSpot, ticket_id: str):
+        self.ticket_id = ticket_id
         self.entry_time = datetime.now()
         self.vehicle = vehicle
         self.spot = spot
@@ -0,0 +1,503 @@
+import mmap
+import struct
+import threading
+import time
+from array import array
+from collections.abc import MutableMapping, Sequence
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from bin_packing import BinPackingAllocator
+from hats_off import (
+    Bike, Car, CompactSpot, CreditCardProcessor, CustomerType, DisplayObserver,
+    DynamicPricing, EntranceGate, ExitGate, FirstAvailableStrategy, HourlyPricing,
+    LargeSpot, MobileWalletProcessor, MotorcycleSpot, NearestEntranceStrategy,
+    OccupancyMonitor, ParkingLot, ParkingLotException, ParkingSpot, Ticket, Truck,
+    VehicleType,
+)
+from ticket_ids import SnowflakeTicketIdGenerator
+
+
+class SnapshotFormatException(ParkingLotException):
+    """Raised when a snapshot file is malformed or from an unsupported version"""
+    pass
+
+
+# File layout (little endian):
+#   header   magic, version, section count
+#   toc      (section id, offset, length) per section
+#   sections META, SPOT_TYPES, SPOT_RATES, SPOT_IDS + SPOT_ID_OFFSETS, OCCUPANCY,
+#            TICKETS (fixed records sorted by ticket id), TICKET_STRINGS, OBSERVERS,
+#            ALLOCATOR (version 2, only for lots parking through an allocator),
+#            BILLING_SPOTS (version 2, only when a ticket is priced at a spot it
+#            was moved from: ticket record and spot index pairs)
+MAGIC = b"PLSN"
+SNAPSHOT_VERSION = 2
+
+HEADER = struct.Struct("<4sHH")
+TOC_ENTRY = struct.Struct("<HQQ")
+META = struct.Struct("<IIIBdddBHH")
+TICKET_RECORD = struct.Struct("<IBBdIHIH")
+OBSERVER_RECORD = struct.Struct("<BdB")
+
+SECTION_META = 1
+SECTION_SPOT_TYPES = 2
+SECTION_SPOT_RATES = 3
+SECTION_SPOT_IDS = 4
+SECTION_OCCUPANCY = 5
+SECTION_TICKETS = 6
+SECTION_TICKET_STRINGS = 7
+SECTION_OBSERVERS = 8
+SECTION_SPOT_ID_OFFSETS = 9
+SECTION_ALLOCATOR = 10
+SECTION_BILLING_SPOTS = 11
+
+SPOT_CODES = {MotorcycleSpot: 1, CompactSpot: 2, LargeSpot: 3}
+SPOT_CLASSES = {code: cls for cls, code in SPOT_CODES.items()}
+VEHICLE_CLASSES = {VehicleType.BIKE: Bike, VehicleType.CAR: Car, VehicleType.TRUCK: Truck}
+PRICING_CODES = {HourlyPricing: 0, DynamicPricing: 1}
+STRATEGY_CODES = {FirstAvailableStrategy: 0, NearestEntranceStrategy: 1}
+STRATEGY_CLASSES = {code: cls for cls, code in STRATEGY_CODES.items()}
+PROCESSOR_CODES = {CreditCardProcessor: 1, MobileWalletProcessor: 2}
+PROCESSOR_CLASSES = {code: cls for cls, code in PROCESSOR_CODES.items()}
+OBSERVER_DISPLAY = 1
+OBSERVER_OCCUPANCY = 2
+# The allocator's bays are rebuilt from the tickets, so only its kind is stored
+ALLOCATOR_CODES = {BinPackingAllocator: 1}
+ALLOCATOR_CLASSES = {code: cls for cls, code in ALLOCATOR_CODES.items()}
+
+
+def _flat_spots(parking_lot: ParkingLot) -> List[ParkingSpot]:
+    return [spot for vt in VehicleType for spot in parking_lot.spots[vt]]
+
+
+def unsaved_state(parking_lot: ParkingLot) -> List[str]:
+    """
+    What a snapshot of the lot would not carry: spot types, strategies, payment
+    processors, ticket id generators and observers it has no code for. Empty
+    if the lot survives a round trip as it is.
+    """
+    # Spots restored from a snapshot are of known types by construction
+    spot_types = {type(spot) for spots in parking_lot.spots.values()
+                  if not isinstance(spots, LazySpotList) for spot in spots}
+    lost = [f"spot type {cls.__name__}" for cls in spot_types - SPOT_CODES.keys()]
+    if type(parking_lot.pricing_strategy) not in PRICING_CODES:
+        lost.append(f"pricing {type(parking_lot.pricing_strategy).__name__}")
+    if type(parking_lot.parking_strategy) not in STRATEGY_CODES:
+        lost.append(f"strategy {type(parking_lot.parking_strategy).__name__}")
+    if parking_lot.allocator is not None and type(parking_lot.allocator) not in ALLOCATOR_CODES:
+        lost.append(f"allocator {type(parking_lot.allocator).__name__}")
+    lost += [f"id generator of entrance gate {gate.gate_id}" for gate in parking_lot.entrance_gates
+             if type(gate.id_generator) is not SnowflakeTicketIdGenerator]
+    lost += [f"processor of exit gate {gate.gate_id}" for gate in parking_lot.exit_gates
+             if type(gate.payment_processor) not in PROCESSOR_CODES]
+    lost += [f"observer {type(observer).__name__}" for observer in parking_lot.observers
+             if type(observer) not in (OccupancyMonitor, DisplayObserver)]
+    return lost
+
+
+def write_snapshot(parking_lot: ParkingLot, path: str) -> int:
+    """
+    Serialize the lot into the snapshot format with a single buffered write.
+    Returns the number of bytes written.
+    """
+    spots = _flat_spots(parking_lot)
+    spot_index = {id(spot): i for i, spot in enumerate(spots)}
+
+    try:
+        spot_types = bytes(SPOT_CODES[type(spot)] for spot in spots)
+    except KeyError as e:
+        raise SnapshotFormatException(f"Unsupported spot type {e.args[0].__name__}")
+    spot_ids = [spot.spot_id for spot in spots]
+    spot_id_blob = bytearray()
+    spot_id_offsets = array("I", [0])
+    for spot_id in spot_ids:
+        spot_id_blob += spot_id.encode()
+        spot_id_offsets.append(len(spot_id_blob))
+
+    occupancy = bytearray((len(spots) + 7) // 8)
+    for i, spot in enumerate(spots):
+        if spot.is_occupied:
+            occupancy[i >> 3] |= 1 << (i & 7)
+
+    pricing = parking_lot.pricing_strategy
+    meta = parking_lot.name.encode()
+    meta = struct.pack("<H", len(meta)) + meta + META.pack(
+        *(len(parking_lot.spots[vt]) for vt in VehicleType),
+        PRICING_CODES.get(type(pricing), 0),
+        getattr(pricing, "base_multiplier", 1.0),
+        getattr(pricing, "peak_multiplier", 1.0),
+        getattr(pricing, "occupancy_threshold", 0.0),
+        STRATEGY_CODES.get(type(parking_lot.parking_strategy), 0),
+        len(parking_lot.entrance_gates),
+        len(parking_lot.exit_gates),
+    ) + bytes(PROCESSOR_CODES.get(type(gate.payment_processor), 1)
+              for gate in parking_lot.exit_gates)
+
+    # Tickets are sorted by encoded id so the loader can binary search the mmap
+    strings = bytearray()
+    records = bytearray()
+    billing_spots = array("I")
+    tickets = sorted(parking_lot.tickets.values(), key=lambda t: t.ticket_id.encode())
+    for index, ticket in enumerate(tickets):
+        if ticket.billing_spot is not ticket.spot:
+            billing_spots.extend((index, spot_index[id(ticket.billing_spot)]))
+        ticket_id, plate = ticket.ticket_id.encode(), ticket.vehicle.license_plate.encode()
+        records += TICKET_RECORD.pack(
+            spot_index[id(ticket.spot)], ticket.vehicle.vehicle_type.value,
+            ticket.vehicle.customer_type.value, ticket.entry_time.timestamp(),
+            len(strings), len(ticket_id), len(strings) + len(ticket_id), len(plate))
+        strings += ticket_id
+        strings += plate
+
+    observers = bytearray()
+    for observer in parking_lot.observers:
+        if isinstance(observer, OccupancyMonitor):
+            observers += OBSERVER_RECORD.pack(OBSERVER_OCCUPANCY, observer.threshold,
+                                              observer.alert_triggered)
+        elif isinstance(observer, DisplayObserver):
+            observers += OBSERVER_RECORD.pack(OBSERVER_DISPLAY, 0.0, 0)
+
+    sections = [
+        (SECTION_META, meta),
+        (SECTION_SPOT_TYPES, spot_types),
+        (SECTION_SPOT_RATES, array("d", (spot.hourly_rate for spot in spots)).tobytes()),
+        (SECTION_SPOT_IDS, bytes(spot_id_blob)),
+        (SECTION_SPOT_ID_OFFSETS, spot_id_offsets.tobytes()),
+        (SECTION_OCCUPANCY, bytes(occupancy)),
+        (SECTION_TICKETS, struct.pack("<I", len(tickets)) + bytes(records)),
+        (SECTION_TICKET_STRINGS, bytes(strings)),
+        (SECTION_OBSERVERS, bytes(observers)),
+    ]
+    version = 1
+    if parking_lot.allocator is not None:
+        code = ALLOCATOR_CODES.get(type(parking_lot.allocator))
+        if code is None:
+            raise SnapshotFormatException(
+                f"Unsupported allocator {type(parking_lot.allocator).__name__}")
+        sections.append((SECTION_ALLOCATOR, bytes([code])))
+        version = 2  # older readers would restore the lot without it
+    if billing_spots:
+        sections.append((SECTION_BILLING_SPOTS, billing_spots.tobytes()))
+        version = 2  # older readers would price moved tickets at their new spot
+
+    offset = HEADER.size + TOC_ENTRY.size * len(sections)
+    buffer = bytearray(HEADER.pack(MAGIC, version, len(sections)))
+    for section_id, payload in sections:
+        buffer += TOC_ENTRY.pack(section_id, offset, len(payload))
+        offset += len(payload)
+    for _, payload in sections:
+        buffer += payload
+
+    with open(path, "wb") as f:
+        f.write(buffer)
+    return len(buffer)
+
+
+class SpotTable(Sequence):
+    """
+    All spots of a snapshot in bucket order, decoded from the mmap columns in
+    chunks the first time any spot of a chunk is accessed.
+    """
+
+    CHUNK = 4096
+
+    def __init__(self, spot_types: bytes, rates: array, ids: memoryview,
+                 id_offsets: array, occupancy: memoryview):
+        if not len(spot_types) == len(rates) == len(id_offsets) - 1:
+            raise SnapshotFormatException("Spot table columns have different lengths")
+        self.spot_types = spot_types
+        self.rates = rates
+        self.ids = ids
+        self.id_offsets = id_offsets
+        self.occupancy = occupancy
+        self._chunks: Dict[int, List[ParkingSpot]] = {}
+        self.lock = threading.Lock()
+
+    def _chunk(self, number: int) -> List[ParkingSpot]:
+        chunk = self._chunks.get(number)
+        if chunk is not None:
+            return chunk
+        with self.lock:
+            chunk = self._chunks.get(number)
+            if chunk is None:
+                chunk = self._chunks[number] = self._decode(
+                    number * self.CHUNK, min(len(self), (number + 1) * self.CHUNK))
+            return chunk
+
+    def _decode(self, start: int, stop: int) -> List[ParkingSpot]:
+        # Spots are built the way unpickling does: no __init__, state set directly
+        offsets = self.id_offsets
+        ids = bytes(self.ids[offsets[start]:offsets[stop]]).decode()
+        base = offsets[start]
+        chunk = []
+        for i in range(start, stop):
+            cls = SPOT_CLASSES[self.spot_types[i]]
+            spot = cls.__new__(cls)
+            spot.__dict__.update(
+                spot_id=ids[offsets[i] - base:offsets[i + 1] - base],
+                hourly_rate=self.rates[i],
+                is_occupied=bool(self.occupancy[i >> 3] >> (i & 7) & 1),
+                vehicle=None, lock=threading.Lock())
+            chunk.append(spot)
+        return chunk
+
+    def __len__(self) -> int:
+        return len(self.spot_types)
+
+    def __getitem__(self, index: int) -> ParkingSpot:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._chunk(index // self.CHUNK)[index % self.CHUNK]
+
+
+class LazySpotList(Sequence):
+    """Read-only view of one ParkingLot.spots bucket inside a SpotTable."""
+
+    def __init__(self, table: SpotTable, start: int, stop: int):
+        self.table = table
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.table[self.start + index]
+
+    def __iter__(self) -> Iterator[ParkingSpot]:
+        chunk_size = SpotTable.CHUNK
+        index = self.start
+        while index < self.stop:
+            chunk = self.table._chunk(index // chunk_size)
+            offset = index % chunk_size
+            end = min(len(chunk), offset + self.stop - index)
+            yield from chunk[offset:end]
+            index += end - offset
+
+
+class LazyTicketMap(MutableMapping):
+    """
+    Ticket dict backed by the snapshot's sorted ticket records.
+
+    Tickets are decoded from the mmap on first access; tickets added or removed
+    after the restore live in an in-memory overlay.
+    """
+
+    def __init__(self, buffer: mmap.mmap, records_offset: int, count: int,
+                 strings_offset: int, spots: 'SpotTable',
+                 billing_spots: Optional[Dict[int, int]] = None):
+        self.buffer = buffer
+        self.records_offset = records_offset
+        self.count = count
+        self.strings_offset = strings_offset
+        self.spots = spots
+        self.billing_spots = billing_spots or {}  # record index -> spot index
+        self._loaded: Dict[str, Ticket] = {}
+        self._shadowed = set()  # on-disk ids that were materialized or removed
+        self.lock = threading.Lock()
+
+    def _record(self, index: int):
+        return TICKET_RECORD.unpack_from(self.buffer, self.records_offset + index * TICKET_RECORD.size)
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self.strings_offset + offset
+        return self.buffer[start:start + length]
+
+    def _find(self, ticket_id: str) -> int:
+        key = ticket_id.encode()
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            candidate = self._string(record[4], record[5])
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def _materialize(self, index: int) -> Ticket:
+        spot_idx, vehicle_type, customer_type, entry_ts, id_off, id_len, plate_off, plate_len = \
+            self._record(index)
+        vehicle_cls = VEHICLE_CLASSES[VehicleType(vehicle_type)]
+        vehicle = vehicle_cls(self._string(plate_off, plate_len).decode(),
+                              CustomerType(customer_type))
+        spot = self.spots[spot_idx]
+        spot.vehicle = vehicle
+
+        ticket = Ticket.__new__(Ticket)
+        ticket.ticket_id = self._string(id_off, id_len).decode()
+        ticket.entry_time = datetime.fromtimestamp(entry_ts)
+        ticket.exit_time = None
+        ticket.vehicle = vehicle
+        ticket.spot = spot
+        ticket.billing_spot = self.spots[self.billing_spots[index]] \
+            if index in self.billing_spots else spot
+        ticket.fee_paid = 0.0
+        ticket.payment_status = False
+        return ticket
+
+    def __getitem__(self, ticket_id: str) -> Ticket:
+        with self.lock:
+            if ticket_id in self._loaded:
+                return self._loaded[ticket_id]
+            if ticket_id in self._shadowed:
+                raise KeyError(ticket_id)
+            index = self._find(ticket_id)
+            if index < 0:
+                raise KeyError(ticket_id)
+            ticket = self._materialize(index)
+            self._loaded[ticket_id] = ticket
+            self._shadowed.add(ticket_id)
+            return ticket
+
+    def __setitem__(self, ticket_id: str, ticket: Ticket) -> None:
+        with self.lock:
+            if ticket_id not in self._shadowed and self._find(ticket_id) >= 0:
+                self._shadowed.add(ticket_id)
+            self._loaded[ticket_id] = ticket
+
+    def __delitem__(self, ticket_id: str) -> None:
+        with self.lock:
+            found = self._loaded.pop(ticket_id, None) is not None
+            if ticket_id not in self._shadowed and self._find(ticket_id) >= 0:
+                self._shadowed.add(ticket_id)
+                found = True
+            if not found:
+                raise KeyError(ticket_id)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._loaded)
+        for index in range(self.count):
+            record = self._record(index)
+            ticket_id = self._string(record[4], record[5]).decode()
+            if ticket_id not in self._shadowed:
+                yield ticket_id
+
+    def __len__(self) -> int:
+        return self.count - len(self._shadowed) + len(self._loaded)
+
+
+def load_snapshot(path: str) -> ParkingLot:
+    """
+    Restore an independent ParkingLot from a snapshot. Spots and tickets stay in
+    the mmap until they are first touched.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < HEADER.size:
+        raise SnapshotFormatException("Snapshot is truncated")
+    magic, version, section_count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise SnapshotFormatException("Not a parking lot snapshot")
+    if version > SNAPSHOT_VERSION:
+        raise SnapshotFormatException(f"Unsupported snapshot version {version}")
+
+    toc = {}
+    for i in range(section_count):
+        section_id, offset, length = TOC_ENTRY.unpack_from(buffer, HEADER.size + i * TOC_ENTRY.size)
+        if offset + length > len(buffer):
+            raise SnapshotFormatException(f"Section {section_id} is truncated")
+        toc[section_id] = (offset, length)
+
+    def section(section_id: int) -> memoryview:
+        offset, length = toc[section_id]
+        return memoryview(buffer)[offset:offset + length]
+
+    meta = section(SECTION_META)
+    name_len, = struct.unpack_from("<H", meta, 0)
+    name = bytes(meta[2:2 + name_len]).decode()
+    *bucket_sizes, pricing_code, base_mult, peak_mult, threshold, strategy_code, \
+        entrances, exits = META.unpack_from(meta, 2 + name_len)
+    processor_codes = bytes(meta[2 + name_len + META.size:])
+
+    parking_lot = object.__new__(ParkingLot)
+    parking_lot.name = name
+    parking_lot.spots = {}
+    parking_lot.parking_strategy = STRATEGY_CLASSES.get(strategy_code, FirstAvailableStrategy)()
+    parking_lot.pricing_strategy = (
+        DynamicPricing(base_mult, peak_mult, threshold) if pricing_code == 1 else HourlyPricing())
+    parking_lot.allocator = None
+    parking_lot.observers = []
+    parking_lot.entrance_gates = [EntranceGate(i + 1, parking_lot) for i in range(entrances)]
+    parking_lot.exit_gates = [
+        ExitGate(i + 1, parking_lot, PROCESSOR_CLASSES.get(code, CreditCardProcessor)())
+        for i, code in enumerate(processor_codes[:exits])]
+
+    rates = array("d")
+    rates.frombytes(section(SECTION_SPOT_RATES))
+    id_offsets = array("I")
+    id_offsets.frombytes(section(SECTION_SPOT_ID_OFFSETS))
+    spots = SpotTable(bytes(section(SECTION_SPOT_TYPES)), rates, section(SECTION_SPOT_IDS),
+                      id_offsets, section(SECTION_OCCUPANCY))
+    if sum(bucket_sizes) != len(spots):
+        raise SnapshotFormatException("Spot buckets do not match the spot table")
+    start = 0
+    for vt, size in zip(VehicleType, bucket_sizes):
+        parking_lot.spots[vt] = LazySpotList(spots, start, start + size)
+        start += size
+
+    tickets = section(SECTION_TICKETS)
+    ticket_count, = struct.unpack_from("<I", tickets, 0)
+    billing_spots = array("I")
+    if SECTION_BILLING_SPOTS in toc:
+        billing_spots.frombytes(section(SECTION_BILLING_SPOTS))
+    parking_lot.tickets = LazyTicketMap(
+        buffer, toc[SECTION_TICKETS][0] + 4, ticket_count,
+        toc[SECTION_TICKET_STRINGS][0], spots,
+        dict(zip(billing_spots[::2], billing_spots[1::2])))
+    parking_lot._tickets_by_spot = None
+    if SECTION_ALLOCATOR in toc:
+        code = bytes(section(SECTION_ALLOCATOR))[0]
+        if code not in ALLOCATOR_CLASSES:
+            raise SnapshotFormatException(f"Unsupported allocator code {code}")
+        parking_lot.allocator = ALLOCATOR_CLASSES[code].from_lot(parking_lot)
+
+    observers = section(SECTION_OBSERVERS)
+    for offset in range(0, len(observers), OBSERVER_RECORD.size):
+        kind, threshold, flag = OBSERVER_RECORD.unpack_from(observers, offset)
+        if kind == OBSERVER_OCCUPANCY:
+            monitor = OccupancyMonitor(parking_lot, threshold)
+            monitor.alert_triggered = bool(flag)
+            parking_lot.register_observer(monitor)
+        elif kind == OBSERVER_DISPLAY:
+            parking_lot.register_observer(DisplayObserver())
+    return parking_lot
+
+
+def demo_snapshot(path: str = "parking_lot.snap", spot_count: int = 1_000_000):
+    parking_lot = ParkingLot("Snapshot Demo Lot", motorcycle_spots=spot_count // 10,
+                             car_spots=spot_count * 8 // 10, large_spots=spot_count // 10)
+    gate = parking_lot.add_entrance_gate()
+    parking_lot.add_exit_gate(MobileWalletProcessor())
+    tickets = [gate.issue_ticket(Car(f"C-{i}")) for i in range(1000)]
+    parking_lot.register_observer(OccupancyMonitor(parking_lot, threshold=0.9))
+
+    start = time.perf_counter()
+    size = write_snapshot(parking_lot, path)
+    print(f"Wrote {size / 1e6:.1f} MB in {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    restored = load_snapshot(path)
+    print(f"Restored {spot_count} spots in {time.perf_counter() - start:.3f}s")
+
+    ticket = restored.get_ticket(tickets[42].ticket_id)
+    print(f"Ticket {ticket.ticket_id}: {ticket.vehicle.license_plate} at {ticket.spot.spot_id}")
+    print(f"Active tickets: {len(restored.tickets)}, "
+          f"last large spot: {restored.spots[VehicleType.TRUCK][-1].spot_id}")
+
+
+if __name__ == "__main__":
+    demo_snapshot()
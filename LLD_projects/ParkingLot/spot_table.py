@@ -0,0 +1,181 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from perplexity import (
+    Bus, Car, CompactSpot, EnergyEfficientStrategy, LargeSpot, Motorcycle,
+    MotorcycleSpot, ParkingConfig, ParkingEvent, ParkingLot, ParkingObserver,
+    ParkingSpot, ParkingStrategy, Vehicle, VehicleType,
+)
+
+TYPE_CODES = {MotorcycleSpot: 0, CompactSpot: 1, LargeSpot: 2}
+PROBE_VEHICLES = {VehicleType.MOTORCYCLE: Motorcycle("probe"), VehicleType.CAR: Car("probe"),
+                  VehicleType.BUS: Bus("probe")}
+# compatibility[vehicle_type][type_code], derived from the spots' own can_accommodate
+COMPATIBILITY = {
+    vt: np.array([cls("probe").can_accommodate(vehicle)
+                  for cls, _ in sorted(TYPE_CODES.items(), key=lambda item: item[1])])
+    for vt, vehicle in PROBE_VEHICLES.items()
+}
+
+
+class SpotTable:
+    """
+    Columnar view of a lot's spots: one NumPy array per attribute, one row per
+    spot in ParkingLot.spots order. The `group` column records which spots list
+    a row came from, so a strategy called with one list only considers it.
+
+    Masks that depend only on static columns (compatibility per vehicle type and
+    group) and the rate ordering are cached; occupancy is the only column that
+    changes per park and is kept current through SpotTableObserver.
+    """
+
+    def __init__(self, spots: Sequence[ParkingSpot], groups: Optional[Sequence[int]] = None,
+                 zones: Optional[Sequence[int]] = None,
+                 xy: Optional[Sequence[Tuple[float, float]]] = None):
+        n = len(spots)
+        self.spots = list(spots)
+        self.row_of: Dict[str, int] = {spot.spot_id: i for i, spot in enumerate(self.spots)}
+        self.ids = np.arange(n, dtype=np.int32)
+        self.type_code = np.fromiter((TYPE_CODES[type(s)] for s in self.spots), np.int8, n)
+        self.rate = np.fromiter((s.hourly_rate for s in self.spots), np.float64, n)
+        self.occupied = np.fromiter((s.is_occupied for s in self.spots), np.bool_, n)
+        self.group = np.zeros(n, np.int16) if groups is None else np.asarray(groups, np.int16)
+        self.zone = np.zeros(n, np.int16) if zones is None else np.asarray(zones, np.int16)
+        coords = np.zeros((n, 2), np.float32) if xy is None else np.asarray(xy, np.float32)
+        self.x, self.y = coords[:, 0].copy(), coords[:, 1].copy()
+        self._masks: Dict[Tuple, np.ndarray] = {}
+        self._rate_order: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_lot(cls, parking_lot: ParkingLot, **columns) -> Tuple['SpotTable', Dict[int, int]]:
+        """Returns the table and a map from id(spots list) to its group code."""
+        spots, groups, group_of = [], [], {}
+        for code, spot_list in enumerate(parking_lot.spots.values()):
+            group_of[id(spot_list)] = code
+            spots.extend(spot_list)
+            groups.extend([code] * len(spot_list))
+        return cls(spots, groups, **columns), group_of
+
+    def mark(self, spot: ParkingSpot, occupied: bool) -> None:
+        row = self.row_of.get(spot.spot_id)
+        if row is not None:
+            self.occupied[row] = occupied
+
+    def set_rate(self, spot: ParkingSpot, hourly_rate: float) -> None:
+        self.rate[self.row_of[spot.spot_id]] = hourly_rate
+        self._rate_order = None
+
+    def static_mask(self, vehicle_type: VehicleType, group: Optional[int] = None,
+                    zone: Optional[int] = None) -> np.ndarray:
+        key = (vehicle_type, group, zone)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = COMPATIBILITY[vehicle_type][self.type_code]
+            if group is not None:
+                mask = mask & (self.group == group)
+            if zone is not None:
+                mask = mask & (self.zone == zone)
+            self._masks[key] = mask
+        return mask
+
+    def rate_order(self) -> np.ndarray:
+        if self._rate_order is None:
+            # Stable, so equal rates keep list order like sorted() does
+            self._rate_order = np.argsort(self.rate, kind="stable")
+        return self._rate_order
+
+    def cheapest(self, vehicle_type: VehicleType, group: Optional[int] = None,
+                 zone: Optional[int] = None) -> int:
+        available = self.static_mask(vehicle_type, group, zone) & ~self.occupied
+        order = self.rate_order()
+        hits = available[order]
+        first = int(np.argmax(hits))
+        return int(order[first]) if hits[first] else -1
+
+    def nearest(self, vehicle_type: VehicleType, x: float, y: float,
+                group: Optional[int] = None, zone: Optional[int] = None) -> int:
+        available = self.static_mask(vehicle_type, group, zone) & ~self.occupied
+        if not available.any():
+            return -1
+        distance = (self.x - x) ** 2 + (self.y - y) ** 2
+        distance[~available] = np.inf
+        return int(np.argmin(distance))
+
+
+class SpotTableObserver(ParkingObserver):
+    def __init__(self, table: SpotTable):
+        self.table = table
+
+    def update(self, event: ParkingEvent):
+        self.table.mark(event.spot, event.event_type == "ENTER")
+
+
+class ColumnarStrategy(ParkingStrategy, ABC):
+    """Base for strategies answered from a SpotTable instead of walking spot objects."""
+
+    def __init__(self, table: SpotTable, group_of: Dict[int, int]):
+        self.table = table
+        self.group_of = group_of
+
+    @abstractmethod
+    def _row(self, vehicle: Vehicle, group: Optional[int]) -> int:
+        """Table row of the spot to offer, or -1 if none is free."""
+        pass
+
+    def select_spot(self, spots: List[ParkingSpot], vehicle: Vehicle) -> Optional[ParkingSpot]:
+        group = self.group_of.get(id(spots))
+        while True:
+            row = self._row(vehicle, group)
+            if row < 0:
+                return None
+            spot = self.table.spots[row]
+            if not spot.is_occupied:
+                return spot
+            # Occupied behind the table's back (e.g. before the observer ran)
+            self.table.occupied[row] = True
+
+
+class VectorizedEnergyEfficientStrategy(ColumnarStrategy):
+    """Same choice as EnergyEfficientStrategy: cheapest free spot, list order on ties."""
+
+    def _row(self, vehicle: Vehicle, group: Optional[int]) -> int:
+        return self.table.cheapest(vehicle.vehicle_type, group)
+
+
+class VectorizedNearestStrategy(ColumnarStrategy):
+    def __init__(self, table: SpotTable, group_of: Dict[int, int], x: float, y: float):
+        super().__init__(table, group_of)
+        self.x, self.y = x, y
+
+    def _row(self, vehicle: Vehicle, group: Optional[int]) -> int:
+        return self.table.nearest(vehicle.vehicle_type, self.x, self.y, group)
+
+
+def benchmark(spot_count: int = 1_000_000, parks: int = 20):
+    config = ParkingConfig(motorcycle_spots=spot_count // 10, car_spots=spot_count * 8 // 10,
+                           bus_spots=spot_count // 10)
+    parking_lot = ParkingLot(config)
+    start = time.perf_counter()
+    table, group_of = SpotTable.from_lot(parking_lot)
+    print(f"Built table for {len(table.spots)} spots in {time.perf_counter() - start:.2f}s")
+
+    car_spots = parking_lot.spots[VehicleType.CAR]
+    reference = EnergyEfficientStrategy()
+    start = time.perf_counter()
+    expected = reference.select_spot(car_spots, Car("ref"))
+    print(f"EnergyEfficientStrategy: {(time.perf_counter() - start) * 1000:.0f} ms per select")
+
+    parking_lot.parking_strategy = VectorizedEnergyEfficientStrategy(table, group_of)
+    parking_lot.register_observer(SpotTableObserver(table))
+    assert parking_lot.parking_strategy.select_spot(car_spots, Car("vec")) is expected
+    start = time.perf_counter()
+    for i in range(parks):
+        parking_lot.park_vehicle(Car(f"C-{i}"))
+    print(f"Vectorized strategy: {(time.perf_counter() - start) * 1000 / parks:.1f} ms per park")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,148 @@
+import threading
+import time
+import timeit
+import uuid
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+# Snowflake layout (63 bits used): | 41 bits ms since EPOCH_MS | 10 bits gate | 12 bits sequence |
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+GATE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_GATE_ID = (1 << GATE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Crockford base32: no I, L, O, U, so printed ids are safe to read out and type in
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+CHECK_SYMBOLS = CROCKFORD + "*~$=U"
+_TO_BASE32_DIGITS = str.maketrans(CROCKFORD, "0123456789ABCDEFGHIJKLMNOPQRSTUV")
+_PAIRS = [CROCKFORD[i >> 5] + CROCKFORD[i & 31] for i in range(1024)]
+_TYPOS = str.maketrans({"I": "1", "L": "1", "O": "0", "-": None, " ": None})
+
+
+class TicketIdGenerator(ABC):
+    @abstractmethod
+    def next_id(self) -> str:
+        pass
+
+
+class UuidTicketIdGenerator(TicketIdGenerator):
+    def next_id(self) -> str:
+        return str(uuid.uuid4())
+
+
+class SnowflakeTicketIdGenerator(TicketIdGenerator):
+    """
+    64-bit time/gate/sequence ids. Each gate owns its generator, so ids are
+    unique across the gates of a lot without any coordination between them.
+
+    If the clock goes backwards or a millisecond's 4096 sequence numbers run
+    out, the generator keeps counting from its last timestamp instead of
+    waiting, so ids stay unique and increasing.
+    """
+
+    def __init__(self, gate_id: int, clock=time.time):
+        if not 0 <= gate_id <= MAX_GATE_ID:
+            raise ValueError(f"gate_id must be between 0 and {MAX_GATE_ID}")
+        self.gate_id = gate_id
+        self.clock = clock
+        self.last_ms = -1
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self._prefix = (-1, "")  # (value >> 15, its 10 leading characters)
+
+    def next_value(self) -> int:
+        with self.lock:
+            now_ms = int(self.clock() * 1000) - EPOCH_MS
+            if now_ms > self.last_ms:
+                self.last_ms, self.sequence = now_ms, 0
+            elif self.sequence < MAX_SEQUENCE:
+                self.sequence += 1
+            else:
+                self.last_ms, self.sequence = self.last_ms + 1, 0
+            return (self.last_ms << (GATE_BITS + SEQUENCE_BITS)) \
+                | (self.gate_id << SEQUENCE_BITS) | self.sequence
+
+    def next_id(self) -> str:
+        value = self.next_value()
+        # Only the low 15 bits (sequence + 3 gate bits) change within a millisecond,
+        # so the leading 10 characters are encoded once per millisecond
+        prefix = self._prefix
+        if prefix[0] != value >> 15:
+            prefix = self._prefix = (value >> 15, _encode_digits(value >> 15, 10))
+        return (prefix[1] + CROCKFORD[(value >> 10) & 31] + _PAIRS[value & 1023]
+                + CHECK_SYMBOLS[value % 37])
+
+
+def _encode_digits(value: int, length: int) -> str:
+    digits = []
+    for _ in range(length):
+        digits.append(CROCKFORD[value & 31])
+        value >>= 5
+    return "".join(reversed(digits))
+
+
+def encode_ticket_id(value: int) -> str:
+    """13 base32 characters plus a mod-37 check symbol for manual entry."""
+    return _encode_digits(value, 13) + CHECK_SYMBOLS[value % 37]
+
+
+def normalize_ticket_id(text: str) -> str:
+    """Uppercase and fix common typos (I/L -> 1, O -> 0, dashes, spaces)."""
+    return text.upper().translate(_TYPOS)
+
+
+def decode_ticket_id(text: str) -> int:
+    text = normalize_ticket_id(text)
+    if len(text) != 14:
+        raise ValueError("Ticket ID must be 14 characters")
+    body, check = text[:13], text[13]
+    if any(char not in CROCKFORD for char in body):
+        raise ValueError("Ticket ID contains invalid characters")
+    value = int(body.translate(_TO_BASE32_DIGITS), 32)
+    if CHECK_SYMBOLS[value % 37] != check:
+        raise ValueError("Ticket ID checksum mismatch")
+    return value
+
+
+def split_ticket_id(text: str) -> Tuple[float, int, int]:
+    """Returns (unix timestamp, gate id, sequence) of a Snowflake ticket id."""
+    value = decode_ticket_id(text)
+    sequence = value & MAX_SEQUENCE
+    gate_id = (value >> SEQUENCE_BITS) & MAX_GATE_ID
+    timestamp_ms = (value >> (GATE_BITS + SEQUENCE_BITS)) + EPOCH_MS
+    return timestamp_ms / 1000, gate_id, sequence
+
+
+def benchmark(iterations: int = 200_000):
+    generators = {
+        "uuid4": UuidTicketIdGenerator(),
+        "snowflake": SnowflakeTicketIdGenerator(gate_id=1),
+    }
+    for name, generator in generators.items():
+        seconds = timeit.timeit(generator.next_id, number=iterations)
+        print(f"{name:>10}: {seconds / iterations * 1e9:7.0f} ns/id  "
+              f"sample={generator.next_id()}")
+
+    # Collision check across gates issuing concurrently
+    gates = [SnowflakeTicketIdGenerator(gate_id) for gate_id in range(1, 9)]
+    ids = set()
+
+    def issue(generator):
+        for _ in range(20_000):
+            ids.add(generator.next_id())
+
+    threads = [threading.Thread(target=issue, args=(g,)) for g in gates]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"Issued {len(gates) * 20_000} ids from {len(gates)} gates, unique: {len(ids)}")
+
+    ticket_id = gates[0].next_id()
+    typed = ticket_id.lower().replace("1", "l").replace("0", "o")
+    print(f"{typed} decodes to (timestamp, gate, sequence) = {split_ticket_id(typed)}")
+
+
+if __name__ == "__main__":
+    benchmark()